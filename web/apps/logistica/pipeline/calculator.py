@@ -3,10 +3,12 @@ Módulo de Cálculos
 Calcula horas, conteos y genera observaciones
 """
 
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta, time
-from dateutil.easter import easter
 from . import config
+from . import holiday_calendar
+from .day_index import DayIndex
+from .observation_flags import ObservationFlags
 from .logger import logger
 
 
@@ -15,64 +17,23 @@ class Calculator:
 
     def __init__(self):
         """Inicializa el calculador"""
-        self._festivos_cache = {}
 
     @staticmethod
-    def _siguiente_lunes(fecha):
-        """Mueve una fecha al siguiente lunes (Ley Emiliani)."""
-        dias_hasta_lunes = (7 - fecha.weekday()) % 7
-        return fecha + timedelta(days=dias_hasta_lunes)
-
-    def _obtener_festivos_colombia(self, anio):
-        """Retorna set de festivos de Colombia para un año dado."""
-        if anio in self._festivos_cache:
-            return self._festivos_cache[anio]
-
-        pascua = easter(anio)
-        festivos = set()
-
-        # Fijos (no trasladables)
-        festivos.update({
-            datetime(anio, 1, 1).date(),   # Año Nuevo
-            datetime(anio, 5, 1).date(),   # Día del Trabajo
-            datetime(anio, 7, 20).date(),  # Independencia
-            datetime(anio, 8, 7).date(),   # Batalla de Boyacá
-            datetime(anio, 12, 8).date(),  # Inmaculada Concepción
-            datetime(anio, 12, 25).date(), # Navidad
-        })
+    def flags_dia_especial(fechas):
+        """
+        Bit de observación especial (domingo o festivo) de cada fecha
+
+        Args:
+            fechas: Serie o array de fechas
 
-        # Emiliani (se trasladan al siguiente lunes)
-        emiliani = [
-            datetime(anio, 1, 6).date(),   # Reyes Magos
-            datetime(anio, 3, 19).date(),  # San José
-            datetime(anio, 6, 29).date(),  # San Pedro y San Pablo
-            datetime(anio, 8, 15).date(),  # Asunción
-            datetime(anio, 10, 12).date(), # Día de la Raza
-            datetime(anio, 11, 1).date(),  # Todos los Santos
-            datetime(anio, 11, 11).date(), # Independencia de Cartagena
-        ]
-        for fecha in emiliani:
-            festivos.add(self._siguiente_lunes(fecha))
-
-        # Relacionados con Pascua
-        festivos.add(pascua - timedelta(days=3))   # Jueves Santo
-        festivos.add(pascua - timedelta(days=2))   # Viernes Santo
-        festivos.add(self._siguiente_lunes(pascua + timedelta(days=43)))  # Ascensión
-        festivos.add(self._siguiente_lunes(pascua + timedelta(days=64)))  # Corpus Christi
-        festivos.add(self._siguiente_lunes(pascua + timedelta(days=71)))  # Sagrado Corazón
-
-        self._festivos_cache[anio] = festivos
-        return festivos
-
-    def _observacion_dia_especial(self, fecha):
-        """Retorna observación especial del día o None."""
-        if not fecha:
-            return None
-        if fecha.weekday() == 6:
-            return config.OBSERVACIONES['TRABAJO_DOMINICAL']
-        if fecha in self._obtener_festivos_colombia(fecha.year):
-            return config.OBSERVACIONES['DIA_FESTIVO']
-        return None
+        Returns:
+            Array de enteros (0 si el día no es especial)
+        """
+        return np.select(
+            [holiday_calendar.es_domingo(fechas), holiday_calendar.es_festivo(fechas)],
+            [ObservationFlags.TRABAJO_DOMINICAL, ObservationFlags.DIA_FESTIVO],
+            default=0
+        ).astype(np.int64)
 
     def contar_marcaciones_am_pm(self, df_empleado_dia):
         """
@@ -84,235 +45,216 @@ class Calculator:
         Returns:
             Tupla (marcaciones_am, marcaciones_pm)
         """
-        marcaciones_am = 0
-        marcaciones_pm = 0
+        fechas = df_empleado_dia['FECHA_HORA']
+        minutos = (fechas.dt.hour * 60 + fechas.dt.minute).to_numpy()
+        marcaciones_am = int(config.TABLA_MINUTOS_AM[minutos].sum())
+        marcaciones_pm = int(config.TABLA_MINUTOS_PM[minutos].sum())
 
-        for _, row in df_empleado_dia.iterrows():
-            hora = row['FECHA_HORA'].hour
+        return marcaciones_am, marcaciones_pm
 
-            if config.HORA_INICIO_AM <= hora < config.HORA_FIN_AM:
-                marcaciones_am += 1
-            elif config.HORA_INICIO_PM <= hora < config.HORA_FIN_PM:
-                marcaciones_pm += 1
+    def contar_marcaciones_por_dia(self, df_marcaciones, indice_dias):
+        """
+        Cuenta, para todos los empleados-día a la vez, las marcaciones AM, PM y
+        las casi duplicadas (a UMBRAL_DUPLICADOS o menos de la marcación anterior)
 
-        return marcaciones_am, marcaciones_pm
+        Args:
+            df_marcaciones: DataFrame con marcaciones
+            indice_dias: DayIndex construido sobre df_marcaciones
 
-    def generar_observaciones(self, turno, df_empleado_dia=None):
+        Returns:
+            Tupla de arrays (marcaciones_am, marcaciones_pm, duplicados) indexados
+            por el número de grupo de indice_dias
         """
-        Genera observaciones para un turno
+        ids = indice_dias.id_por_fila
+        n_grupos = indice_dias.n_grupos
+        validos = ids >= 0
+
+        fechas = df_marcaciones['FECHA_HORA']
+        minutos = (fechas.dt.hour * 60 + fechas.dt.minute).to_numpy()
+        marcaciones_am = np.bincount(ids[validos], weights=config.TABLA_MINUTOS_AM[minutos][validos],
+                                     minlength=n_grupos).astype(int)
+        marcaciones_pm = np.bincount(ids[validos], weights=config.TABLA_MINUTOS_PM[minutos][validos],
+                                     minlength=n_grupos).astype(int)
+
+        # Diferencia con la marcación anterior del mismo empleado-día (en el orden del DataFrame)
+        orden = np.flatnonzero(validos)[np.argsort(ids[validos], kind='stable')]
+        ids_orden = ids[orden]
+        instantes = fechas.to_numpy(dtype='datetime64[ns]').astype('int64')[orden]
+        mismo_grupo = np.r_[False, ids_orden[1:] == ids_orden[:-1]]
+        diferencia = np.r_[np.inf, np.diff(instantes) / 1e9]
+        cercanas = mismo_grupo & (diferencia <= config.UMBRAL_DUPLICADOS)
+
+        duplicados = np.bincount(ids_orden[cercanas], minlength=n_grupos)
+        # Solo se reportan en días con más de dos marcaciones
+        tamanos = np.bincount(ids[validos], minlength=n_grupos)
+        duplicados[tamanos <= 2] = 0
+
+        return marcaciones_am, marcaciones_pm, duplicados
+
+    def calcular_observaciones(self, df_turnos, n_duplicados=None):
+        """
+        Calcula las banderas de observación de todos los turnos a la vez
 
         Args:
-            turno: Dict con información del turno
-            df_empleado_dia: DataFrame con marcaciones del día (opcional)
+            df_turnos: DataFrame con turnos
+            n_duplicados: Array con las marcaciones casi duplicadas del día de
+                          cada turno (de contar_marcaciones_por_dia; opcional)
 
         Returns:
-            String con observaciones
+            Array de enteros con los bits de ObservationFlags de cada turno
         """
-        observaciones = []
+        n = len(df_turnos)
+        flags = ObservationFlags
+
+        def columna(nombre):
+            if nombre not in df_turnos.columns:
+                return np.zeros(n, dtype=bool)
+            return df_turnos[nombre].fillna(False).to_numpy(dtype=bool)
+
+        completo = columna('completo')
+        es_nocturno = columna('es_nocturno')
+        sin_entrada = df_turnos['entrada'].isna().to_numpy()
+        sin_salida = df_turnos['salida'].isna().to_numpy()
+        horas = pd.to_numeric(df_turnos['horas'], errors='coerce').to_numpy(dtype=float)
+        if n_duplicados is None:
+            n_duplicados = np.zeros(n, dtype=int)
 
         # Turno incompleto
-        if not turno['completo']:
-            if pd.isna(turno['entrada']):
-                observaciones.append(config.OBSERVACIONES['ENTRADA_NR'])
-            elif pd.isna(turno['salida']):
-                observaciones.append(config.OBSERVACIONES['SALIDA_NR'])
-
-        # Turno nocturno
-        if turno['es_nocturno'] and turno['completo']:
-            # Priorizar observación de salida estándar si aplica
-            if turno.get('salida_estandar_nocturna', False):
-                observaciones.append(config.OBSERVACIONES['SALIDA_ESTANDAR_NOCTURNA'])
-            else:
-                observaciones.append(config.OBSERVACIONES['TURNO_NOCTURNO'])
-
-        # Estados inferidos
-        if turno.get('entrada_inferida', False):
-            observaciones.append(config.OBSERVACIONES['ESTADO_INFERIDO'] + " (Entrada)")
-        if turno.get('salida_inferida', False):
-            observaciones.append(config.OBSERVACIONES['ESTADO_INFERIDO'] + " (Salida)")
-
-        # Salida corregida (segunda Entrada tratada como Salida)
-        if turno.get('salida_corregida', False):
-            observaciones.append(config.OBSERVACIONES['SALIDA_CORREGIDA'])
-
-        # Regla especial vigilantes: castigo por marcación AM+PM mismo día
-        if turno.get('castigo_marcacion_diurna', False):
-            observaciones.append(config.OBSERVACIONES['CASTIGO_MARCACION_INCORRECTA_DIURNO'])
-
-        # Turno nocturno prospectivo (entrada PM + salida AM día siguiente)
-        if turno.get('nocturno_prospectivo', False):
-            observaciones.append(config.OBSERVACIONES['NOCTURNO_PROSPECTIVO'])
-
-        # Validación de horas
-        if turno['horas'] is not None:
-            if turno['horas'] > config.HORAS_MAXIMAS_TURNO:
-                observaciones.append(config.OBSERVACIONES['TURNO_LARGO'])
-            elif turno['horas'] > config.HORAS_LIMITE_JORNADA:
-                observaciones.append(config.OBSERVACIONES['EXCEDE_JORNADA'])
-            elif turno['horas'] < config.HORAS_MINIMAS_TURNO:
-                observaciones.append(config.OBSERVACIONES['TURNO_CORTO'])
-
-        # Duplicados (si hay información del día)
-        if df_empleado_dia is not None and len(df_empleado_dia) > 2:
-            # Buscar duplicados
-            df_dia = df_empleado_dia.copy()
-            df_dia['diff_seconds'] = df_dia['FECHA_HORA'].diff().dt.total_seconds()
-            duplicados = df_dia[df_dia['diff_seconds'] <= config.UMBRAL_DUPLICADOS]
-
-            if len(duplicados) > 0:
-                observaciones.append(f"{config.OBSERVACIONES['DUPLICADOS_ELIM']} ({len(duplicados)})")
+        banderas = np.where(~completo & sin_entrada, flags.ENTRADA_NR, 0)
+        banderas |= np.where(~completo & ~sin_entrada & sin_salida, flags.SALIDA_NR, 0)
+
+        # Turno nocturno (prioriza la salida estándar si aplica)
+        salida_estandar = columna('salida_estandar_nocturna')
+        nocturno_completo = es_nocturno & completo
+        banderas |= np.where(nocturno_completo & salida_estandar, flags.SALIDA_ESTANDAR_NOCTURNA, 0)
+        banderas |= np.where(nocturno_completo & ~salida_estandar, flags.TURNO_NOCTURNO, 0)
+
+        # Estados inferidos, salida corregida, castigo de vigilantes y nocturno prospectivo
+        for nombre, bit in (
+            ('entrada_inferida', flags.ENTRADA_INFERIDA),
+            ('salida_inferida', flags.SALIDA_INFERIDA),
+            ('salida_corregida', flags.SALIDA_CORREGIDA),
+            ('castigo_marcacion_diurna', flags.CASTIGO_MARCACION_DIURNA),
+            ('nocturno_prospectivo', flags.NOCTURNO_PROSPECTIVO),
+        ):
+            banderas |= np.where(columna(nombre), bit, 0)
+
+        # Validación de horas (NaN no cumple ninguna condición)
+        banderas |= np.select(
+            [horas > config.HORAS_MAXIMAS_TURNO,
+             horas > config.HORAS_LIMITE_JORNADA,
+             horas < config.HORAS_MINIMAS_TURNO],
+            [flags.TURNO_LARGO, flags.EXCEDE_JORNADA, flags.TURNO_CORTO],
+            default=0
+        )
+
+        # Duplicados del día
+        banderas |= np.where(np.asarray(n_duplicados) > 0, flags.DUPLICADOS, 0)
 
         # Datos del empleado
-        if str(turno['codigo']) in str(turno['nombre']):
-            observaciones.append(config.OBSERVACIONES['DATOS_CORRUPTOS'])
+        corruptos = [str(c) in str(nom) for c, nom in zip(df_turnos['codigo'].tolist(), df_turnos['nombre'].tolist())]
+        banderas |= np.where(np.array(corruptos, dtype=bool), flags.DATOS_CORRUPTOS, 0)
 
         # Día de la semana
-        if turno['fecha']:
-            obs_dia_especial = self._observacion_dia_especial(turno['fecha'])
-            if obs_dia_especial:
-                observaciones.append(obs_dia_especial)
+        banderas |= self.flags_dia_especial(df_turnos['fecha'])
 
-        # Si no hay observaciones
-        if not observaciones:
-            return config.OBSERVACIONES['OK']
+        return banderas.astype(np.int64)
 
-        return ' | '.join(observaciones)
-
-    def calcular_metricas(self, df_turnos, df_marcaciones):
+    def calcular_metricas(self, df_turnos, df_marcaciones, indice_dias=None):
         """
         Calcula métricas finales para todos los turnos
 
+        Las columnas del resultado quedan tipadas (FECHA y horas de ingreso/salida
+        datetime64, horas float, conteos Int64); el formato de texto se aplica
+        solo al escribir el Excel.
+
         Args:
             df_turnos: DataFrame con turnos
             df_marcaciones: DataFrame con marcaciones originales
+            indice_dias: DayIndex ya construido sobre df_marcaciones (opcional;
+                         se construye si no se provee)
 
         Returns:
             DataFrame con métricas calculadas
         """
         logger.log_fase("CÁLCULO DE MÉTRICAS")
 
-        resultados = []
-
-        for idx, turno in df_turnos.iterrows():
-            # Obtener marcaciones del empleado en la fecha
-            df_emp_dia = df_marcaciones[
-                (df_marcaciones['CODIGO'] == turno['codigo']) &
-                (df_marcaciones['FECHA_HORA'].dt.date == turno['fecha'])
-            ].copy()
-
-            # Contar marcaciones AM/PM
-            marc_am, marc_pm = self.contar_marcaciones_am_pm(df_emp_dia)
-
-            # Generar observaciones
-            observaciones = self.generar_observaciones(turno, df_emp_dia)
-
-            # Formatear horas
-            entrada_str = turno['entrada'].strftime(config.FORMATO_HORA_OUTPUT) if pd.notna(turno['entrada']) else '00:00'
-            salida_str = turno['salida'].strftime(config.FORMATO_HORA_OUTPUT) if pd.notna(turno['salida']) else '00:00'
-
-            # Si es turno nocturno, indicar que la salida es del día siguiente
-            if turno['es_nocturno'] and pd.notna(turno['salida']) and pd.notna(turno['entrada']):
-                if turno['salida'].date() > turno['entrada'].date():
-                    salida_str += '*'
-
-            # Formatear fecha
-            fecha_str = turno['fecha'].strftime(config.FORMATO_FECHA_OUTPUT)
-            dia_semana = config.DIAS_SEMANA[turno['fecha'].weekday()]
-
-            # Verificar si cruza medianoche (cualquier turno que termina al día siguiente).
-            # Esto permite partir correctamente casos como 16:31 -> 04:31 en dos filas.
-            cruza_medianoche = False
-            if turno['completo'] and pd.notna(turno['salida']) and pd.notna(turno['entrada']):
-                if turno['salida'].date() > turno['entrada'].date():
-                    cruza_medianoche = True
-
-            if cruza_medianoche:
-                # ===== DIVIDIR EN DOS REGISTROS =====
-
-                # --- PARTE 1: Entrada -> 00:00 ---
-                fin_dia_p1 = datetime.combine(turno['entrada'].date() + timedelta(days=1), time.min)
-                horas_p1 = (fin_dia_p1 - turno['entrada']).total_seconds() / 3600
-
-                res_p1 = {
-                    'CODIGO COLABORADOR': int(turno['codigo']),
-                    'NOMBRE COMPLETO DEL COLABORADOR': turno['nombre'],
-                    'DOCUMENTO DEL COLABORADOR': '',
-                    'CARGO': '',
-                    'FECHA': fecha_str,
-                    'DIA': dia_semana,
-                    '# MARCACIONES AM': marc_am,
-                    '# MARCACIONES PM': marc_pm,
-                    'HORA DE INGRESO': entrada_str,
-                    'HORA DE SALIDA': '00:00',
-                    'TOTAL HORAS LABORADAS': round(horas_p1, 2),
-                    'LÍMITE HORAS DÍA': '',
-                    'OBSERVACION': observaciones,
-                    'OBSERVACIONES_1': ''
-                }
-                resultados.append(res_p1)
-
-                # --- PARTE 2: 00:00 -> Salida ---
-                # Usar fecha del día siguiente
-                fecha_p2 = turno['entrada'].date() + timedelta(days=1)
-                fecha_str_p2 = fecha_p2.strftime(config.FORMATO_FECHA_OUTPUT)
-                dia_semana_p2 = config.DIAS_SEMANA[fecha_p2.weekday()]
-
-                horas_p2 = (turno['salida'] - fin_dia_p1).total_seconds() / 3600
-
-                res_p2 = {
-                    'CODIGO COLABORADOR': int(turno['codigo']),
-                    'NOMBRE COMPLETO DEL COLABORADOR': turno['nombre'],
-                    'DOCUMENTO DEL COLABORADOR': '',
-                    'CARGO': '',
-                    'FECHA': fecha_str_p2,
-                    'DIA': dia_semana_p2,
-                    '# MARCACIONES AM': 0,  # No duplicar conteos
-                    '# MARCACIONES PM': 0,
-                    'HORA DE INGRESO': '00:00',
-                    'HORA DE SALIDA': salida_str.replace('*', ''),
-                    'TOTAL HORAS LABORADAS': round(horas_p2, 2),
-                    'LÍMITE HORAS DÍA': '',
-                    'OBSERVACION': observaciones,
-                    'OBSERVACIONES_1': ''
-                }
-                resultados.append(res_p2)
+        if indice_dias is None:
+            indice_dias = DayIndex(df_marcaciones)
 
-            else:
-                # ===== REGISTRO ÚNICO (ESTÁNDAR) =====
-                resultado = {
-                    'CODIGO COLABORADOR': int(turno['codigo']),
-                    'NOMBRE COMPLETO DEL COLABORADOR': turno['nombre'],
-                    'DOCUMENTO DEL COLABORADOR': '',  # Se llenará con maestro si existe
-                    'CARGO': '',
-                    'FECHA': fecha_str,
-                    'DIA': dia_semana,
-                    '# MARCACIONES AM': marc_am,
-                    '# MARCACIONES PM': marc_pm,
-                    'HORA DE INGRESO': entrada_str,
-                    'HORA DE SALIDA': salida_str,
-                    'TOTAL HORAS LABORADAS': turno['horas'] if turno['horas'] else '',
-                    'LÍMITE HORAS DÍA': '',
-                    'OBSERVACION': observaciones,
-                    'OBSERVACIONES_1': ''
-                }
-
-                resultados.append(resultado)
-
-        df_resultado = pd.DataFrame(resultados)
+        # Conteos AM/PM y casi duplicados de todos los empleados-día en una pasada,
+        # unidos a cada turno por su (codigo, fecha)
+        am_por_dia, pm_por_dia, dup_por_dia = self.contar_marcaciones_por_dia(df_marcaciones, indice_dias)
+        ids_turno = np.array(
+            [indice_dias.id_grupo(c, f) for c, f in zip(df_turnos['codigo'], df_turnos['fecha'])],
+            dtype=np.intp
+        )
+        con_registros = ids_turno >= 0
+        am_turno = np.where(con_registros, am_por_dia[ids_turno], 0)
+        pm_turno = np.where(con_registros, pm_por_dia[ids_turno], 0)
+        dup_turno = np.where(con_registros, dup_por_dia[ids_turno], 0)
+
+        # Observaciones como banderas; el texto se arma al escribir la salida
+        flags_turno = self.calcular_observaciones(df_turnos, dup_turno)
+
+        entrada = df_turnos['entrada'].to_numpy(dtype='datetime64[ns]')
+        salida = df_turnos['salida'].to_numpy(dtype='datetime64[ns]')
+        fecha = pd.to_datetime(df_turnos['fecha']).to_numpy(dtype='datetime64[ns]')
+        horas = pd.to_numeric(df_turnos['horas'], errors='coerce').to_numpy(dtype=float)
+        completo = df_turnos['completo'].to_numpy(dtype=bool)
+
+        # Turnos que terminan al día siguiente se parten en dos filas en la
+        # medianoche (p. ej. 16:31 -> 04:31): Entrada -> 00:00 y 00:00 -> Salida
+        medianoche = entrada.astype('datetime64[D]').astype('datetime64[ns]') + np.timedelta64(1, 'D')
+        cruza_medianoche = (
+            completo & ~np.isnat(entrada) & ~np.isnat(salida)
+            & (salida.astype('datetime64[D]') > entrada.astype('datetime64[D]'))
+        )
+
+        # Cada turno ocupa una fila, o dos consecutivas si cruza la medianoche
+        filas = np.repeat(np.arange(len(df_turnos)), np.where(cruza_medianoche, 2, 1))
+        segunda_parte = np.r_[False, filas[1:] == filas[:-1]]
+        primera_parte = cruza_medianoche[filas] & ~segunda_parte
+
+        horas_partidas = np.where(
+            segunda_parte,
+            (salida[filas] - medianoche[filas]).astype(np.int64) / 3.6e12,
+            (medianoche[filas] - entrada[filas]).astype(np.int64) / 3.6e12
+        )
+        # Un turno sin horas (0) se reporta vacío
+        horas_fila = np.where(cruza_medianoche[filas], np.round(horas_partidas, 2), horas[filas])
+        horas_fila[~cruza_medianoche[filas] & (horas_fila == 0)] = np.nan
+
+        fecha_fila = np.where(segunda_parte, medianoche[filas], fecha[filas])
+        n_filas = len(filas)
+
+        df_resultado = pd.DataFrame({
+            'CODIGO COLABORADOR': df_turnos['codigo'].to_numpy()[filas].astype(int),
+            'NOMBRE COMPLETO DEL COLABORADOR': df_turnos['nombre'].to_numpy()[filas],
+            'DOCUMENTO DEL COLABORADOR': '',  # Se llenará con maestro si existe
+            'CARGO': '',
+            'FECHA': fecha_fila,
+            'DIA': pd.Series(fecha_fila).dt.weekday.map(config.DIAS_SEMANA).to_numpy(dtype=object),
+            # La segunda parte no duplica los conteos
+            '# MARCACIONES AM': pd.array(np.where(segunda_parte, 0, am_turno[filas]), dtype='Int64'),
+            '# MARCACIONES PM': pd.array(np.where(segunda_parte, 0, pm_turno[filas]), dtype='Int64'),
+            'HORA DE INGRESO': np.where(segunda_parte, medianoche[filas], entrada[filas]),
+            'HORA DE SALIDA': np.where(primera_parte, medianoche[filas], salida[filas]),
+            'TOTAL HORAS LABORADAS': horas_fila,
+            'LÍMITE HORAS DÍA': np.full(n_filas, np.nan),
+            ObservationFlags.COLUMNA: flags_turno[filas],
+            'OBSERVACIONES_1': '',
+            ObservationFlags.COLUMNA_DUPLICADOS: dup_turno[filas],
+        })
 
         # Rellenar días faltantes
         df_resultado = self.rellenar_dias_faltantes(df_resultado)
 
-        # Ordenar por código y fecha real (descendente)
-        df_resultado['FECHA_DT'] = pd.to_datetime(
-            df_resultado['FECHA'],
-            format=config.FORMATO_FECHA_OUTPUT,
-            errors='coerce'
-        )
+        # Ordenar por código y fecha
         df_resultado = df_resultado.sort_values(
-            ['CODIGO COLABORADOR', 'FECHA_DT'],
+            ['CODIGO COLABORADOR', 'FECHA'],
             ascending=[True, True]
-        ).drop(columns=['FECHA_DT']).reset_index(drop=True)
+        ).reset_index(drop=True)
 
         logger.info(config.MENSAJES['calculo_completo'])
         logger.info(f"Total registros calculados: {len(df_resultado)}")
@@ -323,6 +265,9 @@ class Calculator:
         """
         Rellena los días faltantes entre registros de un mismo empleado
 
+        Arma, para cada empleado, el rango de días entre su primer y su último
+        registro y descarta (anti-join) los días que ya tienen registro.
+
         Args:
             df_resultado: DataFrame con resultados actuales
 
@@ -333,66 +278,71 @@ class Calculator:
             return df_resultado
 
         logger.info("Rellenando días faltantes...")
-        nuevos_registros = []
-
-        # Convertir columna FECHA a datetime para cálculos
-        df_calc = df_resultado.copy()
-        df_calc['FECHA_DT'] = pd.to_datetime(df_calc['FECHA'], format=config.FORMATO_FECHA_OUTPUT)
-
-        # Iterar por empleado
-        for codigo in df_calc['CODIGO COLABORADOR'].unique():
-            df_emp = df_calc[df_calc['CODIGO COLABORADOR'] == codigo].sort_values('FECHA_DT')
-
-            if len(df_emp) < 2:
-                continue
-
-            # Iterar pares de filas consecutivas
-            for i in range(len(df_emp) - 1):
-                fecha_actual = df_emp.iloc[i]['FECHA_DT']
-                fecha_siguiente = df_emp.iloc[i+1]['FECHA_DT']
-
-                # Calcular diferencia en días
-                dias_diferencia = (fecha_siguiente - fecha_actual).days
-
-                # Si hay hueco (diferencia > 1 día)
-                if dias_diferencia > 1:
-                    nombre_colaborador = df_emp.iloc[i]['NOMBRE COMPLETO DEL COLABORADOR']
-                    doc_colaborador = df_emp.iloc[i]['DOCUMENTO DEL COLABORADOR']
-
-                    # Generar registros intermedios
-                    for d in range(1, dias_diferencia):
-                        fecha_relleno = fecha_actual + timedelta(days=d)
-                        fecha_relleno_str = fecha_relleno.strftime(config.FORMATO_FECHA_OUTPUT)
-                        dia_semana_relleno = config.DIAS_SEMANA[fecha_relleno.weekday()]
-
-                        nuevo_reg = {
-                            'CODIGO COLABORADOR': int(codigo),
-                            'NOMBRE COMPLETO DEL COLABORADOR': nombre_colaborador,
-                            'DOCUMENTO DEL COLABORADOR': doc_colaborador,
-                            'CARGO': '',
-                            'FECHA': fecha_relleno_str,
-                            'DIA': dia_semana_relleno,
-                            '# MARCACIONES AM': '',
-                            '# MARCACIONES PM': '',
-                            'HORA DE INGRESO': '00:00',
-                            'HORA DE SALIDA': '00:00',
-                            'TOTAL HORAS LABORADAS': '',
-                            'LÍMITE HORAS DÍA': '',
-                            'OBSERVACION': (
-                                self._observacion_dia_especial(fecha_relleno.date())
-                                or config.OBSERVACIONES['SIN_REGISTROS']
-                            ),
-                            'OBSERVACIONES_1': ''
-                        }
-                        nuevos_registros.append(nuevo_reg)
-
-        if nuevos_registros:
-            df_nuevos = pd.DataFrame(nuevos_registros)
-            df_final = pd.concat([df_resultado, df_nuevos], ignore_index=True)
-            logger.info(f"✅ Se generaron {len(nuevos_registros)} registros de relleno")
-            return df_final
 
-        return df_resultado
+        # Días con registro por empleado (ordenados); el nombre y documento del
+        # relleno se toman del último registro antes del hueco
+        df_dias = pd.DataFrame({
+            'CODIGO': df_resultado['CODIGO COLABORADOR'].to_numpy(),
+            'FECHA_DT': df_resultado['FECHA'].to_numpy(dtype='datetime64[ns]'),
+            'NOMBRE': df_resultado['NOMBRE COMPLETO DEL COLABORADOR'].to_numpy(),
+            'DOCUMENTO': df_resultado['DOCUMENTO DEL COLABORADOR'].to_numpy(),
+        })
+        df_dias = (
+            df_dias.sort_values(['CODIGO', 'FECHA_DT'], kind='stable')
+            .drop_duplicates(['CODIGO', 'FECHA_DT'], keep='last')
+            .reset_index(drop=True)
+        )
+
+        # Rango completo de días de cada empleado
+        codigos = df_dias['CODIGO'].to_numpy()
+        dias = df_dias['FECHA_DT'].to_numpy(dtype='datetime64[D]').astype(np.int64)
+        inicio_empleado = np.r_[True, codigos[1:] != codigos[:-1]]
+        fin_empleado = np.r_[inicio_empleado[1:], True]
+        primeros = dias[inicio_empleado]
+        longitudes = dias[fin_empleado] - primeros + 1
+        inicio_rango = np.cumsum(longitudes) - longitudes
+        rango_dias = np.repeat(primeros, longitudes) + np.arange(longitudes.sum()) - np.repeat(inicio_rango, longitudes)
+
+        # Anti-join: marcar en el rango los días que ya tienen registro
+        empleado = np.cumsum(inicio_empleado) - 1
+        existentes = np.zeros(len(rango_dias), dtype=bool)
+        existentes[inicio_rango[empleado] + dias - primeros[empleado]] = True
+        faltantes = ~existentes
+        # Fila de df_dias del último día con registro antes de cada día del rango
+        anterior = np.cumsum(existentes) - 1
+
+        if not faltantes.any():
+            return df_resultado
+
+        anterior = anterior[faltantes]
+        fechas_relleno = pd.Series(rango_dias[faltantes].astype('datetime64[D]')).astype('datetime64[ns]')
+
+        # Domingos y festivos por búsqueda vectorizada; el resto queda SIN REGISTROS
+        observaciones = self.flags_dia_especial(fechas_relleno)
+        observaciones[observaciones == 0] = ObservationFlags.SIN_REGISTROS
+
+        n_relleno = len(fechas_relleno)
+        df_nuevos = pd.DataFrame({
+            'CODIGO COLABORADOR': codigos[anterior].astype(int),
+            'NOMBRE COMPLETO DEL COLABORADOR': df_dias['NOMBRE'].to_numpy()[anterior],
+            'DOCUMENTO DEL COLABORADOR': df_dias['DOCUMENTO'].to_numpy()[anterior],
+            'CARGO': '',
+            'FECHA': fechas_relleno.to_numpy(),
+            'DIA': fechas_relleno.dt.weekday.map(config.DIAS_SEMANA).to_numpy(),
+            '# MARCACIONES AM': pd.array([pd.NA] * n_relleno, dtype='Int64'),
+            '# MARCACIONES PM': pd.array([pd.NA] * n_relleno, dtype='Int64'),
+            'HORA DE INGRESO': np.full(n_relleno, np.datetime64('NaT'), dtype='datetime64[ns]'),
+            'HORA DE SALIDA': np.full(n_relleno, np.datetime64('NaT'), dtype='datetime64[ns]'),
+            'TOTAL HORAS LABORADAS': np.full(n_relleno, np.nan),
+            'LÍMITE HORAS DÍA': np.full(n_relleno, np.nan),
+            ObservationFlags.COLUMNA: observaciones.astype(np.int64),
+            'OBSERVACIONES_1': '',
+            ObservationFlags.COLUMNA_DUPLICADOS: np.zeros(n_relleno, dtype=np.int64),
+        })
+
+        df_final = pd.concat([df_resultado, df_nuevos], ignore_index=True)
+        logger.info(f"✅ Se generaron {n_relleno} registros de relleno")
+        return df_final
 
     def agregar_datos_maestro(self, df_resultado, df_maestro, df_cargos=None):
         """
@@ -485,9 +435,8 @@ class Calculator:
 
             # Actualizar columna de documento (convertir a entero para evitar notación científica)
             if 'DOCUMENTO' in df_resultado.columns:
-                df_resultado['DOCUMENTO DEL COLABORADOR'] = df_resultado['DOCUMENTO'].apply(
-                    lambda x: str(int(x)) if pd.notna(x) and x != '' else ''
-                )
+                documentos = np.trunc(pd.to_numeric(df_resultado['DOCUMENTO'], errors='coerce')).astype('Int64')
+                df_resultado['DOCUMENTO DEL COLABORADOR'] = documentos.astype(str).where(documentos.notna(), '')
                 df_resultado = df_resultado.drop('DOCUMENTO', axis=1)
 
             # Actualizar Cargo
@@ -497,44 +446,29 @@ class Calculator:
 
             # Actualizar Límite Horas
             if 'LIMITE_HORAS_DIA' in df_resultado.columns:
-                df_resultado['LÍMITE HORAS DÍA'] = df_resultado['LIMITE_HORAS_DIA'].fillna('')
+                df_resultado['LÍMITE HORAS DÍA'] = pd.to_numeric(df_resultado['LIMITE_HORAS_DIA'], errors='coerce')
 
-                # Validación de horas excedidas por cargo
-                def validar_exceso(row):
-                    observacion = str(row['OBSERVACION']) if pd.notna(row['OBSERVACION']) else ''
+                # Validación de horas excedidas por cargo (NaN en horas o límite no excede)
+                limite_dia = df_resultado['LÍMITE HORAS DÍA'].to_numpy(dtype=float)
+                excede = df_resultado['TOTAL HORAS LABORADAS'].to_numpy(dtype=float) > limite_dia
 
-                    # Evitar duplicar la alerta
-                    if 'EXCEDE LÍMITE DE HORAS DEL CARGO' in observacion:
-                        return observacion
+                banderas = df_resultado[ObservationFlags.COLUMNA].to_numpy(dtype=np.int64, copy=True)
+                # Evitar duplicar la alerta (conserva el límite con el que se marcó)
+                nuevas = excede & ((banderas & ObservationFlags.EXCEDE_LIMITE_CARGO) == 0)
 
-                    # Verificar que haya valores numéricos válidos
-                    if pd.notna(row['TOTAL HORAS LABORADAS']) and row['TOTAL HORAS LABORADAS'] != '' and pd.notna(row['LIMITE_HORAS_DIA']) and row['LIMITE_HORAS_DIA'] != '':
-                        try:
-                            horas_laboradas = float(row['TOTAL HORAS LABORADAS'])
-                            limite_cargo = float(row['LIMITE_HORAS_DIA'])
-
-                            if horas_laboradas > limite_cargo:
-                                alerta = f"ALERTA: EXCEDE LÍMITE DE HORAS DEL CARGO ({limite_cargo} horas)"
-                                if observacion and observacion != config.OBSERVACIONES['OK'] and observacion != config.OBSERVACIONES['SIN_REGISTROS']:
-                                    return f"{observacion} | {alerta}"
-                                else:
-                                    return alerta
-                        except ValueError:
-                            pass
-
-                    return observacion
-
-                df_resultado['OBSERVACION'] = df_resultado.apply(validar_exceso, axis=1)
-
-                # Remover la alerta genérica de config si la tenemos para este cargo
-                df_resultado['OBSERVACION'] = df_resultado['OBSERVACION'].str.replace(f" | {config.OBSERVACIONES['EXCEDE_JORNADA']}", "", regex=False)
-                df_resultado['OBSERVACION'] = df_resultado['OBSERVACION'].str.replace(config.OBSERVACIONES['EXCEDE_JORNADA'], "", regex=False)
+                limites = (
+                    df_resultado[ObservationFlags.COLUMNA_LIMITE_CARGO].to_numpy(dtype=float, copy=True)
+                    if ObservationFlags.COLUMNA_LIMITE_CARGO in df_resultado.columns
+                    else np.full(len(df_resultado), np.nan)
+                )
+                limites[nuevas] = limite_dia[nuevas]
+                banderas[nuevas] |= ObservationFlags.EXCEDE_LIMITE_CARGO
 
-                # Limpiar "|" sueltos y espacios que puedan quedar
-                df_resultado['OBSERVACION'] = df_resultado['OBSERVACION'].str.strip(' |')
+                # Remover la alerta genérica de config: el límite del cargo la reemplaza
+                banderas &= ~ObservationFlags.EXCEDE_JORNADA
 
-                # Si quedó vacío por borrar la alerta genérica, poner OK
-                df_resultado['OBSERVACION'] = df_resultado['OBSERVACION'].replace('', config.OBSERVACIONES['OK'])
+                df_resultado[ObservationFlags.COLUMNA] = banderas
+                df_resultado[ObservationFlags.COLUMNA_LIMITE_CARGO] = limites
 
                 df_resultado = df_resultado.drop('LIMITE_HORAS_DIA', axis=1)
 
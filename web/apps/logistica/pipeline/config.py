@@ -6,6 +6,9 @@ Corporación Hacia un Valle Solidario
 import os
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
 # ========== CONFIGURACIÓN DE ARCHIVOS ==========
 
 # Directorio raíz del proyecto (huellero_processor/)
@@ -17,15 +20,29 @@ DIR_INPUT = BASE_DIR / "data" / "input"
 DIR_OUTPUT = BASE_DIR / "data" / "output"
 DIR_MAESTRO = BASE_DIR / "data" / "maestro"
 DIR_LOGS = BASE_DIR / "logs"
+DIR_CACHE = BASE_DIR / "data" / "cache"
 
 # Crear directorios si no existen
-for _dir in [DIR_INPUT, DIR_OUTPUT, DIR_MAESTRO, DIR_LOGS]:
+for _dir in [DIR_INPUT, DIR_OUTPUT, DIR_MAESTRO, DIR_LOGS, DIR_CACHE]:
     _dir.mkdir(parents=True, exist_ok=True)
 
 # Nombres de archivos
 ARCHIVO_MAESTRO = "empleados.xlsx"
 PREFIJO_OUTPUT = "REPORTE_ASISTENCIA"
 
+# Filas iniciales donde se busca el encabezado ('ID') del archivo del huellero
+FILAS_BUSQUEDA_ENCABEZADO = 50
+
+# Columnas del archivo del huellero y su nombre interno
+COLUMNAS_ENTRADA = {
+    'ID': 'CODIGO',
+    'Nombre': 'NOMBRE',
+    'Nombre ': 'NOMBRE',  # Variante con espacio
+    'Fecha / Hora': 'FECHA_HORA',
+    'Estado': 'ESTADO',
+    'Tipo de Registro': 'TIPO'
+}
+
 # ========== CONFIGURACIÓN DE PROCESAMIENTO ==========
 
 # Umbrales de tiempo (en segundos)
@@ -53,6 +70,11 @@ HORA_FIN_PM = 24     # 23:59
 RANGO_INFERENCIA_ENTRADA = [(3, 11)]   # 03:00 a 11:00 -> probablemente ENTRADA
 RANGO_INFERENCIA_SALIDA = [(14, 21)]   # 14:00 a 21:00 -> probablemente SALIDA
 
+# Ventanas de autocorrección de estados del huellero (horas enteras, [inicio, fin))
+RANGO_CORRECCION_ENTRADA_PM = (13, 20)       # "Entrada" 13:00-19:59 -> Salida
+RANGO_CORRECCION_SALIDA_AM = (5, 11)         # "Salida" 05:00-10:59 -> Entrada
+RANGO_CORRECCION_SALIDA_NOCTURNA = (20, 24)  # "Salida" 20:00-23:59 -> Entrada
+
 # Tolerancia para inferencia por horario de cargo (en minutos por extremo)
 # Si la desviación del mejor turno supera este valor, se descarta la inferencia
 # y se usa el fallback (rangos globales arriba)
@@ -96,6 +118,62 @@ VIGILANTE_CASTIGO_CODIGOS = [4, 129, 130, 135]
 VIGILANTE_VENTANA_AM = (3.5, 6.0)   # 03:30 - 06:00
 VIGILANTE_VENTANA_PM = (15.5, 18.0) # 15:30 - 18:00
 
+# ========== TABLAS POR MINUTO DEL DÍA ==========
+# Las ventanas horarias anteriores se compilan una sola vez en tablas de 1440
+# posiciones (una por minuto del día). Para clasificar una columna completa:
+#   minutos = fechas.dt.hour * 60 + fechas.dt.minute
+#   TABLA_MINUTOS_AM[minutos]  -> array booleano
+
+MINUTOS_DIA = 1440
+_MINUTOS = np.arange(MINUTOS_DIA)
+_HORA_ENTERA = _MINUTOS // 60                    # Reglas evaluadas con fecha_hora.hour
+_HORA_DECIMAL = _HORA_ENTERA + (_MINUTOS % 60) / 60  # Reglas con hora decimal (16:30 -> 16.5)
+
+
+def _tabla_rangos(rangos, horas=_HORA_ENTERA):
+    """Tabla booleana por minuto: True si la hora cae en algún rango [inicio, fin)."""
+    tabla = np.zeros(MINUTOS_DIA, dtype=bool)
+    for inicio, fin in rangos:
+        tabla |= (horas >= inicio) & (horas < fin)
+    return tabla
+
+
+def _tabla_ventana(ventana, horas=_HORA_DECIMAL):
+    """Tabla booleana por minuto: True si la hora decimal cae en [inicio, fin]."""
+    inicio, fin = ventana
+    return (horas >= inicio) & (horas <= fin)
+
+
+def clasificar_por_minuto(fechas, tabla):
+    """
+    Clasifica una Serie de datetimes con una tabla por minuto del día.
+
+    Returns:
+        Serie booleana alineada con fechas
+    """
+    minutos = (fechas.dt.hour * 60 + fechas.dt.minute).to_numpy()
+    return pd.Series(tabla[minutos], index=fechas.index)
+
+
+# Inferencia por hora (StateInference): la Entrada tiene prioridad sobre la Salida
+TABLA_MINUTOS_INFERENCIA_ENTRADA = _tabla_rangos(RANGO_INFERENCIA_ENTRADA)
+TABLA_MINUTOS_INFERENCIA_SALIDA = (
+    _tabla_rangos(RANGO_INFERENCIA_SALIDA) & ~TABLA_MINUTOS_INFERENCIA_ENTRADA
+)
+
+# Conteo de marcaciones AM/PM (Calculator): una marcación AM no cuenta como PM
+TABLA_MINUTOS_AM = _tabla_rangos([(HORA_INICIO_AM, HORA_FIN_AM)])
+TABLA_MINUTOS_PM = _tabla_rangos([(HORA_INICIO_PM, HORA_FIN_PM)]) & ~TABLA_MINUTOS_AM
+
+# Ventanas de castigo de vigilantes (ShiftBuilder), límites inclusivos
+TABLA_MINUTOS_VIGILANTE_AM = _tabla_ventana(VIGILANTE_VENTANA_AM)
+TABLA_MINUTOS_VIGILANTE_PM = _tabla_ventana(VIGILANTE_VENTANA_PM)
+
+# Autocorrección de estados (DataCleaner)
+TABLA_MINUTOS_CORRECCION_ENTRADA_PM = _tabla_rangos([RANGO_CORRECCION_ENTRADA_PM])
+TABLA_MINUTOS_CORRECCION_SALIDA_AM = _tabla_rangos([RANGO_CORRECCION_SALIDA_AM])
+TABLA_MINUTOS_CORRECCION_SALIDA_NOCTURNA = _tabla_rangos([RANGO_CORRECCION_SALIDA_NOCTURNA])
+
 # ========== CONFIGURACIÓN DE COLUMNAS EXCEL ==========
 
 COLUMNAS_OUTPUT = [
@@ -161,6 +239,24 @@ FORMATO_FECHA_OUTPUT = '%d/%m/%Y'       # Formato en archivo de salida
 FORMATO_HORA_OUTPUT = '%H:%M'           # Formato de hora en salida
 FORMATO_ARCHIVO = '%Y%m%d_%H%M%S'       # Formato para nombres de archivo
 
+# Formatos nativos de Excel por columna del reporte (los datos viajan tipados
+# por el pipeline y solo se formatean al escribir)
+FORMATOS_EXCEL = {
+    'FECHA': 'dd/mm/yyyy',
+    'HORA DE INGRESO': 'hh:mm',
+    'HORA DE SALIDA': 'hh:mm',
+    'TOTAL HORAS LABORADAS': '0.00',
+    'LÍMITE HORAS DÍA': '0.00',
+}
+# Columnas datetime de las que en el Excel solo se muestra la hora (sin hora = 00:00)
+COLUMNAS_HORA_EXCEL = ['HORA DE INGRESO', 'HORA DE SALIDA']
+
+# Filas máximas por hoja (límite de Excel, incluye el encabezado); al llegar
+# al límite el reporte continúa en 'Reporte (2)', 'Reporte (3)', ...
+MAX_FILAS_HOJA_EXCEL = 1048576
+# Filas del reporte que se preparan y escriben a la vez
+FILAS_POR_BLOQUE_EXCEL = 50000
+
 # Nombres de días en español
 DIAS_SEMANA = {
     0: 'Lunes',
@@ -172,6 +268,11 @@ DIAS_SEMANA = {
     6: 'Domingo'
 }
 
+# Años de la tabla de festivos de Colombia que se arma al cargar el módulo
+# (fechas fuera del rango agregan su año a la tabla al consultarse)
+ANIO_INICIO_FESTIVOS = 2020
+ANIO_FIN_FESTIVOS = 2035
+
 # ========== CONFIGURACIÓN DE LOGGING ==========
 
 LOG_LEVEL = 'INFO'  # DEBUG, INFO, WARNING, ERROR, CRITICAL
@@ -186,12 +287,40 @@ PERMITIR_INFERENCIA = True
 # Eliminar automáticamente duplicados
 ELIMINAR_DUPLICADOS_AUTO = True
 
+# Caché de archivos de entrada ya procesados (Parquet, clave SHA-256 del archivo)
+CACHE_ENTRADA_HABILITADO = True
+CACHE_ENTRADA_MAX_MB = 500  # Tamaño máximo; se eliminan primero los menos usados
+
+# Procesos para cargar varios archivos en paralelo (None = número de CPUs)
+PROCESOS_CARGA_ARCHIVOS = None
+
+# Procesos para inferencia y construcción de turnos por fragmentos de empleados
+# (1 = secuencial, None = número de CPUs)
+PROCESOS_INFERENCIA_TURNOS = 1
+# Por debajo de este número de registros siempre se procesa en secuencia
+REGISTROS_MINIMOS_PARALELO = 20000
+
 # Generar hoja de resumen en Excel
 GENERAR_HOJA_RESUMEN = True
 
 # Generar archivo de casos especiales
 GENERAR_CASOS_ESPECIALES = True
 
+# Formatos de salida que se pueden pedir además del reporte Excel (para
+# sistemas que leen los datos de COLUMNAS_OUTPUT) y su extensión. Si se piden
+# varios, se entregan en un .zip junto con el Excel
+FORMATOS_EXPORTACION = {
+    'xlsx': '.xlsx',
+    'csv': '.csv.gz',
+    'parquet': '.parquet',
+    'ndjson': '.ndjson',
+}
+
+# Procesos para escribir el reporte y el archivo de casos a la vez
+# (1 = secuencial, None = número de CPUs; con más de 2 no hay ganancia).
+# Por debajo de REGISTROS_MINIMOS_PARALELO filas se escriben en secuencia
+PROCESOS_GENERACION_EXCEL = 2
+
 # Validar datos de empleado (nombre igual a código)
 VALIDAR_DATOS_EMPLEADO = True
 
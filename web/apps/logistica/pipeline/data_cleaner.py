@@ -3,20 +3,86 @@ Módulo de Limpieza de Datos
 Elimina duplicados y prepara los datos para procesamiento
 """
 
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
 import pandas as pd
 from . import config
+from .input_cache import InputCache
 from .logger import logger
 
 
+def _cargar_archivo_en_proceso(ruta_archivo):
+    """Carga un archivo del huellero en un proceso del pool (ver DataCleaner.procesar)."""
+    return DataCleaner().cargar_archivo(ruta_archivo)
+
+
 class DataCleaner:
     """Limpia y prepara los datos del huellero"""
 
     def __init__(self):
         """Inicializa el limpiador de datos"""
         self.df_original = None
+        self.registros_originales = 0
         self.df_limpio = None
         self.duplicados_eliminados = []
 
+    def _buscar_fila_encabezado(self, df_crudo):
+        """
+        Busca la fila de encabezado (la que contiene 'ID') en las primeras
+        filas del archivo leído sin encabezado.
+
+        Args:
+            df_crudo: DataFrame leído con header=None
+
+        Returns:
+            Posición de la fila de encabezado, o None si no se encuentra
+        """
+        if df_crudo.empty:
+            return None
+
+        # Encabezado en la primera fila: debe existir una columna 'ID' exacta
+        if (df_crudo.iloc[0] == 'ID').any():
+            return 0
+
+        df_inicio = df_crudo.iloc[1:config.FILAS_BUSQUEDA_ENCABEZADO]
+        contiene_id = df_inicio.astype(str).apply(
+            lambda col: col.str.contains('ID', regex=False)
+        ).any(axis=1)
+
+        if not contiene_id.any():
+            return None
+
+        return int(contiene_id.to_numpy().argmax()) + 1
+
+    def _nombres_columnas(self, fila_encabezado):
+        """
+        Genera los nombres de columna a partir de la fila de encabezado, con las
+        mismas convenciones de pandas ('Unnamed: n' para celdas vacías y sufijos
+        '.1', '.2' para nombres repetidos).
+
+        Args:
+            fila_encabezado: Series con los valores de la fila de encabezado
+
+        Returns:
+            Lista de nombres de columna
+        """
+        nombres = []
+        vistos = {}
+        for i, valor in enumerate(fila_encabezado.tolist()):
+            if pd.isna(valor) or str(valor) == '':
+                nombre = f"Unnamed: {i}"
+            else:
+                nombre = valor
+            if nombre in vistos:
+                vistos[nombre] += 1
+                nombre = f"{nombre}.{vistos[nombre]}"
+            else:
+                vistos[nombre] = 0
+            nombres.append(nombre)
+        return nombres
+
     def cargar_archivo(self, ruta_archivo):
         """
         Carga el archivo Excel del huellero
@@ -31,26 +97,25 @@ class DataCleaner:
         logger.info(f"Cargando archivo: {ruta_archivo}")
 
         try:
-            # Leer archivo Excel
-            df = pd.read_excel(ruta_archivo)
+            # Leer archivo Excel una sola vez, sin encabezado
+            df_crudo = pd.read_excel(ruta_archivo, header=None)
 
-            # Verificar si "ID" ya es columna del DataFrame
-            if 'ID' in df.columns:
-                # El encabezado ya fue detectado correctamente
-                pass
-            else:
-                # Identificar fila de encabezado (buscar "ID" en los datos)
-                header_row = None
-                for idx, row in df.iterrows():
-                    if 'ID' in str(row.values):
-                        header_row = idx
-                        break
+            # Identificar fila de encabezado dentro de las primeras filas
+            header_row = self._buscar_fila_encabezado(df_crudo)
 
-                if header_row is None:
-                    raise ValueError("No se encontró la fila de encabezado con 'ID'")
+            if header_row is None:
+                raise ValueError("No se encontró la fila de encabezado con 'ID'")
 
-                # Releer con el encabezado correcto
-                df = pd.read_excel(ruta_archivo, header=header_row + 1)
+            # Cortar en el pie de página (buscar "Fecha / Hora:" en la primera columna)
+            df_datos = df_crudo.iloc[header_row + 1:]
+            es_pie = df_datos.iloc[:, 0].astype(str).str.contains('Fecha / Hora:', regex=False)
+            es_pie &= df_datos.iloc[:, 0].notna()
+            if es_pie.any():
+                df_datos = df_datos.iloc[:int(es_pie.to_numpy().argmax())]
+
+            df = df_datos.set_axis(
+                self._nombres_columnas(df_crudo.iloc[header_row]), axis=1
+            ).reset_index(drop=True).infer_objects()
 
             # Renombrar columnas Unnamed basándose en los valores de la fila de encabezado
             # Las columnas son: [vacío, ID, Nombre, Fecha/Hora, Estado, vacío, vacío, Tipo de Registro]
@@ -69,20 +134,11 @@ class DataCleaner:
             if len(df) > 0 and str(df.iloc[0, 1]).strip() == 'ID':
                 df = df.iloc[1:]
 
-            # Eliminar filas después del pie de página (buscar "Fecha / Hora:")
-            pie_idx = None
-            for idx, row in df.iterrows():
-                if pd.notna(row.iloc[0]) and 'Fecha / Hora:' in str(row.iloc[0]):
-                    pie_idx = idx
-                    break
-
-            if pie_idx:
-                df = df.iloc[:pie_idx]
-
             # Reset index
             df = df.reset_index(drop=True)
 
             self.df_original = df
+            self.registros_originales = len(df)
             logger.info(f"✅ Archivo cargado: {len(df)} registros")
             logger.incrementar_stat('registros_procesados', len(df))
 
@@ -92,6 +148,94 @@ class DataCleaner:
             logger.error(f"Error al cargar archivo: {str(e)}")
             raise
 
+    def cargar_archivos(self, rutas):
+        """
+        Carga varios archivos del huellero en paralelo (un proceso por archivo).
+
+        La lectura de Excel es intensiva en CPU, por lo que se usa un pool de
+        procesos. Si el pool no está disponible se cargan en secuencia.
+
+        Args:
+            rutas: Lista de rutas a archivos .xls/.xlsx
+
+        Returns:
+            Lista de DataFrames en el mismo orden de las rutas
+        """
+        max_procesos = config.PROCESOS_CARGA_ARCHIVOS or os.cpu_count() or 1
+        max_procesos = min(max_procesos, len(rutas))
+
+        if max_procesos <= 1:
+            return [self.cargar_archivo(r) for r in rutas]
+
+        logger.info(f"Cargando {len(rutas)} archivos en paralelo ({max_procesos} procesos)")
+
+        try:
+            with ProcessPoolExecutor(max_workers=max_procesos) as pool:
+                dfs_crudos = list(pool.map(_cargar_archivo_en_proceso, rutas))
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning(f"Carga en paralelo no disponible ({e}); se cargan en secuencia")
+            return [self.cargar_archivo(r) for r in rutas]
+
+        # Las estadísticas de los procesos hijos no llegan al logger principal
+        for ruta, df in zip(rutas, dfs_crudos):
+            logger.info(f"✅ Archivo cargado: {ruta} ({len(df)} registros)")
+            logger.incrementar_stat('registros_procesados', len(df))
+
+        return dfs_crudos
+
+    def cargar_marcaciones(self, rutas, hashes_archivos=None):
+        """
+        Carga y limpia la estructura de uno o varios archivos, usando la caché
+        de archivos de entrada para no volver a leer Excel ya procesados.
+
+        Args:
+            rutas: Lista de rutas a archivos .xls/.xlsx
+            hashes_archivos: Lista opcional con el SHA-256 de cada archivo
+
+        Returns:
+            DataFrame con las marcaciones de todos los archivos, ordenado por
+            código y fecha
+        """
+        cache = InputCache()
+        claves = list(hashes_archivos) if hashes_archivos else [None] * len(rutas)
+        if cache.habilitada:
+            claves = [clave or cache.calcular_hash(ruta) for ruta, clave in zip(rutas, claves)]
+
+        # Registros de cada archivo antes de limpiar: la estadística es la misma
+        # con o sin caché
+        entradas = [cache.obtener(clave) for clave in claves]
+        dfs = [entrada[0] if entrada is not None else None for entrada in entradas]
+        registros_crudos = [entrada[1] if entrada is not None else 0 for entrada in entradas]
+        for ruta, entrada in zip(rutas, entradas):
+            if entrada is not None:
+                logger.info(f"✅ Archivo recuperado de caché: {ruta} ({entrada[1]} registros)")
+                logger.incrementar_stat('registros_procesados', entrada[1])
+
+        pendientes = [i for i, df in enumerate(dfs) if df is None]
+        if pendientes:
+            rutas_pendientes = [rutas[i] for i in pendientes]
+            if len(rutas_pendientes) > 1:
+                dfs_crudos = self.cargar_archivos(rutas_pendientes)
+            else:
+                dfs_crudos = [self.cargar_archivo(rutas_pendientes[0])]
+
+            for i, df_crudo in zip(pendientes, dfs_crudos):
+                registros_crudos[i] = len(df_crudo)
+                dfs[i] = self.limpiar_estructura(df_crudo)
+                cache.guardar(claves[i], dfs[i], registros_crudos[i])
+
+        if len(dfs) > 1:
+            df = pd.concat(dfs, ignore_index=True).sort_values(
+                ['CODIGO', 'FECHA_HORA'], kind='mergesort'
+            ).reset_index(drop=True)
+            logger.info(f"Archivos combinados: {len(df)} registros en total")
+        else:
+            df = dfs[0]
+
+        self.registros_originales = sum(registros_crudos)
+
+        return df
+
     def limpiar_estructura(self, df):
         """
         Limpia la estructura del DataFrame
@@ -105,17 +249,7 @@ class DataCleaner:
         logger.log_fase("LIMPIEZA DE ESTRUCTURA")
 
         # Renombrar columnas
-        columnas_nuevas = {
-            'ID': 'CODIGO',
-            'Nombre': 'NOMBRE',
-            'Nombre ': 'NOMBRE',  # Variante con espacio
-            'Fecha / Hora': 'FECHA_HORA',
-            'Estado': 'ESTADO',
-            'Tipo de Registro': 'TIPO'
-        }
-
-        # Intentar renombrar
-        for col_vieja, col_nueva in columnas_nuevas.items():
+        for col_vieja, col_nueva in config.COLUMNAS_ENTRADA.items():
             if col_vieja in df.columns:
                 df = df.rename(columns={col_vieja: col_nueva})
 
@@ -130,8 +264,9 @@ class DataCleaner:
 
         df = df[columnas_disponibles].copy()
 
-        # Convertir tipos de datos
-        df['CODIGO'] = pd.to_numeric(df['CODIGO'], errors='coerce')
+        # Convertir tipos de datos (CODIGO siempre float, como al leer el archivo
+        # con el encabezado repetido; calcular_observaciones compara str(codigo))
+        df['CODIGO'] = pd.to_numeric(df['CODIGO'], errors='coerce').astype(float)
         df['FECHA_HORA'] = pd.to_datetime(
             df['FECHA_HORA'],
             format=config.FORMATO_FECHA_INPUT,
@@ -166,69 +301,94 @@ class DataCleaner:
             return df
 
         df_limpio = df.copy()
-        indices_eliminar = set()
-
-        # Procesar por empleado
-        for codigo in df_limpio['CODIGO'].unique():
-            df_emp = df_limpio[df_limpio['CODIGO'] == codigo].sort_values('FECHA_HORA')
-            indices_emp = df_emp.index.tolist()
-
-            if len(indices_emp) <= 1:
-                continue
-
-            # Agrupar registros consecutivos dentro del umbral
-            grupo_actual = [indices_emp[0]]
-
-            for i in range(1, len(indices_emp)):
-                idx_actual = indices_emp[i]
-                idx_anterior = indices_emp[i - 1]
-
-                fecha_actual = df_limpio.loc[idx_actual, 'FECHA_HORA']
-                fecha_anterior = df_limpio.loc[idx_anterior, 'FECHA_HORA']
-                diff_seconds = (fecha_actual - fecha_anterior).total_seconds()
-
-                estado_actual = df_limpio.loc[idx_actual, 'ESTADO']
-                estado_anterior = df_limpio.loc[idx_anterior, 'ESTADO']
-
-                # Si está dentro del umbral y mismo tipo de estado
-                if diff_seconds <= config.UMBRAL_DUPLICADOS and (
-                    estado_actual == estado_anterior or pd.isna(estado_actual) or pd.isna(estado_anterior)
-                ):
-                    grupo_actual.append(idx_actual)
-                else:
-                    # Procesar grupo anterior: eliminar todos excepto el último
-                    if len(grupo_actual) > 1:
-                        for idx_eliminar in grupo_actual[:-1]:
-                            indices_eliminar.add(idx_eliminar)
-                            logger.log_duplicados(
-                                empleado=f"{df_limpio.loc[idx_eliminar, 'CODIGO']} - {df_limpio.loc[idx_eliminar, 'NOMBRE']}",
-                                fecha_hora=df_limpio.loc[idx_eliminar, 'FECHA_HORA'],
-                                cantidad=1
-                            )
-                    # Iniciar nuevo grupo
-                    grupo_actual = [idx_actual]
-
-            # Procesar último grupo
-            if len(grupo_actual) > 1:
-                for idx_eliminar in grupo_actual[:-1]:
-                    indices_eliminar.add(idx_eliminar)
-                    logger.log_duplicados(
-                        empleado=f"{df_limpio.loc[idx_eliminar, 'CODIGO']} - {df_limpio.loc[idx_eliminar, 'NOMBRE']}",
-                        fecha_hora=df_limpio.loc[idx_eliminar, 'FECHA_HORA'],
-                        cantidad=1
-                    )
+
+        # Orden por empleado y hora (estable para respetar el orden original en empates)
+        df_orden = df_limpio.sort_values(['CODIGO', 'FECHA_HORA'], kind='mergesort')
+        codigos = df_orden['CODIGO']
+        fechas = df_orden['FECHA_HORA']
+        estados = df_orden['ESTADO']
+
+        # Diferencias contra la marcación anterior del mismo empleado
+        mismo_empleado = codigos.eq(codigos.shift())
+        diff_seconds = fechas.diff().dt.total_seconds()
+
+        # Compatibles: dentro del umbral y mismo tipo de estado (o alguno sin estado)
+        estado_anterior = estados.shift()
+        estado_compatible = estados.eq(estado_anterior) | estados.isna() | estado_anterior.isna()
+        compatible = mismo_empleado & (diff_seconds <= config.UMBRAL_DUPLICADOS) & estado_compatible
+
+        # Cada marcación no compatible inicia un grupo; se conserva el último de cada grupo
+        grupo = (~compatible).cumsum()
+        mask_eliminar = grupo.eq(grupo.shift(-1))
+
+        df_eliminar = df_orden[mask_eliminar]
+        indices_eliminar = df_eliminar.index.tolist()
+
+        for codigo, nombre, fecha_hora in zip(
+            df_eliminar['CODIGO'], df_eliminar['NOMBRE'], df_eliminar['FECHA_HORA']
+        ):
+            logger.log_duplicados(
+                empleado=f"{codigo} - {nombre}",
+                fecha_hora=fecha_hora,
+                cantidad=1
+            )
 
         # Eliminar duplicados
-        df_limpio = df_limpio.drop(list(indices_eliminar)).reset_index(drop=True)
+        df_limpio = df_limpio.drop(indices_eliminar).reset_index(drop=True)
 
         total_eliminados = len(indices_eliminar)
         logger.info(f"✅ Duplicados eliminados: {total_eliminados} (se conservó el último de cada grupo)")
 
-        self.duplicados_eliminados = list(indices_eliminar)
+        self.duplicados_eliminados = indices_eliminar
         self.df_limpio = df_limpio
 
         return df_limpio
 
+    def _vecinos_linea_tiempo(self, df):
+        """
+        Calcula, para cada marcación, sus vecinos en la línea de tiempo del empleado:
+        el siguiente registro posterior y la última Entrada anterior.
+
+        Las marcaciones con la misma hora forman un bloque; los vecinos se buscan
+        en bloques distintos (estrictamente antes/después), con shift y ffill
+        agrupados por empleado.
+
+        Args:
+            df: DataFrame con columnas CODIGO, FECHA_HORA y ESTADO
+
+        Returns:
+            DataFrame alineado con df.index con columnas SIGUIENTE_FECHA_HORA,
+            SIGUIENTE_ESTADO y ULTIMA_ENTRADA (NaT/NaN si no existen)
+        """
+        df_orden = df[['CODIGO', 'FECHA_HORA', 'ESTADO']].sort_values(
+            ['CODIGO', 'FECHA_HORA'], kind='mergesort'
+        )
+        codigos = df_orden['CODIGO']
+        fechas = df_orden['FECHA_HORA']
+
+        # Bloques de marcaciones con la misma hora (por empleado)
+        inicio_bloque = codigos.ne(codigos.shift()) | fechas.ne(fechas.shift())
+        bloque = inicio_bloque.cumsum()
+
+        df_bloques = df_orden[inicio_bloque].set_axis(bloque[inicio_bloque])
+        df_bloques['ENTRADA_FECHA_HORA'] = (
+            fechas.where(df_orden['ESTADO'] == 'Entrada').groupby(bloque).max()
+        )
+        por_empleado = df_bloques.groupby('CODIGO', sort=False)
+
+        # Primer registro del bloque siguiente y última Entrada de bloques anteriores
+        df_bloques['SIGUIENTE_FECHA_HORA'] = por_empleado['FECHA_HORA'].shift(-1)
+        df_bloques['SIGUIENTE_ESTADO'] = por_empleado['ESTADO'].shift(-1)
+        df_bloques['ULTIMA_ENTRADA'] = (
+            por_empleado['ENTRADA_FECHA_HORA'].ffill()
+            .groupby(df_bloques['CODIGO'], sort=False).shift(1)
+        )
+
+        columnas = ['SIGUIENTE_FECHA_HORA', 'SIGUIENTE_ESTADO', 'ULTIMA_ENTRADA']
+        vecinos = df_bloques.loc[bloque.to_numpy(), columnas].set_axis(df_orden.index)
+
+        return vecinos.reindex(df.index)
+
     def autocorregir_estados_erroneos(self, df):
         """
         Corrige automáticamente registros con estados lógicamente incorrectos:
@@ -255,75 +415,66 @@ class DataCleaner:
         # (el próximo registro es una Salida en el día siguiente con hora < 11h)
         mask_pm_candidata = (
             (df_corregido['ESTADO'] == 'Entrada') &
-            (df_corregido['FECHA_HORA'].dt.hour >= 13) &
-            (df_corregido['FECHA_HORA'].dt.hour < 20)
+            config.clasificar_por_minuto(
+                df_corregido['FECHA_HORA'], config.TABLA_MINUTOS_CORRECCION_ENTRADA_PM
+            )
         )
         if getattr(config, 'VIGILANTE_CASTIGO_HABILITADO', False):
             codigos_vigilante = set(getattr(config, 'VIGILANTE_CASTIGO_CODIGOS', []))
             mask_vigilante = df_corregido['CODIGO'].astype('Int64').isin(codigos_vigilante)
             mask_pm_candidata = mask_pm_candidata & (~mask_vigilante)
 
-        excluir_pm = set()
-        if mask_pm_candidata.any():
-            for idx in df_corregido[mask_pm_candidata].index:
-                row = df_corregido.loc[idx]
-                siguientes = df_corregido[
-                    (df_corregido['CODIGO'] == row['CODIGO']) &
-                    (df_corregido['FECHA_HORA'] > row['FECHA_HORA'])
-                ]
-                if siguientes.empty:
-                    continue
-                siguiente = siguientes.loc[siguientes['FECHA_HORA'].idxmin()]
-                horas_diff = (siguiente['FECHA_HORA'] - row['FECHA_HORA']).total_seconds() / 3600
-                # Es inicio de turno nocturno: el siguiente registro es una Salida al día
-                # siguiente por la mañana, dentro de una ventana de turno razonable
-                if (
-                    siguiente['FECHA_HORA'].date() > row['FECHA_HORA'].date()
-                    and siguiente['FECHA_HORA'].hour < 11
-                    and siguiente['ESTADO'] == 'Salida'
-                    and 0 < horas_diff <= config.HORAS_MAXIMAS_TURNO
-                ):
-                    excluir_pm.add(idx)
-
-        mask_pm_erronea = mask_pm_candidata & ~df_corregido.index.isin(excluir_pm)
+        # Vecinos en la línea de tiempo ordenada de cada empleado
+        vecinos = self._vecinos_linea_tiempo(df_corregido)
+        fechas = df_corregido['FECHA_HORA']
+
+        siguiente = vecinos['SIGUIENTE_FECHA_HORA']
+        horas_diff_pm = (siguiente - fechas).dt.total_seconds() / 3600
+        # Es inicio de turno nocturno: el siguiente registro es una Salida al día
+        # siguiente por la mañana, dentro de una ventana de turno razonable
+        mask_excluir_pm = (
+            mask_pm_candidata
+            & (siguiente.dt.normalize() > fechas.dt.normalize())
+            & (siguiente.dt.hour < 11)
+            & vecinos['SIGUIENTE_ESTADO'].eq('Salida')
+            & (horas_diff_pm > 0)
+            & (horas_diff_pm <= config.HORAS_MAXIMAS_TURNO)
+        )
+        excluir_pm = int(mask_excluir_pm.sum())
+
+        mask_pm_erronea = mask_pm_candidata & ~mask_excluir_pm
 
         # --- REGLA 2: Salida AM (05:00 - 11:00) -> Entrada ---
         # EXCEPCIÓN: no corregir si es una salida válida de turno nocturno
         # (la última Entrada del empleado fue el día anterior por la tarde/noche, ≥ 14h)
         mask_am_candidata = (
             (df_corregido['ESTADO'] == 'Salida') &
-            (df_corregido['FECHA_HORA'].dt.hour >= 5) &
-            (df_corregido['FECHA_HORA'].dt.hour < 11)
+            config.clasificar_por_minuto(
+                df_corregido['FECHA_HORA'], config.TABLA_MINUTOS_CORRECCION_SALIDA_AM
+            )
+        )
+
+        ultima_entrada = vecinos['ULTIMA_ENTRADA']
+        horas_diff_am = (fechas - ultima_entrada).dt.total_seconds() / 3600
+        # Es salida nocturna válida: la última Entrada fue el día anterior por la
+        # tarde/noche (≥ 14h), cruzó medianoche, dentro de ventana de turno
+        mask_excluir_am = (
+            mask_am_candidata
+            & (ultima_entrada.dt.normalize() < fechas.dt.normalize())
+            & (ultima_entrada.dt.hour >= 14)
+            & (horas_diff_am > 0)
+            & (horas_diff_am <= config.HORAS_MAXIMAS_TURNO)
         )
+        excluir_am = int(mask_excluir_am.sum())
 
-        excluir_am = set()
-        if mask_am_candidata.any():
-            for idx in df_corregido[mask_am_candidata].index:
-                row = df_corregido.loc[idx]
-                previos_entrada = df_corregido[
-                    (df_corregido['CODIGO'] == row['CODIGO']) &
-                    (df_corregido['FECHA_HORA'] < row['FECHA_HORA']) &
-                    (df_corregido['ESTADO'] == 'Entrada')
-                ]
-                if previos_entrada.empty:
-                    continue
-                ultima_entrada = previos_entrada.loc[previos_entrada['FECHA_HORA'].idxmax()]
-                horas_diff = (row['FECHA_HORA'] - ultima_entrada['FECHA_HORA']).total_seconds() / 3600
-                # Es salida nocturna válida: la última Entrada fue el día anterior por la
-                # tarde/noche (≥ 14h), cruzó medianoche, dentro de ventana de turno
-                if (
-                    ultima_entrada['FECHA_HORA'].date() < row['FECHA_HORA'].date()
-                    and ultima_entrada['FECHA_HORA'].hour >= 14
-                    and 0 < horas_diff <= config.HORAS_MAXIMAS_TURNO
-                ):
-                    excluir_am.add(idx)
-
-        mask_am_erronea = mask_am_candidata & ~df_corregido.index.isin(excluir_am)
+        mask_am_erronea = mask_am_candidata & ~mask_excluir_am
 
         # --- REGLA 3: Salida Nocturna (20:00 - 23:59) -> Entrada ---
         mask_nocturna_erronea = (
             (df_corregido['ESTADO'] == 'Salida') &
-            (df_corregido['FECHA_HORA'].dt.hour >= 20)
+            config.clasificar_por_minuto(
+                df_corregido['FECHA_HORA'], config.TABLA_MINUTOS_CORRECCION_SALIDA_NOCTURNA
+            )
         )
 
         # Aplicar correcciones
@@ -337,29 +488,31 @@ class DataCleaner:
                 df_corregido.loc[mask, 'ESTADO'] = nuevo_estado
                 df_corregido.loc[mask, 'ESTADO_INFERIDO'] = True
 
-                indices = df_corregido[mask].index
-                for idx in indices:
-                    reg = df_corregido.loc[idx]
-                    logger.info(f"AUTO-CORRECCIÓN: {reg['CODIGO']} | {reg['FECHA_HORA']} | {motivo}")
+                df_mask = df_corregido[mask]
+                for codigo, fecha_hora in zip(df_mask['CODIGO'], df_mask['FECHA_HORA']):
+                    logger.info(f"AUTO-CORRECCIÓN: {codigo} | {fecha_hora} | {motivo}")
 
                 logger.info(f"✅ Se corrigieron {num_corr} registros: {motivo}")
 
         if excluir_pm:
-            logger.info(f"ℹ️  {len(excluir_pm)} Entrada(s) PM preservadas como inicio de turno nocturno")
+            logger.info(f"ℹ️  {excluir_pm} Entrada(s) PM preservadas como inicio de turno nocturno")
         if excluir_am:
-            logger.info(f"ℹ️  {len(excluir_am)} Salida(s) AM preservadas como fin de turno nocturno")
+            logger.info(f"ℹ️  {excluir_am} Salida(s) AM preservadas como fin de turno nocturno")
 
         return df_corregido
 
-    def procesar(self, ruta_archivo, codigos_excluidos=None):
+    def procesar(self, ruta_archivo, codigos_excluidos=None, hashes_archivos=None):
         """
         Procesa completo: carga, limpia estructura y elimina duplicados.
 
         Args:
             ruta_archivo: Ruta al archivo de entrada (str) o lista de rutas.
-                          Si se pasan dos archivos se combinan antes de procesar.
+                          Si se pasan varios archivos se cargan en paralelo y
+                          se combinan antes de procesar.
             codigos_excluidos: set/list de códigos (int) de empleados que deben
                                omitirse completamente del análisis. Opcional.
+            hashes_archivos: lista con el SHA-256 de cada archivo (mismo orden que
+                             las rutas), si ya se calculó al recibirlos. Opcional.
 
         Returns:
             DataFrame limpio sin los empleados excluidos.
@@ -369,16 +522,7 @@ class DataCleaner:
         else:
             rutas = [ruta_archivo]
 
-        dfs_crudos = [self.cargar_archivo(r) for r in rutas]
-
-        if len(dfs_crudos) > 1:
-            df = pd.concat(dfs_crudos, ignore_index=True)
-            self.df_original = df.copy()
-            logger.info(f"Archivos combinados: {len(df)} registros en total")
-        else:
-            df = dfs_crudos[0]
-
-        df = self.limpiar_estructura(df)
+        df = self.cargar_marcaciones(rutas, hashes_archivos)
 
         # Excluir empleados marcados en la BD
         if codigos_excluidos:
@@ -406,7 +550,7 @@ class DataCleaner:
             Dict con estadísticas
         """
         return {
-            'registros_originales': len(self.df_original) if self.df_original is not None else 0,
+            'registros_originales': self.registros_originales,
             'registros_limpios': len(self.df_limpio) if self.df_limpio is not None else 0,
             'duplicados_eliminados': len(self.duplicados_eliminados)
         }
@@ -0,0 +1,112 @@
+"""
+Módulo de Índice por Empleado y Día
+Agrupa una sola vez las marcaciones por (CODIGO, fecha) para que las fases
+del pipeline puedan consultar "los registros del empleado X en el día D"
+sin volver a recorrer todo el DataFrame
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+
+class DayIndex:
+    """Índice (CODIGO, fecha) → posiciones y minutos del día de las marcaciones"""
+
+    def __init__(self, df):
+        """
+        Construye el índice a partir de un DataFrame de marcaciones
+
+        Las posiciones son posicionales (iloc), por lo que el índice sirve para
+        cualquier DataFrame que conserve las mismas filas en el mismo orden
+        (por ejemplo, el resultado de la inferencia de estados).
+
+        Args:
+            df: DataFrame con columnas CODIGO y FECHA_HORA
+        """
+        fechas = df['FECHA_HORA']
+        self._minutos_registro = (fechas.dt.hour * 60 + fechas.dt.minute).to_numpy()
+
+        grupos = df.groupby([df['CODIGO'], fechas.dt.normalize()], sort=False)
+        # Número de grupo de cada fila (-1 si CODIGO o FECHA_HORA faltan)
+        self.id_por_fila = grupos.ngroup().fillna(-1).to_numpy(dtype=np.intp)
+        self.n_grupos = grupos.ngroups
+
+        self._posiciones = {
+            (codigo, dia.date()): posiciones
+            for (codigo, dia), posiciones in grupos.indices.items()
+        }
+        self._ids = {
+            clave: int(self.id_por_fila[posiciones[0]])
+            for clave, posiciones in self._posiciones.items()
+        }
+        self._minutos = {}
+
+    @staticmethod
+    def _clave(codigo, fecha):
+        """Normaliza la fecha (date, datetime o Timestamp) para la búsqueda."""
+        if isinstance(fecha, datetime):
+            fecha = fecha.date()
+        return codigo, fecha
+
+    def __len__(self):
+        return len(self._posiciones)
+
+    def __contains__(self, clave):
+        return self._clave(*clave) in self._posiciones
+
+    def grupos(self):
+        """
+        Recorre los grupos del índice en orden de aparición
+
+        Returns:
+            Iterador de ((codigo, fecha), posiciones)
+        """
+        return iter(self._posiciones.items())
+
+    def id_grupo(self, codigo, fecha):
+        """
+        Número de grupo del empleado en el día (índice en id_por_fila)
+
+        Args:
+            codigo: Código del empleado
+            fecha: date, datetime o Timestamp del día
+
+        Returns:
+            Entero entre 0 y n_grupos - 1, o -1 si no hay registros
+        """
+        return self._ids.get(self._clave(codigo, fecha), -1)
+
+    def posiciones(self, codigo, fecha):
+        """
+        Posiciones (iloc, ascendentes) de los registros del empleado en el día
+
+        Args:
+            codigo: Código del empleado
+            fecha: date, datetime o Timestamp del día
+
+        Returns:
+            Array de enteros (vacío si no hay registros)
+        """
+        return self._posiciones.get(self._clave(codigo, fecha), np.empty(0, dtype=np.intp))
+
+    def minutos(self, codigo, fecha):
+        """
+        Minutos del día (0-1439) ordenados de los registros del empleado en el día
+
+        Args:
+            codigo: Código del empleado
+            fecha: date, datetime o Timestamp del día
+
+        Returns:
+            Array de enteros ordenado (vacío si no hay registros)
+        """
+        clave = self._clave(codigo, fecha)
+        minutos = self._minutos.get(clave)
+        if minutos is None:
+            posiciones = self._posiciones.get(clave)
+            if posiciones is None:
+                return np.empty(0, dtype=self._minutos_registro.dtype)
+            minutos = np.sort(self._minutos_registro[posiciones])
+            self._minutos[clave] = minutos
+        return minutos
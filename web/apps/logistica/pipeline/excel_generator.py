@@ -5,13 +5,18 @@ Crea archivo Excel con formato profesional
 
 import pandas as pd
 import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from . import config
 from .logger import logger
+from .observation_flags import ObservationFlags
+from .xlsx_report_writer import XlsxReportWriter, XLSXWRITER_AVAILABLE
 
 try:
     from openpyxl import load_workbook
-    from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
+    from openpyxl.styles import PatternFill, Font, Alignment, Border, Side, NamedStyle
     from openpyxl.utils import get_column_letter
     from openpyxl.worksheet.datavalidation import DataValidation
     OPENPYXL_AVAILABLE = True
@@ -19,6 +24,20 @@ except ImportError:
     OPENPYXL_AVAILABLE = False
     logger.warning("openpyxl no disponible - formato limitado")
 
+if not XLSXWRITER_AVAILABLE:
+    logger.warning("xlsxwriter no disponible - el Excel se formatea con openpyxl")
+
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+def _generar_en_proceso(nombre_metodo, argumentos):
+    """Escribe un libro (generar_excel o generar_casos_especiales) en un proceso del pool."""
+    return getattr(ExcelGenerator(), nombre_metodo)(*argumentos)
+
 
 class ExcelGenerator:
     """Genera archivo Excel con formato"""
@@ -38,16 +57,51 @@ class ExcelGenerator:
         nombre = f"{config.PREFIJO_OUTPUT}_{timestamp}.xlsx"
         return os.path.join(config.DIR_OUTPUT, nombre)
 
-    def crear_hoja_resumen(self, writer, stats):
+    @staticmethod
+    def preparar_valores_excel(df):
         """
-        Crea hoja de resumen con estadísticas
+        Adapta las columnas tipadas a valores que Excel guarda de forma nativa:
+        las horas de ingreso/salida pasan a fracción del día (hora de Excel)
+
+        Args:
+            df: DataFrame de resultados
+
+        Returns:
+            DataFrame nuevo listo para escribir
+        """
+        df = df.copy()
+        for columna in config.COLUMNAS_HORA_EXCEL:
+            if columna in df.columns and pd.api.types.is_datetime64_any_dtype(df[columna]):
+                df[columna] = ((df[columna] - df[columna].dt.normalize()) / pd.Timedelta(days=1)).fillna(0.0)
+        return df
+
+    @staticmethod
+    def aplicar_formatos_numero(ws):
+        """
+        Asigna el formato nativo de fecha/hora/número (config.FORMATOS_EXCEL)
+        a las columnas de la hoja que lo tengan
+
+        Args:
+            ws: Hoja de openpyxl con encabezados en la fila 1
+        """
+        for col_num, cell in enumerate(ws[1], 1):
+            formato = config.FORMATOS_EXCEL.get(cell.value)
+            if formato:
+                for (celda,) in ws.iter_rows(min_row=2, min_col=col_num, max_col=col_num):
+                    celda.number_format = formato
+
+    def datos_hoja_resumen(self, stats):
+        """
+        Datos de la hoja de resumen con estadísticas
 
         Args:
-            writer: ExcelWriter
             stats: Dict con estadísticas
+
+        Returns:
+            DataFrame (Métrica, Valor) o None si la hoja está deshabilitada
         """
         if not config.GENERAR_HOJA_RESUMEN:
-            return
+            return None
 
         resumen_data = {
             'Métrica': [
@@ -74,18 +128,62 @@ class ExcelGenerator:
             ]
         }
 
-        df_resumen = pd.DataFrame(resumen_data)
-        df_resumen.to_excel(writer, sheet_name='Resumen', index=False)
+        return pd.DataFrame(resumen_data)
+
+    def crear_hoja_resumen(self, writer, stats):
+        """
+        Crea hoja de resumen con estadísticas
 
+        Args:
+            writer: ExcelWriter
+            stats: Dict con estadísticas
+        """
+        df_resumen = self.datos_hoja_resumen(stats)
+        if df_resumen is None:
+            return
+
+        df_resumen.to_excel(writer, sheet_name='Resumen', index=False)
         logger.info("Hoja de resumen creada")
 
-    def aplicar_formato(self, ruta_archivo, nombre_hoja='Reporte'):
+    @staticmethod
+    def ancho_columna(nombre_hoja, titulo):
+        """Ancho (en caracteres) de una columna según la hoja y su encabezado."""
+        if titulo == 'OBSERVACION':
+            return 50
+        if titulo == 'NOMBRE COMPLETO DEL COLABORADOR':
+            return 35
+        return config.ANCHOS_COLUMNAS.get(titulo, 20) if nombre_hoja == 'Reporte' else 25
+
+    @staticmethod
+    def clase_color_agrupacion(observacion):
+        """
+        Color de fila (clave de config.COLORES, '' sin color) de las hojas de
+        agrupación ('Horas por Empleado', 'Resumen por Cargo'), cuya OBSERVACION
+        se arma en datos_hoja_empleados / datos_hoja_cargos: sin observaciones
+        en verde y alertas en naranja. El Reporte usa las banderas
+        (ObservationFlags.clases_color)
+
+        Args:
+            observacion: Texto de la columna OBSERVACION de la hoja de agrupación
+
+        Returns:
+            String con la clave del color
+        """
+        if observacion == config.OBSERVACIONES['OK']:
+            return 'VERDE'
+        if isinstance(observacion, str) and observacion.startswith('ALERTA'):
+            return 'NARANJA'
+        return ''
+
+    def aplicar_formato(self, ruta_archivo, nombre_hoja='Reporte', clases_filas=None):
         """
         Aplica formato al archivo Excel
 
         Args:
             ruta_archivo: Ruta al archivo
             nombre_hoja: Nombre de la hoja a formatear
+            clases_filas: Color de cada fila de datos (ObservationFlags.clases_color).
+                          Si es None (hojas de agrupación) se usa clase_color_agrupacion
         """
         if not OPENPYXL_AVAILABLE:
             logger.warning("No se puede aplicar formato - openpyxl no disponible")
@@ -100,12 +198,10 @@ class ExcelGenerator:
 
                 # Colores
                 color_encabezado = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
-                color_ok = PatternFill(start_color=config.COLORES['VERDE'][1:], end_color=config.COLORES['VERDE'][1:], fill_type='solid')
-                color_advertencia = PatternFill(start_color=config.COLORES['AMARILLO'][1:], end_color=config.COLORES['AMARILLO'][1:], fill_type='solid')
-                color_error = PatternFill(start_color=config.COLORES['NARANJA'][1:], end_color=config.COLORES['NARANJA'][1:], fill_type='solid')
-                color_nocturno = PatternFill(start_color=config.COLORES['AZUL'][1:], end_color=config.COLORES['AZUL'][1:], fill_type='solid')
-                color_morado = PatternFill(start_color=config.COLORES['MORADO'][1:], end_color=config.COLORES['MORADO'][1:], fill_type='solid')
-                color_gris = PatternFill(start_color=config.COLORES['GRIS'][1:], end_color=config.COLORES['GRIS'][1:], fill_type='solid')
+                colores_fila = {
+                    clave: PatternFill(start_color=color[1:], end_color=color[1:], fill_type='solid')
+                    for clave, color in config.COLORES.items()
+                }
 
                 # Fuentes
                 font_encabezado = Font(bold=True, color='FFFFFF', size=11)
@@ -123,82 +219,66 @@ class ExcelGenerator:
                     bottom=Side(style='thin')
                 )
 
+                # Estilos compartidos: uno por combinación de color de fila,
+                # alineación y formato de número, registrado una vez en el libro
+                estilos = {}
+
+                def estilo(clase, centrado, formato_numero):
+                    clave = (clase, centrado, formato_numero)
+                    if clave not in estilos:
+                        nombre = f"Reporte {clase or 'SIN COLOR'} {'C' if centrado else 'I'} {formato_numero or 'General'}"
+                        if nombre not in wb.named_styles:
+                            est = NamedStyle(
+                                name=nombre, font=font_normal, border=border_delgado,
+                                alignment=align_center if centrado else align_left,
+                                number_format=formato_numero or 'General'
+                            )
+                            if clase:
+                                est.fill = colores_fila[clase]
+                            wb.add_named_style(est)
+                        estilos[clave] = nombre
+                    return estilos[clave]
+
                 # Nombres de columnas de esta hoja
                 headers = []
                 for cell in ws[1]:
                     headers.append(cell.value)
 
                 # Aplicar formato a encabezados
+                if 'Reporte Encabezado' not in wb.named_styles:
+                    wb.add_named_style(NamedStyle(
+                        name='Reporte Encabezado', fill=color_encabezado, font=font_encabezado,
+                        alignment=align_center, border=border_delgado
+                    ))
                 for col_num, column_title in enumerate(headers, 1):
-                    cell = ws.cell(row=1, column=col_num)
-                    cell.fill = color_encabezado
-                    cell.font = font_encabezado
-                    cell.alignment = align_center
-                    cell.border = border_delgado
+                    ws.cell(row=1, column=col_num).style = 'Reporte Encabezado'
 
                     # Ajustar ancho de columna
                     col_letter = get_column_letter(col_num)
-                    ancho = config.ANCHOS_COLUMNAS.get(column_title, 20) if nombre_hoja == 'Reporte' else 25
-                    if column_title == 'OBSERVACION': ancho = 50
-                    if column_title == 'NOMBRE COMPLETO DEL COLABORADOR': ancho = 35
-                    ws.column_dimensions[col_letter].width = ancho
+                    ws.column_dimensions[col_letter].width = self.ancho_columna(nombre_hoja, column_title)
 
                 # Buscar indice de columna observacion
-                obs_col_idx = None
-                for i, header in enumerate(headers, 1):
-                    if header == 'OBSERVACION':
-                        obs_col_idx = i
-                        break
-
-                # Aplicar formato a datos
-                for row_num in range(2, ws.max_row + 1):
-                    # Obtener observación si existe
-                    observacion = ''
-                    if obs_col_idx:
-                        obs_cell = ws.cell(row=row_num, column=obs_col_idx)
-                        observacion = obs_cell.value or ''
+                obs_col_idx = headers.index('OBSERVACION') if 'OBSERVACION' in headers else None
 
-                    # Determinar color de fila
-                    fill_color = None
-                    obs_txt = str(observacion).strip()
-                    es_solo_exceso_horas = (
-                        '|' not in obs_txt
-                        and (
-                            'EXCEDE LÍMITE DE HORAS DEL CARGO' in obs_txt
-                            or config.OBSERVACIONES.get('EXCEDE_JORNADA', '') in obs_txt
-                        )
-                    )
-
-                    if 'OK' in observacion or observacion == config.OBSERVACIONES.get('OK', 'Sin observaciones'):
-                        fill_color = color_ok
-                    elif es_solo_exceso_horas:
-                        fill_color = color_gris
-                    elif observacion == config.OBSERVACIONES.get('SIN_REGISTROS', 'SIN REGISTROS'):
-                        fill_color = color_nocturno
-                    elif config.OBSERVACIONES.get('SALIDA_ESTANDAR_NOCTURNA') in observacion:
-                        fill_color = color_morado
-                    elif 'TURNO_NOCTURNO' in observacion:
-                        fill_color = color_nocturno
-                    elif 'ALERTA' in observacion:
-                        fill_color = color_error
-                    elif observacion and observacion != config.OBSERVACIONES.get('OK', 'Sin observaciones'):
-                        fill_color = color_advertencia
-
-                    # Aplicar formato a todas las celdas de la fila
-                    for col_num in range(1, len(headers) + 1):
-                        cell = ws.cell(row=row_num, column=col_num)
-                        cell.font = font_normal
-                        cell.border = border_delgado
+                formatos_numero = [config.FORMATOS_EXCEL.get(h) for h in headers]
+                centradas = [h in ['SEMANA DEL AÑO', 'CANTIDAD EMPLEADOS'] for h in headers]
 
+                # Aplicar formato a datos (un estilo por celda, sin armar objetos por celda)
+                for i, fila in enumerate(ws.iter_rows(min_row=2, max_col=len(headers))):
+                    # Determinar color de fila
+                    if clases_filas is not None:
+                        clase = clases_filas[i]
+                    else:
+                        observacion = ''
+                        if obs_col_idx is not None:
+                            observacion = fila[obs_col_idx].value or ''
+                        clase = self.clase_color_agrupacion(observacion)
+                    clase = clase if clase in colores_fila else ''
+
+                    for col, cell in enumerate(fila):
                         # Alineación según columna (centrar numéricas)
-                        if isinstance(cell.value, (int, float)) or headers[col_num-1] in ['SEMANA DEL AÑO', 'CANTIDAD EMPLEADOS']:
-                            cell.alignment = align_center
-                        else:
-                            cell.alignment = align_left
-
-                        # Color de fondo
-                        if fill_color:
-                            cell.fill = fill_color
+                        centrado = isinstance(cell.value, (int, float)) or centradas[col]
+                        cell.style = estilo(clase, centrado, formatos_numero[col])
 
                 # Congelar primera fila
                 ws.freeze_panes = 'A2'
@@ -228,21 +308,28 @@ class ExcelGenerator:
         except Exception as e:
             logger.error(f"Error al aplicar formato en {nombre_hoja}: {str(e)}")
 
-    def crear_hoja_empleados(self, writer, df_resultado):
+    def datos_hoja_empleados(self, df_resultado):
         """
-        Crea hoja agrupada por empleado y horas por semana
+        Datos de la hoja agrupada por empleado y horas por semana
+
+        Returns:
+            DataFrame o None si no hay datos o falla el cálculo
         """
         if df_resultado.empty:
-            return
+            return None
 
         try:
-            df = df_resultado.copy()
-            # Calcular fecha datetime y extraer semana
-            df['FECHA_DT'] = pd.to_datetime(df['FECHA'], format=config.FORMATO_FECHA_OUTPUT)
-            df['SEMANA'] = df['FECHA_DT'].dt.isocalendar().week
-
-            # Convertir horas a numerico
-            df['HORAS_NUM'] = pd.to_numeric(df['TOTAL HORAS LABORADAS'], errors='coerce').fillna(0)
+            # Solo las columnas que usa la agrupación (sin copiar el reporte completo)
+            df = df_resultado[[
+                c for c in ('CODIGO COLABORADOR', 'NOMBRE COMPLETO DEL COLABORADOR', 'CARGO', 'FECHA',
+                            'TOTAL HORAS LABORADAS', 'LIMITE_HORAS_SEMANA')
+                if c in df_resultado.columns
+            ]].copy()
+            # Extraer semana de la fecha
+            df['SEMANA'] = df['FECHA'].dt.isocalendar().week
+
+            # Horas (float; días sin horas cuentan 0)
+            df['HORAS_NUM'] = df['TOTAL HORAS LABORADAS'].fillna(0)
 
             group_cols = ['CODIGO COLABORADOR', 'NOMBRE COMPLETO DEL COLABORADOR', 'CARGO', 'SEMANA']
             if 'LIMITE_HORAS_SEMANA' in df.columns:
@@ -268,26 +355,40 @@ class ExcelGenerator:
             renames = {'SEMANA': 'SEMANA DEL AÑO', 'LIMITE_HORAS_SEMANA': 'LÍMITE HORAS SEMANA', 'TOTAL_HORAS_SEMANA': 'TOTAL HORAS SEMANA'}
             df_agrupado = df_agrupado.rename(columns=renames)
 
-            # Guardar en excel
-            df_agrupado.to_excel(writer, sheet_name='Horas por Empleado', index=False)
-            logger.info("Hoja de 'Horas por Empleado' creada")
+            return df_agrupado
         except Exception as e:
             logger.error(f"Error al generar hoja Horas por Empleado: {str(e)}")
+            return None
 
-    def crear_hoja_cargos(self, writer, df_resultado):
+    def crear_hoja_empleados(self, writer, df_resultado):
         """
-        Crea hoja agrupada por cargo y cuenta alertas
+        Crea hoja agrupada por empleado y horas por semana
+        """
+        df_agrupado = self.datos_hoja_empleados(df_resultado)
+        if df_agrupado is not None:
+            df_agrupado.to_excel(writer, sheet_name='Horas por Empleado', index=False)
+            logger.info("Hoja de 'Horas por Empleado' creada")
+
+    def datos_hoja_cargos(self, df_resultado):
+        """
+        Datos de la hoja agrupada por cargo con conteo de alertas
+
+        Returns:
+            DataFrame o None si no hay datos o falla el cálculo
         """
         if df_resultado.empty or 'CARGO' not in df_resultado.columns:
-            return
+            return None
 
         try:
-            df = df_resultado.copy()
+            df = df_resultado[[
+                c for c in ('CARGO', 'COLABORADORES_ESPERADOS', 'CODIGO COLABORADOR',
+                            ObservationFlags.COLUMNA)
+                if c in df_resultado.columns
+            ]].copy()
             # Contar exceso de limites
-            def tiene_alerta_exceso(obs):
-                return 1 if isinstance(obs, str) and 'EXCEDE LÍMITE DE HORAS DEL CARGO' in obs else 0
-
-            df['ALERTA_EXCESO'] = df['OBSERVACION'].apply(tiene_alerta_exceso)
+            df['ALERTA_EXCESO'] = (
+                (df[ObservationFlags.COLUMNA].to_numpy(dtype='int64') & ObservationFlags.EXCEDE_LIMITE_CARGO) != 0
+            ).astype(int)
 
             group_cols = ['CARGO']
             if 'COLABORADORES_ESPERADOS' in df.columns:
@@ -321,11 +422,45 @@ class ExcelGenerator:
             # Filtrar cargos vacíos
             df_agrupado = df_agrupado[df_agrupado['CARGO'] != '']
 
-            # Guardar en excel
+            return df_agrupado
+        except Exception as e:
+            logger.error(f"Error al generar hoja Resumen por Cargo: {str(e)}")
+            return None
+
+    def crear_hoja_cargos(self, writer, df_resultado):
+        """
+        Crea hoja agrupada por cargo y cuenta alertas
+        """
+        df_agrupado = self.datos_hoja_cargos(df_resultado)
+        if df_agrupado is not None:
             df_agrupado.to_excel(writer, sheet_name='Resumen por Cargo', index=False)
             logger.info("Hoja de 'Resumen por Cargo' creada")
+
+    def datos_hoja_conceptos(self, df_conceptos):
+        """
+        Valores únicos y ordenados para el dropdown de OBSERVACIONES_1
+
+        Args:
+            df_conceptos: DataFrame con columna 'observaciones' (o None)
+
+        Returns:
+            DataFrame de una columna o None
+        """
+        if df_conceptos is None or 'observaciones' not in df_conceptos.columns:
+            return None
+
+        try:
+            conceptos = (
+                df_conceptos[['observaciones']]
+                .copy()
+                .dropna()
+            )
+            conceptos['observaciones'] = conceptos['observaciones'].astype(str).str.strip()
+            conceptos = conceptos[conceptos['observaciones'] != '']
+            return conceptos.drop_duplicates().sort_values('observaciones')
         except Exception as e:
-            logger.error(f"Error al generar hoja Resumen por Cargo: {str(e)}")
+            logger.warning(f"No se pudo crear hoja de Conceptos: {str(e)}")
+            return None
 
     def generar_excel(self, df_resultado, stats=None, df_conceptos=None):
         """
@@ -348,51 +483,170 @@ class ExcelGenerator:
         # Generar nombre de archivo
         ruta_salida = self.generar_nombre_archivo()
 
-        # Crear archivo Excel
+        # Hoja principal: columnas de salida primero (OBSERVACION reemplaza a las banderas)
+        columnas = list(ObservationFlags.renderizar(df_resultado.iloc[:0]).columns)
+        columnas_reporte = [c for c in config.COLUMNAS_OUTPUT if c in columnas]
+        if columnas_reporte:
+            columnas = columnas_reporte + [c for c in columnas if c not in columnas_reporte]
+
+        if XLSXWRITER_AVAILABLE:
+            self._escribir_excel_xlsxwriter(ruta_salida, df_resultado, columnas, stats, df_conceptos)
+        else:
+            self._escribir_excel_openpyxl(ruta_salida, df_resultado, columnas, stats, df_conceptos)
+
+        self.archivo_salida = ruta_salida
+
+        logger.info(config.MENSAJES['excel_generado'])
+        logger.info(f"Archivo guardado en: {ruta_salida}")
+
+        return ruta_salida
+
+    def generar_reportes(self, df_resultado, stats=None, df_conceptos=None):
+        """
+        Genera el reporte principal y el archivo de casos de revisión. Los dos
+        libros son independientes: si el volumen lo amerita cada uno se escribe
+        en su propio proceso (config.PROCESOS_GENERACION_EXCEL) y se espera a
+        ambos antes de retornar
+
+        Args:
+            df_resultado: DataFrame con resultados finales
+            stats: Dict con estadísticas (opcional)
+            df_conceptos: DataFrame para el dropdown de OBSERVACIONES_1 (opcional)
+
+        Returns:
+            Tupla (ruta del reporte, ruta del archivo de casos o None)
+        """
+        trabajos = [
+            ('generar_excel', (df_resultado, stats, df_conceptos)),
+            ('generar_casos_especiales', (df_resultado,)),
+        ]
+        max_procesos = config.PROCESOS_GENERACION_EXCEL or os.cpu_count() or 1
+        max_procesos = min(max_procesos, len(trabajos))
+
+        if max_procesos <= 1 or len(df_resultado) < config.REGISTROS_MINIMOS_PARALELO:
+            rutas = [getattr(self, metodo)(*argumentos) for metodo, argumentos in trabajos]
+        else:
+            logger.info(f"Generando reporte y casos de revisión en paralelo ({max_procesos} procesos)")
+            try:
+                with ProcessPoolExecutor(max_workers=max_procesos) as pool:
+                    rutas = list(pool.map(_generar_en_proceso, *zip(*trabajos)))
+            except (BrokenProcessPool, OSError) as e:
+                logger.warning(f"Generación en paralelo no disponible ({e}); se genera en secuencia")
+                rutas = [getattr(self, metodo)(*argumentos) for metodo, argumentos in trabajos]
+
+        ruta_salida, ruta_casos = rutas
+        self.archivo_salida = ruta_salida
+        return ruta_salida, ruta_casos
+
+    def bloques_reporte(self, df_resultado, columnas):
+        """
+        Recorre el reporte en bloques de config.FILAS_POR_BLOQUE_EXCEL filas,
+        armando el texto de OBSERVACION y los valores de Excel solo del bloque
+
+        Args:
+            df_resultado: DataFrame con resultados finales (con banderas)
+            columnas: Columnas de la hoja Reporte, en orden
+
+        Yields:
+            (DataFrame del bloque listo para escribir, clases de color o None)
+        """
+        for inicio in range(0, len(df_resultado), config.FILAS_POR_BLOQUE_EXCEL):
+            bloque = df_resultado.iloc[inicio:inicio + config.FILAS_POR_BLOQUE_EXCEL]
+            clases_filas = None
+            if ObservationFlags.COLUMNA in bloque.columns:
+                clases_filas = ObservationFlags.clases_color(bloque[ObservationFlags.COLUMNA])
+            df_bloque = ObservationFlags.renderizar(bloque)[columnas]
+            yield self.preparar_valores_excel(df_bloque), clases_filas
+
+    def _escribir_excel_xlsxwriter(self, ruta_salida, df_resultado, columnas, stats, df_conceptos):
+        """Escribe el libro completo con XlsxWriter, aplicando el formato en la misma pasada."""
+        libro = XlsxReportWriter(ruta_salida)
+
+        # Las agrupaciones se calculan en otros hilos mientras se escribe el Reporte
+        with ThreadPoolExecutor(max_workers=2) as hilos:
+            futuro_empleados = hilos.submit(self.datos_hoja_empleados, df_resultado)
+            futuro_cargos = hilos.submit(self.datos_hoja_cargos, df_resultado)
+
+            hojas_reporte = libro.escribir_bloques(
+                'Reporte', columnas, self.bloques_reporte(df_resultado, columnas),
+                anchos=[self.ancho_columna('Reporte', c) for c in columnas]
+            )
+            if len(hojas_reporte) > 1:
+                logger.info(f"Reporte dividido en {len(hojas_reporte)} hojas por el límite de filas de Excel")
+
+            hojas_agrupadas = (
+                ('Horas por Empleado', futuro_empleados.result()),
+                ('Resumen por Cargo', futuro_cargos.result()),
+            )
+
+        # Hojas de agrupación (color de fila según el texto de su observación)
+        for nombre_hoja, df_hoja in hojas_agrupadas:
+            if df_hoja is None:
+                continue
+            clases_hoja = None
+            if 'OBSERVACION' in df_hoja.columns:
+                clases_hoja = [self.clase_color_agrupacion(obs) for obs in df_hoja['OBSERVACION'].tolist()]
+            libro.escribir_hoja(
+                nombre_hoja, df_hoja, clases_hoja,
+                anchos=[self.ancho_columna(nombre_hoja, c) for c in df_hoja.columns]
+            )
+            logger.info(f"Hoja de '{nombre_hoja}' creada")
+
+        # Hoja de Conceptos (para validación de datos en OBSERVACIONES_1)
+        conceptos = self.datos_hoja_conceptos(df_conceptos)
+        if conceptos is not None:
+            libro.escribir_hoja('Conceptos', conceptos, con_formato=False)
+            logger.info(f"Hoja 'Conceptos' creada con {len(conceptos)} valores para dropdown de OBSERVACIONES_1")
+
+            if 'OBSERVACIONES_1' in columnas:
+                if len(conceptos) > 0:
+                    for nombre_hoja, n_filas in hojas_reporte:
+                        libro.agregar_lista_validacion(
+                            nombre_hoja, columnas.index('OBSERVACIONES_1'), n_filas,
+                            f"=Conceptos!$A$2:$A${len(conceptos) + 1}"
+                        )
+                # Ocultar la hoja de conceptos para que quede limpio el reporte
+                libro.ocultar_hoja('Conceptos')
+
+        # Hoja de resumen
+        if stats:
+            df_resumen = self.datos_hoja_resumen(stats)
+            if df_resumen is not None:
+                libro.escribir_hoja('Resumen', df_resumen, con_formato=False)
+                logger.info("Hoja de resumen creada")
+
+        libro.cerrar()
+
+    def _escribir_excel_openpyxl(self, ruta_salida, df_resultado, columnas, stats, df_conceptos):
+        """Escribe el libro con pandas/openpyxl y luego aplica el formato hoja por hoja."""
+        # Color de cada fila según sus banderas; el texto de OBSERVACION se arma aquí
+        clases_filas = None
+        if ObservationFlags.COLUMNA in df_resultado.columns:
+            clases_filas = ObservationFlags.clases_color(df_resultado[ObservationFlags.COLUMNA])
+        df_reporte = ObservationFlags.renderizar(df_resultado)[columnas]
+
         with pd.ExcelWriter(ruta_salida, engine='openpyxl') as writer:
-            # Hoja principal
-            columnas_reporte = [c for c in config.COLUMNAS_OUTPUT if c in df_resultado.columns]
-            if columnas_reporte:
-                faltantes = [c for c in df_resultado.columns if c not in columnas_reporte]
-                df_resultado = df_resultado[columnas_reporte + faltantes]
-            df_resultado.to_excel(writer, sheet_name='Reporte', index=False)
+            self.preparar_valores_excel(df_reporte).to_excel(writer, sheet_name='Reporte', index=False)
 
             # Nuevas Hojas de Agrupación
-            self.crear_hoja_empleados(writer, df_resultado)
+            self.crear_hoja_empleados(writer, df_reporte)
             self.crear_hoja_cargos(writer, df_resultado)
 
             # Hoja de Conceptos (para validación de datos en OBSERVACIONES_1)
-            if df_conceptos is not None and 'observaciones' in df_conceptos.columns:
-                try:
-                    conceptos = (
-                        df_conceptos[['observaciones']]
-                        .copy()
-                        .dropna()
-                    )
-                    conceptos['observaciones'] = conceptos['observaciones'].astype(str).str.strip()
-                    conceptos = conceptos[conceptos['observaciones'] != '']
-                    conceptos = conceptos.drop_duplicates().sort_values('observaciones')
-                    conceptos.to_excel(writer, sheet_name='Conceptos', index=False)
-                    logger.info(f"Hoja 'Conceptos' creada con {len(conceptos)} valores para dropdown de OBSERVACIONES_1")
-                except Exception as e:
-                    logger.warning(f"No se pudo crear hoja de Conceptos: {str(e)}")
+            conceptos = self.datos_hoja_conceptos(df_conceptos)
+            if conceptos is not None:
+                conceptos.to_excel(writer, sheet_name='Conceptos', index=False)
+                logger.info(f"Hoja 'Conceptos' creada con {len(conceptos)} valores para dropdown de OBSERVACIONES_1")
 
             # Hoja de resumen
             if stats:
                 self.crear_hoja_resumen(writer, stats)
 
         # Aplicar formato
-        self.aplicar_formato(ruta_salida, 'Reporte')
+        self.aplicar_formato(ruta_salida, 'Reporte', clases_filas)
         self.aplicar_formato(ruta_salida, 'Horas por Empleado')
         self.aplicar_formato(ruta_salida, 'Resumen por Cargo')
 
-        self.archivo_salida = ruta_salida
-
-        logger.info(config.MENSAJES['excel_generado'])
-        logger.info(f"Archivo guardado en: {ruta_salida}")
-
-        return ruta_salida
-
     def generar_casos_especiales(self, df_resultado):
         """
         Genera archivo con casos que requieren revisión manual
@@ -407,12 +661,9 @@ class ExcelGenerator:
             return None
 
         # Filtrar casos especiales
-        casos = df_resultado[
-            (df_resultado['OBSERVACION'].str.contains('ALERTA', na=False)) |
-            (df_resultado['OBSERVACION'].str.contains('REQUIERE', na=False)) |
-            (df_resultado['OBSERVACION'].str.contains('INDEFINIDO', na=False)) |
-            (df_resultado['OBSERVACION'].str.contains('DATOS_CORRUPTOS', na=False))
-        ].copy()
+        casos = ObservationFlags.renderizar(
+            df_resultado[ObservationFlags.es_caso_revision(df_resultado[ObservationFlags.COLUMNA])]
+        )
 
         if len(casos) == 0:
             logger.info("No hay casos especiales para revisar")
@@ -423,9 +674,103 @@ class ExcelGenerator:
         nombre = f"CASOS_REVISION_{timestamp}.xlsx"
         ruta = os.path.join(config.DIR_OUTPUT, nombre)
 
-        casos.to_excel(ruta, index=False)
+        if XLSXWRITER_AVAILABLE:
+            libro = XlsxReportWriter(ruta)
+            libro.escribir_hoja('Sheet1', self.preparar_valores_excel(casos), con_formato=False)
+            libro.cerrar()
+        else:
+            with pd.ExcelWriter(ruta, engine='openpyxl') as writer:
+                self.preparar_valores_excel(casos).to_excel(writer, index=False)
+                self.aplicar_formatos_numero(writer.sheets['Sheet1'])
 
         logger.info(f"Archivo de casos especiales generado: {ruta}")
         logger.info(f"Total casos para revisión: {len(casos)}")
 
         return ruta
+
+    def datos_exportacion(self, df_resultado):
+        """
+        Datos del reporte para los formatos de exportación: columnas de
+        config.COLUMNAS_OUTPUT con sus tipos (fechas y horas como datetime,
+        horas laboradas como float) y el texto de OBSERVACION
+
+        Args:
+            df_resultado: DataFrame con resultados finales
+
+        Returns:
+            DataFrame nuevo
+        """
+        df = ObservationFlags.renderizar(df_resultado)
+        return df[[c for c in config.COLUMNAS_OUTPUT if c in df.columns]]
+
+    def exportar(self, df_exportacion, formato, ruta_base):
+        """
+        Escribe los datos en un formato de exportación (sin pasar por Excel)
+
+        Args:
+            df_exportacion: DataFrame de datos_exportacion
+            formato: 'csv' (gzip), 'parquet' o 'ndjson'
+            ruta_base: Ruta sin extensión del archivo a escribir
+
+        Returns:
+            Ruta al archivo generado
+        """
+        if formato not in config.FORMATOS_EXPORTACION:
+            raise ValueError(f"Formato de exportación no soportado: {formato}")
+        ruta = ruta_base + config.FORMATOS_EXPORTACION[formato]
+
+        if formato == 'csv':
+            df_exportacion.to_csv(ruta, index=False, compression='gzip', encoding='utf-8')
+        elif formato == 'parquet':
+            if not PYARROW_AVAILABLE:
+                raise ValueError("Formato parquet no disponible: falta pyarrow")
+            df_exportacion.to_parquet(ruta, index=False)
+        elif formato == 'ndjson':
+            df_exportacion.to_json(
+                ruta, orient='records', lines=True, date_format='iso', force_ascii=False
+            )
+        else:
+            raise ValueError(f"Formato de exportación no soportado: {formato}")
+
+        logger.info(f"Exportación {formato} generada: {ruta}")
+        return ruta
+
+    def generar_exportaciones(self, df_resultado, formatos, ruta_excel):
+        """
+        Genera los formatos de exportación pedidos. Con un solo formato se
+        entrega el archivo; con varios se empaquetan en un .zip junto con el
+        reporte Excel
+
+        Args:
+            df_resultado: DataFrame con resultados finales
+            formatos: Lista de claves de config.FORMATOS_EXPORTACION ('xlsx' es
+                      el reporte ya generado)
+            ruta_excel: Ruta del reporte Excel (base del nombre de los archivos)
+
+        Returns:
+            Ruta al archivo o .zip generado, o None si solo se pidió el Excel
+        """
+        formatos = list(dict.fromkeys(formatos))
+        adicionales = [f for f in formatos if f != 'xlsx']
+        if not adicionales:
+            return None
+
+        ruta_base = os.path.splitext(ruta_excel)[0]
+        df_exportacion = self.datos_exportacion(df_resultado)
+        rutas = [self.exportar(df_exportacion, formato, ruta_base) for formato in adicionales]
+
+        if len(formatos) == 1:
+            return rutas[0]
+
+        # Varios formatos: un .zip con el Excel y las exportaciones
+        ruta_zip = ruta_base + '.zip'
+        with zipfile.ZipFile(ruta_zip, 'w') as archivo_zip:
+            for ruta in [ruta_excel] + rutas:
+                # xlsx, gzip y parquet ya van comprimidos
+                compresion = zipfile.ZIP_DEFLATED if ruta.endswith('.ndjson') else zipfile.ZIP_STORED
+                archivo_zip.write(ruta, os.path.basename(ruta), compress_type=compresion)
+        for ruta in rutas:
+            os.remove(ruta)
+
+        logger.info(f"Exportaciones empaquetadas en: {ruta_zip}")
+        return ruta_zip
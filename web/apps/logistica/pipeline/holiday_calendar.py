@@ -0,0 +1,132 @@
+"""
+Módulo de Calendario de Festivos
+Tabla de festivos de Colombia (fijos, Ley Emiliani y relativos a Pascua)
+construida una sola vez por proceso, para clasificar columnas completas de
+fechas con una búsqueda vectorizada
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from dateutil.easter import easter
+from . import config
+
+
+def _siguiente_lunes(fecha):
+    """Mueve una fecha al siguiente lunes (Ley Emiliani)."""
+    dias_hasta_lunes = (7 - fecha.weekday()) % 7
+    return fecha + timedelta(days=dias_hasta_lunes)
+
+
+def festivos_anio(anio):
+    """
+    Festivos de Colombia de un año
+
+    Args:
+        anio: Año (entero)
+
+    Returns:
+        Set de date
+    """
+    pascua = easter(anio)
+    festivos = set()
+
+    # Fijos (no trasladables)
+    festivos.update({
+        date(anio, 1, 1),    # Año Nuevo
+        date(anio, 5, 1),    # Día del Trabajo
+        date(anio, 7, 20),   # Independencia
+        date(anio, 8, 7),    # Batalla de Boyacá
+        date(anio, 12, 8),   # Inmaculada Concepción
+        date(anio, 12, 25),  # Navidad
+    })
+
+    # Emiliani (se trasladan al siguiente lunes)
+    emiliani = [
+        date(anio, 1, 6),    # Reyes Magos
+        date(anio, 3, 19),   # San José
+        date(anio, 6, 29),   # San Pedro y San Pablo
+        date(anio, 8, 15),   # Asunción
+        date(anio, 10, 12),  # Día de la Raza
+        date(anio, 11, 1),   # Todos los Santos
+        date(anio, 11, 11),  # Independencia de Cartagena
+    ]
+    for fecha in emiliani:
+        festivos.add(_siguiente_lunes(fecha))
+
+    # Relacionados con Pascua
+    festivos.add(pascua - timedelta(days=3))   # Jueves Santo
+    festivos.add(pascua - timedelta(days=2))   # Viernes Santo
+    festivos.add(_siguiente_lunes(pascua + timedelta(days=43)))  # Ascensión
+    festivos.add(_siguiente_lunes(pascua + timedelta(days=64)))  # Corpus Christi
+    festivos.add(_siguiente_lunes(pascua + timedelta(days=71)))  # Sagrado Corazón
+
+    return festivos
+
+
+def _construir_tabla(anios):
+    """Array datetime64[D] ordenado con los festivos de los años dados."""
+    festivos = [festivo for anio in anios for festivo in festivos_anio(anio)]
+    return np.unique(np.array(festivos, dtype='datetime64[D]'))
+
+
+_anios_tabla = set(range(config.ANIO_INICIO_FESTIVOS, config.ANIO_FIN_FESTIVOS + 1))
+
+# Festivos de Colombia (datetime64[D], ordenados) para ANIO_INICIO_FESTIVOS..ANIO_FIN_FESTIVOS.
+# Otros módulos (p. ej. recargos) deben leerla con tabla_festivos(), que la amplía si hace falta
+FESTIVOS_COLOMBIA = _construir_tabla(sorted(_anios_tabla))
+
+
+def _dias(fechas):
+    """Convierte fechas (Serie, Index, array o lista de date/datetime) a datetime64[D]."""
+    return pd.to_datetime(pd.Series(fechas)).to_numpy(dtype='datetime64[D]')
+
+
+def tabla_festivos(anios=()):
+    """
+    Tabla de festivos, ampliada con los años pedidos que no estén cubiertos
+
+    Args:
+        anios: Años que debe cubrir la tabla (opcional)
+
+    Returns:
+        Array datetime64[D] ordenado
+    """
+    global FESTIVOS_COLOMBIA
+    faltantes = {int(anio) for anio in anios} - _anios_tabla
+    if faltantes:
+        _anios_tabla.update(faltantes)
+        FESTIVOS_COLOMBIA = np.union1d(FESTIVOS_COLOMBIA, _construir_tabla(sorted(faltantes)))
+    return FESTIVOS_COLOMBIA
+
+
+def es_festivo(fechas):
+    """
+    Indica qué fechas son festivos en Colombia
+
+    Args:
+        fechas: Serie, Index o array de fechas (date, datetime o datetime64)
+
+    Returns:
+        Array booleano (NaT = False)
+    """
+    dias = _dias(fechas)
+    validos = ~np.isnat(dias)
+    anios = np.unique(dias[validos].astype('datetime64[Y]').astype(int) + 1970)
+    return np.isin(dias, tabla_festivos(anios)) & validos
+
+
+def es_domingo(fechas):
+    """
+    Indica qué fechas caen en domingo
+
+    Args:
+        fechas: Serie, Index o array de fechas (date, datetime o datetime64)
+
+    Returns:
+        Array booleano (NaT = False)
+    """
+    dias = _dias(fechas)
+    # 1970-01-01 fue jueves (weekday 3)
+    return ((dias.astype(np.int64) + 3) % 7 == 6) & ~np.isnat(dias)
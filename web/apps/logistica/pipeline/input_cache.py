@@ -0,0 +1,171 @@
+"""
+Módulo de Caché de Archivos de Entrada
+Guarda las marcaciones ya leídas de cada archivo del huellero en formato
+Parquet, identificadas por el SHA-256 del contenido del archivo
+"""
+
+import hashlib
+import os
+import tempfile
+
+from . import config
+from .logger import logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    logger.warning("pyarrow no disponible - caché de archivos de entrada desactivada")
+
+
+class InputCache:
+    """Caché LRU en disco de archivos de entrada ya leídos y limpiados"""
+
+    EXTENSION = '.parquet'
+    TAMANO_BLOQUE = 1024 * 1024
+    # Subir al cambiar la lectura o limpieza de estructura de los archivos:
+    # las entradas guardadas con otra versión dejan de usarse
+    VERSION_CACHE = 2
+    # Metadato del Parquet con los registros del archivo antes de limpiar
+    META_REGISTROS_CRUDOS = b'huellero_registros_crudos'
+
+    def __init__(self, directorio=None, max_mb=None):
+        """
+        Inicializa la caché
+
+        Args:
+            directorio: Carpeta de la caché (por defecto config.DIR_CACHE)
+            max_mb: Tamaño máximo en MB (por defecto config.CACHE_ENTRADA_MAX_MB)
+        """
+        self.directorio = directorio or config.DIR_CACHE
+        self.max_bytes = (max_mb if max_mb is not None else config.CACHE_ENTRADA_MAX_MB) * 1024 * 1024
+        self.habilitada = config.CACHE_ENTRADA_HABILITADO and PYARROW_AVAILABLE
+
+    @classmethod
+    def calcular_hash(cls, ruta_archivo):
+        """
+        Calcula el SHA-256 del contenido de un archivo
+
+        Args:
+            ruta_archivo: Ruta al archivo
+
+        Returns:
+            String hexadecimal con el hash
+        """
+        sha = hashlib.sha256()
+        with open(ruta_archivo, 'rb') as archivo:
+            for bloque in iter(lambda: archivo.read(cls.TAMANO_BLOQUE), b''):
+                sha.update(bloque)
+        return sha.hexdigest()
+
+    @classmethod
+    def version_formato(cls):
+        """
+        Huella del formato de las entradas: versión de la caché y configuración
+        que cambia el resultado de cargar_archivo + limpiar_estructura
+
+        Returns:
+            String hexadecimal corto
+        """
+        datos = repr((
+            cls.VERSION_CACHE,
+            config.FORMATO_FECHA_INPUT,
+            sorted(config.COLUMNAS_ENTRADA.items()),
+            config.FILAS_BUSQUEDA_ENCABEZADO,
+        ))
+        return hashlib.sha256(datos.encode('utf-8')).hexdigest()[:12]
+
+    def _ruta(self, clave):
+        """Ruta del archivo de caché para una clave (en la versión de formato actual)."""
+        return os.path.join(self.directorio, f"{clave}_{self.version_formato()}{self.EXTENSION}")
+
+    def obtener(self, clave):
+        """
+        Obtiene el DataFrame guardado para una clave
+
+        Args:
+            clave: SHA-256 del archivo de entrada
+
+        Returns:
+            Tupla (DataFrame, registros del archivo antes de limpiar) o None
+            si no está en caché
+        """
+        if not self.habilitada or not clave:
+            return None
+
+        ruta = self._ruta(clave)
+        if not os.path.exists(ruta):
+            return None
+
+        try:
+            tabla = pq.read_table(ruta)
+            df = tabla.to_pandas()
+            metadatos = tabla.schema.metadata or {}
+            registros_crudos = int(metadatos.get(self.META_REGISTROS_CRUDOS, len(df)))
+            # Marcar como usado recientemente (LRU por fecha de modificación)
+            os.utime(ruta, None)
+            return df, registros_crudos
+        except Exception as e:
+            logger.warning(f"No se pudo leer caché {os.path.basename(ruta)}: {str(e)}")
+            return None
+
+    def guardar(self, clave, df, registros_crudos=None):
+        """
+        Guarda un DataFrame en la caché y aplica el límite de tamaño
+
+        Args:
+            clave: SHA-256 del archivo de entrada
+            df: DataFrame con las marcaciones limpias
+            registros_crudos: Registros del archivo antes de limpiar (por
+                              defecto los del DataFrame)
+        """
+        if not self.habilitada or not clave:
+            return
+
+        ruta = self._ruta(clave)
+        ruta_tmp = None
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            # Archivo temporal propio: otra solicitud puede estar guardando la misma clave
+            fd, ruta_tmp = tempfile.mkstemp(dir=self.directorio, suffix=f"{self.EXTENSION}.tmp")
+            os.close(fd)
+            tabla = pa.Table.from_pandas(df, preserve_index=False)
+            metadatos = dict(tabla.schema.metadata or {})
+            metadatos[self.META_REGISTROS_CRUDOS] = str(
+                len(df) if registros_crudos is None else registros_crudos
+            ).encode('ascii')
+            pq.write_table(tabla.replace_schema_metadata(metadatos), ruta_tmp)
+            os.replace(ruta_tmp, ruta)
+        except Exception as e:
+            logger.warning(f"No se pudo guardar en caché: {str(e)}")
+            if ruta_tmp and os.path.exists(ruta_tmp):
+                os.remove(ruta_tmp)
+            return
+
+        self.limpiar()
+
+    def limpiar(self):
+        """Elimina las entradas menos usadas hasta quedar bajo el tamaño máximo."""
+        entradas = []
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith(self.EXTENSION):
+                ruta = os.path.join(self.directorio, nombre)
+                try:
+                    info = os.stat(ruta)
+                except OSError:
+                    # Eliminada o reemplazada por otra solicitud en paralelo
+                    continue
+                entradas.append((info.st_mtime, info.st_size, ruta))
+
+        total = sum(tamano for _, tamano, _ in entradas)
+        for _, tamano, ruta in sorted(entradas):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(ruta)
+                total -= tamano
+                logger.debug(f"Caché: eliminado {os.path.basename(ruta)}")
+            except OSError:
+                pass
@@ -0,0 +1,171 @@
+"""
+Módulo de Banderas de Observación
+Las observaciones de cada registro del reporte se guardan como un entero de
+banderas (un bit por observación) y se convierten a texto una sola vez, al
+escribir la salida
+"""
+
+import numpy as np
+from . import config
+
+
+class ObservationFlags:
+    """Bits de observación, su texto y las clasificaciones que dependen de ellos"""
+
+    # Bits, en el orden en que aparecen en el texto de la observación
+    ENTRADA_NR = 1 << 0
+    SALIDA_NR = 1 << 1
+    SALIDA_ESTANDAR_NOCTURNA = 1 << 2
+    TURNO_NOCTURNO = 1 << 3
+    ENTRADA_INFERIDA = 1 << 4
+    SALIDA_INFERIDA = 1 << 5
+    SALIDA_CORREGIDA = 1 << 6
+    CASTIGO_MARCACION_DIURNA = 1 << 7
+    NOCTURNO_PROSPECTIVO = 1 << 8
+    TURNO_LARGO = 1 << 9
+    EXCEDE_JORNADA = 1 << 10
+    TURNO_CORTO = 1 << 11
+    DUPLICADOS = 1 << 12
+    DATOS_CORRUPTOS = 1 << 13
+    TRABAJO_DOMINICAL = 1 << 14
+    DIA_FESTIVO = 1 << 15
+    SIN_REGISTROS = 1 << 16
+    EXCEDE_LIMITE_CARGO = 1 << 17
+
+    # Observaciones que son alertas (color naranja y archivo de casos de revisión)
+    ALERTAS = TURNO_LARGO | EXCEDE_JORNADA | TURNO_CORTO | DATOS_CORRUPTOS | EXCEDE_LIMITE_CARGO
+    CASOS_REVISION = ALERTAS
+
+    # Columnas del DataFrame de resultados
+    COLUMNA = 'OBSERVACION_FLAGS'
+    COLUMNA_DUPLICADOS = 'OBSERVACION_DUPLICADOS'    # Cantidad para el texto de DUPLICADOS
+    COLUMNA_LIMITE_CARGO = 'OBSERVACION_LIMITE_CARGO'  # Horas para el texto de EXCEDE_LIMITE_CARGO
+
+    @classmethod
+    def _textos(cls):
+        """Lista (bit, texto) de las observaciones sin parámetros, en orden."""
+        obs = config.OBSERVACIONES
+        return [
+            (cls.ENTRADA_NR, obs['ENTRADA_NR']),
+            (cls.SALIDA_NR, obs['SALIDA_NR']),
+            (cls.SALIDA_ESTANDAR_NOCTURNA, obs['SALIDA_ESTANDAR_NOCTURNA']),
+            (cls.TURNO_NOCTURNO, obs['TURNO_NOCTURNO']),
+            (cls.ENTRADA_INFERIDA, obs['ESTADO_INFERIDO'] + " (Entrada)"),
+            (cls.SALIDA_INFERIDA, obs['ESTADO_INFERIDO'] + " (Salida)"),
+            (cls.SALIDA_CORREGIDA, obs['SALIDA_CORREGIDA']),
+            (cls.CASTIGO_MARCACION_DIURNA, obs['CASTIGO_MARCACION_INCORRECTA_DIURNO']),
+            (cls.NOCTURNO_PROSPECTIVO, obs['NOCTURNO_PROSPECTIVO']),
+            (cls.TURNO_LARGO, obs['TURNO_LARGO']),
+            (cls.EXCEDE_JORNADA, obs['EXCEDE_JORNADA']),
+            (cls.TURNO_CORTO, obs['TURNO_CORTO']),
+            (cls.DUPLICADOS, None),
+            (cls.DATOS_CORRUPTOS, obs['DATOS_CORRUPTOS']),
+            (cls.TRABAJO_DOMINICAL, obs['TRABAJO_DOMINICAL']),
+            (cls.DIA_FESTIVO, obs['DIA_FESTIVO']),
+            (cls.SIN_REGISTROS, obs['SIN_REGISTROS']),
+            (cls.EXCEDE_LIMITE_CARGO, None),
+        ]
+
+    @classmethod
+    def texto(cls, banderas, duplicados=0, limite_cargo=None):
+        """
+        Texto de una combinación de banderas
+
+        Args:
+            banderas: Entero con los bits de observación
+            duplicados: Cantidad de marcaciones casi duplicadas (bit DUPLICADOS)
+            limite_cargo: Límite de horas del cargo (bit EXCEDE_LIMITE_CARGO)
+
+        Returns:
+            String con las observaciones separadas por ' | '
+        """
+        banderas = int(banderas)
+        if not banderas:
+            return config.OBSERVACIONES['OK']
+
+        partes = []
+        for bit, texto in cls._textos():
+            if not banderas & bit:
+                continue
+            if bit == cls.DUPLICADOS:
+                texto = f"{config.OBSERVACIONES['DUPLICADOS_ELIM']} ({int(duplicados)})"
+            elif bit == cls.EXCEDE_LIMITE_CARGO:
+                texto = f"ALERTA: EXCEDE LÍMITE DE HORAS DEL CARGO ({float(limite_cargo)} horas)"
+            partes.append(texto)
+
+        return ' | '.join(partes)
+
+    @classmethod
+    def renderizar(cls, df):
+        """
+        Convierte las columnas de banderas en la columna de texto OBSERVACION
+
+        El texto se arma una sola vez por combinación distinta de banderas y
+        parámetros y queda en la posición de la columna de banderas.
+
+        Args:
+            df: DataFrame de resultados (si no tiene banderas se retorna igual)
+
+        Returns:
+            DataFrame nuevo con OBSERVACION y sin las columnas de banderas
+        """
+        if cls.COLUMNA not in df.columns:
+            return df
+
+        n = len(df)
+        claves = np.column_stack([
+            df[cls.COLUMNA].to_numpy(dtype=float),
+            df[cls.COLUMNA_DUPLICADOS].to_numpy(dtype=float) if cls.COLUMNA_DUPLICADOS in df.columns else np.zeros(n),
+            df[cls.COLUMNA_LIMITE_CARGO].to_numpy(dtype=float) if cls.COLUMNA_LIMITE_CARGO in df.columns else np.full(n, np.nan),
+        ])
+        # Los parámetros solo importan si su bit está activo
+        claves[(claves[:, 0].astype(np.int64) & cls.DUPLICADOS) == 0, 1] = 0
+        claves[(claves[:, 0].astype(np.int64) & cls.EXCEDE_LIMITE_CARGO) == 0, 2] = 0
+
+        if n:
+            unicas, inverso = np.unique(claves, axis=0, return_inverse=True)
+            textos = np.array([cls.texto(b, d, l) for b, d, l in unicas], dtype=object)
+            observacion = textos[inverso.ravel()]
+        else:
+            observacion = np.empty(0, dtype=object)
+
+        posicion = df.columns.get_loc(cls.COLUMNA)
+        resultado = df.drop(columns=[
+            c for c in (cls.COLUMNA, cls.COLUMNA_DUPLICADOS, cls.COLUMNA_LIMITE_CARGO) if c in df.columns
+        ])
+        resultado.insert(posicion, 'OBSERVACION', observacion)
+        return resultado
+
+    @classmethod
+    def clases_color(cls, banderas):
+        """
+        Color de fila (clave de config.COLORES, '' sin color) según las banderas
+
+        Args:
+            banderas: Serie o array de enteros de banderas
+
+        Returns:
+            Array de strings, uno por fila
+        """
+        banderas = np.asarray(banderas, dtype=np.int64)
+        condiciones = [
+            banderas == 0,
+            (banderas == cls.EXCEDE_JORNADA) | (banderas == cls.EXCEDE_LIMITE_CARGO),
+            banderas == cls.SIN_REGISTROS,
+            (banderas & cls.SALIDA_ESTANDAR_NOCTURNA) != 0,
+            (banderas & cls.ALERTAS) != 0,
+        ]
+        return np.select(condiciones, ['VERDE', 'GRIS', 'AZUL', 'MORADO', 'NARANJA'], default='AMARILLO')
+
+    @classmethod
+    def es_caso_revision(cls, banderas):
+        """
+        Indica qué filas van al archivo de casos que requieren revisión manual
+
+        Args:
+            banderas: Serie o array de enteros de banderas
+
+        Returns:
+            Array booleano
+        """
+        return (np.asarray(banderas, dtype=np.int64) & cls.CASOS_REVISION) != 0
@@ -0,0 +1,150 @@
+"""
+Módulo de Ejecución por Fragmentos de Empleados
+Reparte la inferencia de estados y la construcción de turnos entre varios
+procesos; cada empleado es independiente, así que cada proceso recibe un
+fragmento con empleados completos
+"""
+
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+from . import config
+from .logger import logger
+from .shift_builder import ShiftBuilder, Turno
+from .state_inference import StateInference
+
+
+def _procesar_fragmento_en_proceso(df_fragmento, horarios_por_codigo):
+    """Infiere estados y construye turnos de un fragmento en un proceso del pool."""
+    inference = StateInference()
+    df_con_estados = inference.inferir_estados(df_fragmento, horarios_por_codigo)
+    builder = ShiftBuilder()
+    builder.construir_turnos(df_con_estados)
+    return df_con_estados, inference.inferencias_realizadas, builder.turnos
+
+
+class ShardRunner:
+    """Ejecuta inferencia y construcción de turnos por fragmentos de empleados"""
+
+    def __init__(self, max_procesos=None):
+        """
+        Inicializa el ejecutor
+
+        Args:
+            max_procesos: Número de procesos (por defecto config.PROCESOS_INFERENCIA_TURNOS;
+                          None = número de CPUs)
+        """
+        if max_procesos is None:
+            max_procesos = config.PROCESOS_INFERENCIA_TURNOS or os.cpu_count() or 1
+        self.max_procesos = max_procesos
+
+    def particionar(self, df, n_fragmentos):
+        """
+        Reparte los empleados en fragmentos de tamaño balanceado
+
+        Asigna cada empleado (de mayor a menor cantidad de registros) al fragmento
+        con menos registros acumulados. El resultado es determinista.
+
+        Args:
+            df: DataFrame de marcaciones con columna CODIGO
+            n_fragmentos: Número de fragmentos deseado
+
+        Returns:
+            Lista de arrays de posiciones (iloc, ascendentes), uno por fragmento no vacío
+        """
+        grupos = list(df.groupby('CODIGO', sort=False).indices.values())
+        grupos.sort(key=len, reverse=True)
+
+        cargas = [(0, i) for i in range(n_fragmentos)]
+        fragmentos = [[] for _ in range(n_fragmentos)]
+        for posiciones in grupos:
+            carga, i = heapq.heappop(cargas)
+            fragmentos[i].append(posiciones)
+            heapq.heappush(cargas, (carga + len(posiciones), i))
+
+        return [np.sort(np.concatenate(f)) for f in fragmentos if f]
+
+    def inferir_y_construir(self, df, horarios_por_codigo, inference, builder, indice_dias=None):
+        """
+        Infiere estados y construye turnos, en paralelo si el volumen lo amerita
+
+        Los resultados se combinan en el orden de la ejecución secuencial y quedan
+        también en inference.inferencias_realizadas y builder.turnos, para que
+        obtener_resumen() funcione igual en ambos modos.
+
+        Args:
+            df: DataFrame de marcaciones limpias
+            horarios_por_codigo: dict {codigo: [(entrada_min, salida_min), ...]} o None
+            inference: StateInference que recibe las inferencias
+            builder: ShiftBuilder que recibe los turnos
+            indice_dias: DayIndex de df (solo se usa en la ejecución secuencial)
+
+        Returns:
+            Tupla (df_con_estados, df_turnos)
+        """
+        n_empleados = df['CODIGO'].nunique()
+        n_procesos = min(self.max_procesos, n_empleados)
+
+        if n_procesos <= 1 or len(df) < config.REGISTROS_MINIMOS_PARALELO:
+            df_con_estados = inference.inferir_estados(df, horarios_por_codigo, indice_dias)
+            return df_con_estados, builder.construir_turnos(df_con_estados)
+
+        fragmentos = self.particionar(df, n_procesos)
+        logger.info(
+            f"Inferencia y turnos en paralelo: {n_empleados} empleados en "
+            f"{len(fragmentos)} fragmentos ({n_procesos} procesos)"
+        )
+
+        try:
+            with ProcessPoolExecutor(max_workers=n_procesos) as pool:
+                resultados = list(pool.map(
+                    _procesar_fragmento_en_proceso,
+                    [df.iloc[posiciones] for posiciones in fragmentos],
+                    [horarios_por_codigo] * len(fragmentos),
+                ))
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning(f"Ejecución en paralelo no disponible ({e}); se procesa en secuencia")
+            df_con_estados = inference.inferir_estados(df, horarios_por_codigo, indice_dias)
+            return df_con_estados, builder.construir_turnos(df_con_estados)
+
+        return self._combinar(df, fragmentos, resultados, inference, builder)
+
+    def _combinar(self, df, fragmentos, resultados, inference, builder):
+        """Une los resultados de los fragmentos en el orden de la ejecución secuencial."""
+        # Filas: volver al orden original del DataFrame
+        posiciones = np.concatenate(fragmentos)
+        df_con_estados = pd.concat([r[0] for r in resultados]).iloc[np.argsort(posiciones, kind='stable')]
+        if 'ESTADO_INFERIDO' in df_con_estados.columns:
+            # Fragmentos sin estados faltantes no agregan la columna
+            df_con_estados['ESTADO_INFERIDO'] = df_con_estados['ESTADO_INFERIDO'].fillna(False)
+
+        # Inferencias y turnos: agrupados por empleado en orden de primera aparición
+        orden_empleado = {codigo: i for i, codigo in enumerate(pd.unique(df['CODIGO']))}
+        inferencias = sorted(
+            (inf for r in resultados for inf in r[1]),
+            key=lambda inf: orden_empleado[inf['codigo']]
+        )
+        turnos = sorted(
+            (turno for r in resultados for turno in r[2]),
+            key=lambda turno: orden_empleado[turno.codigo]
+        )
+
+        inference.inferencias_realizadas.extend(inferencias)
+        builder.turnos = turnos
+
+        # Las estadísticas de los procesos hijos no llegan al logger principal
+        n_completos = sum(1 for turno in turnos if turno.tiene(Turno.COMPLETO))
+        logger.incrementar_stat('estados_inferidos', len(inferencias))
+        logger.incrementar_stat('turnos_completos', n_completos)
+        logger.incrementar_stat('turnos_incompletos', len(turnos) - n_completos)
+
+        df_turnos = Turno.a_dataframe(turnos)
+        logger.info(f"Estados inferidos: {len(inferencias)}")
+        logger.info(config.MENSAJES['turnos_construidos'])
+        logger.info(f"Total turnos: {len(df_turnos)}")
+
+        return df_con_estados, df_turnos
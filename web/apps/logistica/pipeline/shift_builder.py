@@ -3,15 +3,110 @@ Módulo de Construcción de Turnos
 Empareja entradas con salidas y construye turnos completos
 """
 
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
 from . import config
 from .logger import logger
 
 
+class Turno:
+    """
+    Turno construido, en formato compacto
+
+    Las horas de entrada/salida se guardan como ns desde epoch (None si no hay
+    marca) y la fecha del turno como días desde epoch. Los indicadores
+    booleanos van empaquetados en un solo entero (banderas).
+    """
+
+    __slots__ = ('codigo', 'nombre', 'dia', 'entrada', 'salida', 'horas', 'banderas')
+
+    # Bits de banderas
+    COMPLETO = 1
+    ES_NOCTURNO = 2
+    ENTRADA_INFERIDA = 4
+    SALIDA_INFERIDA = 8
+    SALIDA_CORREGIDA = 16
+    CASTIGO_MARCACION_DIURNA = 32
+    NOCTURNO_PROSPECTIVO = 64
+    SALIDA_ESTANDAR_NOCTURNA = 128
+
+    # Columnas booleanas del DataFrame de turnos, en su orden
+    COLUMNAS_BANDERAS = (
+        ('es_nocturno', ES_NOCTURNO),
+        ('completo', COMPLETO),
+        ('entrada_inferida', ENTRADA_INFERIDA),
+        ('salida_inferida', SALIDA_INFERIDA),
+        ('salida_corregida', SALIDA_CORREGIDA),
+        ('castigo_marcacion_diurna', CASTIGO_MARCACION_DIURNA),
+        ('nocturno_prospectivo', NOCTURNO_PROSPECTIVO),
+        ('salida_estandar_nocturna', SALIDA_ESTANDAR_NOCTURNA),
+    )
+
+    def __init__(self, codigo, nombre, dia, entrada, salida, horas, banderas=0):
+        self.codigo = codigo
+        self.nombre = nombre
+        self.dia = dia
+        self.entrada = entrada
+        self.salida = salida
+        self.horas = horas
+        self.banderas = banderas
+
+    def tiene(self, bandera):
+        """Indica si la bandera está activa."""
+        return bool(self.banderas & bandera)
+
+    def marcar(self, bandera, valor=True):
+        """Activa o desactiva una bandera."""
+        if valor:
+            self.banderas |= bandera
+        else:
+            self.banderas &= ~bandera
+
+    @classmethod
+    def a_dataframe(cls, turnos):
+        """
+        Convierte una lista de turnos al DataFrame de turnos, columna por columna
+
+        Args:
+            turnos: Lista de Turno
+
+        Returns:
+            DataFrame con codigo, nombre, fecha, entrada, salida, horas y una
+            columna booleana por bandera
+        """
+        nat = np.iinfo(np.int64).min
+        banderas = np.fromiter((t.banderas for t in turnos), dtype=np.int64, count=len(turnos))
+
+        columnas = {
+            'codigo': [t.codigo for t in turnos],
+            'nombre': [t.nombre for t in turnos],
+            'fecha': np.fromiter((t.dia for t in turnos), dtype=np.int64, count=len(turnos))
+                       .astype('datetime64[D]').astype(object),
+            'entrada': np.fromiter(
+                (nat if t.entrada is None else t.entrada for t in turnos), dtype=np.int64, count=len(turnos)
+            ).view('datetime64[ns]'),
+            'salida': np.fromiter(
+                (nat if t.salida is None else t.salida for t in turnos), dtype=np.int64, count=len(turnos)
+            ).view('datetime64[ns]'),
+            'horas': np.array([t.horas for t in turnos], dtype=float),
+        }
+        for nombre, bandera in cls.COLUMNAS_BANDERAS:
+            columnas[nombre] = (banderas & bandera) != 0
+
+        return pd.DataFrame(columnas)
+
+
 class ShiftBuilder:
     """Construye turnos a partir de marcaciones"""
 
+    # Códigos de estado del motor de emparejamiento
+    ESTADO_OTRO = 0
+    ESTADO_ENTRADA = 1
+    ESTADO_SALIDA = 2
+
+    NS_MINUTO = 60 * 10**9
+    NS_DIA = 1440 * NS_MINUTO
+
     def __init__(self):
         """Inicializa el constructor de turnos"""
         self.turnos = []
@@ -30,16 +125,23 @@ class ShiftBuilder:
         except (TypeError, ValueError):
             return False
 
-    def _en_ventana(self, fecha_hora, ventana):
-        """Valida si una hora cae dentro de una ventana decimal [inicio, fin]."""
-        hora = self._hora_decimal(fecha_hora)
-        inicio, fin = ventana
-        return inicio <= hora <= fin
+    def _en_ventana(self, fecha_hora, tabla_ventana):
+        """Valida si una hora cae dentro de una ventana (tabla por minuto de config)."""
+        return bool(tabla_ventana[fecha_hora.hour * 60 + fecha_hora.minute])
 
     def _horas_entre(self, inicio, fin):
         """Calcula horas entre dos datetimes."""
         return (fin - inicio).total_seconds() / 3600
 
+    def _horas_entre_ns(self, inicio, fin):
+        """Calcula horas entre dos instantes en ns desde epoch."""
+        return (fin - inicio) / 1e9 / 3600
+
+    def _hora_decimal_ns(self, instante):
+        """Convierte un instante en ns desde epoch a hora decimal (ej: 16:30 -> 16.5)."""
+        minuto_dia = (instante // self.NS_MINUTO) % 1440
+        return minuto_dia // 60 + (minuto_dia % 60) / 60
+
     def es_turno_nocturno(self, fecha_hora_entrada):
         """
         Determina si un turno es nocturno basándose en hora de entrada
@@ -58,6 +160,44 @@ class ShiftBuilder:
             hora_decimal = fecha_hora_entrada
         return hora_decimal >= config.HORA_INICIO_TURNO_NOCTURNO
 
+    def _arreglos_marcaciones(self, df):
+        """
+        Convierte las marcaciones a arreglos NumPy para el motor de turnos.
+
+        Args:
+            df: DataFrame con CODIGO, NOMBRE, FECHA_HORA, ESTADO y opcionalmente ESTADO_INFERIDO
+
+        Returns:
+            Dict de arreglos alineados por fila: instantes en ns desde epoch,
+            código de estado (int8), flag de inferido, minuto y día, hora decimal
+            y los valores originales de código y nombre.
+        """
+        fechas = df['FECHA_HORA']
+        ns = fechas.to_numpy(dtype='datetime64[ns]').astype('int64')
+        minuto_dia = (ns // self.NS_MINUTO) % 1440
+        estados = df['ESTADO'].to_numpy(dtype=object)
+
+        if 'ESTADO_INFERIDO' in df.columns:
+            inferido = df['ESTADO_INFERIDO'].fillna(False).to_numpy(dtype=bool)
+        else:
+            inferido = np.zeros(len(df), dtype=bool)
+
+        return {
+            'ns': ns,
+            'estado': np.select(
+                [estados == 'Entrada', estados == 'Salida'],
+                [self.ESTADO_ENTRADA, self.ESTADO_SALIDA],
+                self.ESTADO_OTRO,
+            ).astype(np.int8),
+            'inferido': inferido,
+            'minuto_dia': minuto_dia,
+            'dia': ns // self.NS_DIA,
+            # Misma fórmula que _hora_decimal para conservar los umbrales exactos
+            'hora_decimal': minuto_dia // 60 + (minuto_dia % 60) / 60,
+            'codigo': df['CODIGO'].to_numpy(dtype=object),
+            'nombre': df['NOMBRE'].to_numpy(dtype=object),
+        }
+
     def construir_turnos_empleado(self, df_empleado):
         """
         Construye turnos para un empleado específico
@@ -66,286 +206,240 @@ class ShiftBuilder:
             df_empleado: DataFrame con marcaciones del empleado
 
         Returns:
-            Lista de dict con turnos construidos
+            Lista de Turno construidos
+        """
+        arreglos = self._arreglos_marcaciones(df_empleado)
+        posiciones = np.argsort(arreglos['ns'], kind='stable')
+        return self._construir_turnos_arreglos(arreglos, posiciones)
+
+    def _construir_turnos_arreglos(self, arreglos, posiciones):
+        """
+        Máquina de estados de emparejamiento Entrada/Salida sobre arreglos.
+
+        Args:
+            arreglos: Dict de _arreglos_marcaciones
+            posiciones: Posiciones del empleado en los arreglos, ordenadas por FECHA_HORA
+
+        Returns:
+            Lista de Turno construidos
         """
         turnos_empleado = []
-        df_emp = df_empleado.sort_values('FECHA_HORA').reset_index(drop=True)
-        codigo_empleado = df_emp.iloc[0]['CODIGO'] if len(df_emp) > 0 else None
-        aplicar_castigo_vigilante = self._es_vigilante_castigo(codigo_empleado)
+        n = len(posiciones)
+        if n == 0:
+            return turnos_empleado
+
+        ns = arreglos['ns'][posiciones].tolist()
+        estado = arreglos['estado'][posiciones].tolist()
+        inferido = arreglos['inferido'][posiciones].tolist()
+        minuto_dia = arreglos['minuto_dia'][posiciones].tolist()
+        dia = arreglos['dia'][posiciones].tolist()
+        hora_decimal = arreglos['hora_decimal'][posiciones].tolist()
+        codigo = arreglos['codigo'][posiciones]
+        nombre = arreglos['nombre'][posiciones]
+
+        aplicar_castigo_vigilante = self._es_vigilante_castigo(codigo[0])
+        tabla_am = config.TABLA_MINUTOS_VIGILANTE_AM
+        tabla_pm = config.TABLA_MINUTOS_VIGILANTE_PM
+        # Permitir un pequeño anticipo para entradas nocturnas (ej. 18:47)
+        umbral_nocturno_anticipado = max(0, config.HORA_INICIO_TURNO_NOCTURNO - 1)
+        doce_horas = 12 * 60 * self.NS_MINUTO
+
+        # Índices por día de los turnos con entrada y sin salida:
+        #   abiertos_por_dia   → candidatos a recibir una Salida de madrugada
+        #   madrugadas_por_dia → entradas AM (< 10h) para el pareo nocturno prospectivo
+        abiertos_por_dia = {}
+        madrugadas_por_dia = {}
 
         i = 0
-        while i < len(df_emp):
-            registro = df_emp.iloc[i]
-
+        while i < n:
             # Si es una entrada
-            if registro['ESTADO'] == 'Entrada':
-                entrada = registro
-                entrada_fecha_hora = entrada['FECHA_HORA']
-                entrada_hora = entrada_fecha_hora.hour
+            if estado[i] == self.ESTADO_ENTRADA:
                 castigo_marcacion_diurna = False
 
                 # Buscar la salida correspondiente
-                salida = None
                 salida_idx = None
                 salida_corregida = False
 
                 # Regla especial (castigo vigilantes):
                 # Si hay marca AM + PM el mismo día, liquidar como diurno.
-                if (
-                    aplicar_castigo_vigilante
-                    and self._en_ventana(entrada_fecha_hora, config.VIGILANTE_VENTANA_AM)
-                ):
-                    for j in range(i + 1, len(df_emp)):
-                        siguiente = df_emp.iloc[j]
-                        if siguiente['FECHA_HORA'].date() != entrada_fecha_hora.date():
+                if aplicar_castigo_vigilante and tabla_am[minuto_dia[i]]:
+                    for j in range(i + 1, n):
+                        if dia[j] != dia[i]:
                             break
-                        if self._en_ventana(siguiente['FECHA_HORA'], config.VIGILANTE_VENTANA_PM):
-                            horas_candidatas = self._horas_entre(entrada_fecha_hora, siguiente['FECHA_HORA'])
+                        if tabla_pm[minuto_dia[j]]:
+                            horas_candidatas = self._horas_entre_ns(ns[i], ns[j])
                             if horas_candidatas <= 0 or horas_candidatas > config.HORAS_MAXIMAS_TURNO:
                                 continue
-                            salida = siguiente
                             salida_idx = j
-                            salida_corregida = siguiente['ESTADO'] == 'Entrada'
+                            salida_corregida = estado[j] == self.ESTADO_ENTRADA
                             castigo_marcacion_diurna = True
                             break
 
-                if salida is None:
-                    for j in range(i + 1, len(df_emp)):
-                        siguiente = df_emp.iloc[j]
-
-                        if siguiente['ESTADO'] == 'Salida':
-                            horas_candidatas = self._horas_entre(entrada_fecha_hora, siguiente['FECHA_HORA'])
+                if salida_idx is None:
+                    for j in range(i + 1, n):
+                        if estado[j] == self.ESTADO_SALIDA:
+                            horas_candidatas = self._horas_entre_ns(ns[i], ns[j])
                             if horas_candidatas <= 0:
                                 continue
                             if horas_candidatas > config.HORAS_MAXIMAS_TURNO:
                                 # Si la primera salida válida está demasiado lejos, no forzar emparejamiento.
                                 break
-                            salida = siguiente
                             salida_idx = j
                             break
-                        elif siguiente['ESTADO'] == 'Entrada':
+                        elif estado[j] == self.ESTADO_ENTRADA:
                             # Encontró otra entrada antes de salida
                             # Si es el mismo día, tratar como salida
-                            if siguiente['FECHA_HORA'].date() == entrada_fecha_hora.date():
+                            if dia[j] == dia[i]:
                                 # NO parear si la primera entrada es madrugada temprana (<8:00)
                                 # y la segunda ya está en ventana nocturna
                                 # Esto indica patrón de turno nocturno: la primera es salida del día anterior
-                                entrada_es_madrugada_temprana = entrada_hora < 8
-                                hora_siguiente = self._hora_decimal(siguiente['FECHA_HORA'])
-                                # Permitir un pequeño anticipo para entradas nocturnas
-                                # (ej. 18:47) y así evitar parear erróneamente una marca
-                                # de madrugada como entrada diurna del mismo día.
-                                umbral_nocturno_anticipado = max(
-                                    0,
-                                    config.HORA_INICIO_TURNO_NOCTURNO - 1
-                                )
-                                siguiente_es_nocturno_claro = hora_siguiente >= umbral_nocturno_anticipado
+                                entrada_es_madrugada_temprana = minuto_dia[i] < 480
+                                siguiente_es_nocturno_claro = hora_decimal[j] >= umbral_nocturno_anticipado
 
                                 if entrada_es_madrugada_temprana and siguiente_es_nocturno_claro:
                                     # No parear - la entrada de madrugada será salida de turno nocturno anterior
                                     break
 
-                                horas_candidatas = self._horas_entre(entrada_fecha_hora, siguiente['FECHA_HORA'])
+                                horas_candidatas = self._horas_entre_ns(ns[i], ns[j])
                                 if horas_candidatas <= 0 or horas_candidatas > config.HORAS_MAXIMAS_TURNO:
                                     break
-                                salida = siguiente
                                 salida_idx = j
                                 salida_corregida = True
                             break
 
+                banderas = Turno.ENTRADA_INFERIDA if inferido[i] else 0
+
                 # Construir turno
-                if salida is not None:
+                if salida_idx is not None:
                     # Turno completo
-                    salida_fecha_hora = salida['FECHA_HORA']
-                    horas_laboradas = (salida_fecha_hora - entrada_fecha_hora).total_seconds() / 3600
-
-                    # Determinar fecha del turno (fecha de entrada)
-                    fecha_turno = entrada_fecha_hora.date()
-
-                    # Determinar si es nocturno
-                    es_nocturno = False if castigo_marcacion_diurna else self.es_turno_nocturno(entrada_fecha_hora)
-
-                    turno = {
-                        'codigo': entrada['CODIGO'],
-                        'nombre': entrada['NOMBRE'],
-                        'fecha': fecha_turno,
-                        'entrada': entrada_fecha_hora,
-                        'salida': salida_fecha_hora,
-                        'horas': round(horas_laboradas, 2),
-                        'es_nocturno': es_nocturno,
-                        'completo': True,
-                        'entrada_inferida': entrada.get('ESTADO_INFERIDO', False),
-                        'salida_inferida': salida.get('ESTADO_INFERIDO', False),
-                        'salida_corregida': salida_corregida,
-                        'castigo_marcacion_diurna': castigo_marcacion_diurna,
-                        'nocturno_prospectivo': False,
-                        'salida_estandar_nocturna': False
-                    }
-
-                    turnos_empleado.append(turno)
+                    banderas |= Turno.COMPLETO
+                    if inferido[salida_idx]:
+                        banderas |= Turno.SALIDA_INFERIDA
+                    if salida_corregida:
+                        banderas |= Turno.SALIDA_CORREGIDA
+                    if castigo_marcacion_diurna:
+                        banderas |= Turno.CASTIGO_MARCACION_DIURNA
+                    elif self.es_turno_nocturno(hora_decimal[i]):
+                        banderas |= Turno.ES_NOCTURNO
+
+                    turnos_empleado.append(Turno(
+                        codigo[i], nombre[i], dia[i], ns[i], ns[salida_idx],
+                        round(self._horas_entre_ns(ns[i], ns[salida_idx]), 2), banderas
+                    ))
 
                     # Saltar a después de la salida
                     i = salida_idx + 1
 
                 else:
                     # Entrada sin salida
-                    fecha_turno = entrada_fecha_hora.date()
-                    salida_inferida_dt = None
-                    es_nocturno_inferido = self.es_turno_nocturno(entrada_fecha_hora)
+                    if self.es_turno_nocturno(hora_decimal[i]):
+                        banderas |= Turno.ES_NOCTURNO
 
                     # Regla especial vigilantes:
                     # Si quedó marca única en ventana AM/PM, cerrar a +12h.
-                    if aplicar_castigo_vigilante:
-                        if self._en_ventana(entrada_fecha_hora, config.VIGILANTE_VENTANA_AM):
-                            salida_inferida_dt = entrada_fecha_hora + timedelta(hours=12)
-                            es_nocturno_inferido = False
-                        elif self._en_ventana(entrada_fecha_hora, config.VIGILANTE_VENTANA_PM):
-                            salida_inferida_dt = entrada_fecha_hora + timedelta(hours=12)
-                            es_nocturno_inferido = True
-
-                    if salida_inferida_dt is not None:
-                        turno = {
-                            'codigo': entrada['CODIGO'],
-                            'nombre': entrada['NOMBRE'],
-                            'fecha': fecha_turno,
-                            'entrada': entrada_fecha_hora,
-                            'salida': salida_inferida_dt,
-                            'horas': round(self._horas_entre(entrada_fecha_hora, salida_inferida_dt), 2),
-                            'es_nocturno': es_nocturno_inferido,
-                            'completo': True,
-                            'entrada_inferida': entrada.get('ESTADO_INFERIDO', False),
-                            'salida_inferida': True,
-                            'salida_corregida': False,
-                            'castigo_marcacion_diurna': False,
-                            'nocturno_prospectivo': False,
-                            'salida_estandar_nocturna': False
-                        }
-                        turnos_empleado.append(turno)
+                    if aplicar_castigo_vigilante and (tabla_am[minuto_dia[i]] or tabla_pm[minuto_dia[i]]):
+                        banderas |= Turno.COMPLETO | Turno.SALIDA_INFERIDA
+                        if tabla_am[minuto_dia[i]]:
+                            banderas &= ~Turno.ES_NOCTURNO
+                        else:
+                            banderas |= Turno.ES_NOCTURNO
+
+                        turnos_empleado.append(Turno(
+                            codigo[i], nombre[i], dia[i], ns[i], ns[i] + doce_horas,
+                            round(self._horas_entre_ns(ns[i], ns[i] + doce_horas), 2), banderas
+                        ))
                         i += 1
                         continue
 
-                    turno = {
-                        'codigo': entrada['CODIGO'],
-                        'nombre': entrada['NOMBRE'],
-                        'fecha': fecha_turno,
-                        'entrada': entrada_fecha_hora,
-                        'salida': None,
-                        'horas': None,
-                        'es_nocturno': es_nocturno_inferido,
-                        'completo': False,
-                        'entrada_inferida': entrada.get('ESTADO_INFERIDO', False),
-                        'salida_inferida': False,
-                        'salida_corregida': False,
-                        'castigo_marcacion_diurna': False,
-                        'nocturno_prospectivo': False,
-                        'salida_estandar_nocturna': False
-                    }
-
-                    turnos_empleado.append(turno)
+                    abiertos_por_dia.setdefault(dia[i], []).append(len(turnos_empleado))
+                    if minuto_dia[i] < 600:
+                        madrugadas_por_dia.setdefault(dia[i], []).append(len(turnos_empleado))
+
+                    turnos_empleado.append(Turno(codigo[i], nombre[i], dia[i], ns[i], None, None, banderas))
                     i += 1
 
-            elif registro['ESTADO'] == 'Salida':
+            elif estado[i] == self.ESTADO_SALIDA:
                 # Salida sin entrada previa
-                salida_fecha_hora = registro['FECHA_HORA']
 
                 # Verificar si puede ser parte de un turno nocturno
                 # (salida en madrugada sin entrada en el mismo día)
-                if salida_fecha_hora.hour < 10:
-                    # Buscar si hay entrada del día anterior
-                    fecha_anterior = salida_fecha_hora.date() - timedelta(days=1)
-
-                    # Buscar entrada en turnos ya construidos
-                    entrada_previa = None
-                    for turno_prev in reversed(turnos_empleado):
-                        if turno_prev['fecha'] == fecha_anterior and turno_prev['salida'] is None:
-                            entrada_previa = turno_prev
-                            break
-
-                    if entrada_previa:
+                if minuto_dia[i] < 600:
+                    # Buscar entrada abierta (la más reciente) del día anterior
+                    abiertos = abiertos_por_dia.get(dia[i] - 1)
+                    if abiertos:
                         # Actualizar turno previo con esta salida
-                        entrada_previa['salida'] = salida_fecha_hora
-                        horas = (salida_fecha_hora - entrada_previa['entrada']).total_seconds() / 3600
-                        entrada_previa['horas'] = round(horas, 2)
-                        entrada_previa['completo'] = True
-                        entrada_previa['salida_inferida'] = registro.get('ESTADO_INFERIDO', False)
+                        entrada_previa = turnos_empleado[abiertos.pop()]
+                        entrada_previa.salida = ns[i]
+                        entrada_previa.horas = round(self._horas_entre_ns(entrada_previa.entrada, ns[i]), 2)
+                        entrada_previa.marcar(Turno.COMPLETO)
+                        entrada_previa.marcar(Turno.SALIDA_INFERIDA, inferido[i])
                         i += 1
                         continue
 
                 # Salida huérfana
                 # Asignar a la fecha de la salida
-                fecha_turno = salida_fecha_hora.date()
-
-                turno = {
-                    'codigo': registro['CODIGO'],
-                    'nombre': registro['NOMBRE'],
-                    'fecha': fecha_turno,
-                    'entrada': None,
-                    'salida': salida_fecha_hora,
-                    'horas': None,
-                    'es_nocturno': False,
-                    'completo': False,
-                    'entrada_inferida': False,
-                    'salida_inferida': registro.get('ESTADO_INFERIDO', False),
-                    'salida_corregida': False,
-                    'castigo_marcacion_diurna': False,
-                    'nocturno_prospectivo': False
-                }
-
-                turnos_empleado.append(turno)
+                banderas = Turno.SALIDA_INFERIDA if inferido[i] else 0
+                turnos_empleado.append(Turno(codigo[i], nombre[i], dia[i], None, ns[i], None, banderas))
                 i += 1
 
             else:
                 # Estado indefinido u otro
                 i += 1
 
+        return self._parear_nocturnos_prospectivos(turnos_empleado, madrugadas_por_dia)
+
+    def _parear_nocturnos_prospectivos(self, turnos_empleado, madrugadas_por_dia):
+        """
+        Post-procesamiento: parea entradas PM incompletas con la marca de la
+        mañana siguiente (azul) o con la salida estándar de las 6 AM (morado).
+
+        Args:
+            turnos_empleado: Lista de Turno del empleado en orden de construcción
+            madrugadas_por_dia: dict {dia: [posiciones]} de los turnos con
+                                entrada antes de las 10h y sin salida, en orden
+
+        Returns:
+            Lista de Turno con los pares nocturnos cerrados
+        """
+        salida_estandar = config.HORA_SALIDA_ESTANDAR_NOCTURNA * 60 * self.NS_MINUTO
+
         # Post-procesamiento: parear entradas PM incompletas con registros AM del día siguiente
         indices_a_eliminar = set()
         for idx_t, turno_t in enumerate(turnos_empleado):
             if idx_t in indices_a_eliminar:
                 continue
-            if (not turno_t['completo']
-                    and turno_t['entrada'] is not None
-                    and turno_t['salida'] is None
-                    and self.es_turno_nocturno(turno_t['entrada'])):
+            if (not turno_t.tiene(Turno.COMPLETO)
+                    and turno_t.entrada is not None
+                    and turno_t.salida is None
+                    and self.es_turno_nocturno(self._hora_decimal_ns(turno_t.entrada))):
 
                 encontro_marca_real = False
-                fecha_siguiente = turno_t['fecha'] + timedelta(days=1)
+                dia_siguiente = turno_t.dia + 1
 
                 # --- PASO 1: Buscar marca real en la mañana (Azul) ---
-                for idx_s, turno_s in enumerate(turnos_empleado):
+                for idx_s in madrugadas_por_dia.get(dia_siguiente, ()):
                     if idx_s in indices_a_eliminar or idx_s == idx_t:
                         continue
-                    if (not turno_s['completo']
-                            and turno_s['fecha'] == fecha_siguiente
-                            and turno_s['entrada'] is not None
-                            and turno_s['entrada'].hour < 10):
+                    turno_s = turnos_empleado[idx_s]
+                    if not turno_s.tiene(Turno.COMPLETO):
                         # Parear como turno nocturno (MARCA REAL)
-                        salida_dt = turno_s['entrada']
-                        horas = (salida_dt - turno_t['entrada']).total_seconds() / 3600
-                        turno_t['salida'] = salida_dt
-                        turno_t['horas'] = round(horas, 2)
-                        turno_t['completo'] = True
-                        turno_t['es_nocturno'] = True
-                        turno_t['nocturno_prospectivo'] = True
-                        turno_t['salida_estandar_nocturna'] = False  # Azul estándar
+                        turno_t.salida = turno_s.entrada
+                        turno_t.horas = round(self._horas_entre_ns(turno_t.entrada, turno_t.salida), 2)
+                        turno_t.marcar(Turno.COMPLETO | Turno.ES_NOCTURNO | Turno.NOCTURNO_PROSPECTIVO)
+                        turno_t.marcar(Turno.SALIDA_ESTANDAR_NOCTURNA, False)  # Azul estándar
                         indices_a_eliminar.add(idx_s)
                         encontro_marca_real = True
                         break
 
                 # --- PASO 2: Si NO hubo marca real, inferir 6 AM (Morado) ---
                 if not encontro_marca_real:
-                    salida_inferida = datetime.combine(
-                        fecha_siguiente,
-                        datetime.min.time()
-                    ).replace(hour=config.HORA_SALIDA_ESTANDAR_NOCTURNA)
-
-                    horas = (salida_inferida - turno_t['entrada']).total_seconds() / 3600
-                    turno_t['salida'] = salida_inferida
-                    turno_t['horas'] = round(horas, 2)
-                    turno_t['completo'] = True
-                    turno_t['es_nocturno'] = True
-                    turno_t['salida_estandar_nocturna'] = True  # Morado
-                    turno_t['salida_inferida'] = True
+                    turno_t.salida = dia_siguiente * self.NS_DIA + salida_estandar
+                    turno_t.horas = round(self._horas_entre_ns(turno_t.entrada, turno_t.salida), 2)
+                    turno_t.marcar(
+                        Turno.COMPLETO | Turno.ES_NOCTURNO
+                        | Turno.SALIDA_ESTANDAR_NOCTURNA  # Morado
+                        | Turno.SALIDA_INFERIDA
+                    )
 
         if indices_a_eliminar:
             turnos_empleado = [t for idx, t in enumerate(turnos_empleado) if idx not in indices_a_eliminar]
@@ -366,26 +460,33 @@ class ShiftBuilder:
 
         todos_los_turnos = []
 
+        # Arreglos de todas las marcaciones; cada empleado usa sus posiciones
+        arreglos = self._arreglos_marcaciones(df)
+
         # Procesar por empleado
-        for codigo in df['CODIGO'].unique():
-            df_empleado = df[df['CODIGO'] == codigo].copy()
-            turnos_empleado = self.construir_turnos_empleado(df_empleado)
-
-            # Registrar en log
-            for turno in turnos_empleado:
-                logger.log_turno(
-                    empleado=f"{turno['codigo']} - {turno['nombre']}",
-                    fecha=turno['fecha'],
-                    entrada=turno['entrada'].strftime('%H:%M') if turno['entrada'] else None,
-                    salida=turno['salida'].strftime('%H:%M') if turno['salida'] else None,
-                    horas=turno['horas'],
-                    es_completo=turno['completo']
-                )
+        for posiciones in df.groupby('CODIGO', sort=False).indices.values():
+            posiciones = posiciones[np.argsort(arreglos['ns'][posiciones], kind='stable')]
+            turnos_empleado = self._construir_turnos_arreglos(arreglos, posiciones)
 
             todos_los_turnos.extend(turnos_empleado)
 
-        # Convertir a DataFrame
-        df_turnos = pd.DataFrame(todos_los_turnos)
+        # Convertir a DataFrame (una sola conversión columnar)
+        df_turnos = Turno.a_dataframe(todos_los_turnos)
+
+        # Registrar en log
+        entradas = df_turnos['entrada'].dt.strftime('%H:%M')
+        salidas = df_turnos['salida'].dt.strftime('%H:%M')
+        for fila in zip(df_turnos['codigo'], df_turnos['nombre'], df_turnos['fecha'], entradas,
+                        salidas, df_turnos['horas'], df_turnos['completo']):
+            codigo, nombre, fecha, entrada, salida, horas, completo = fila
+            logger.log_turno(
+                empleado=f"{codigo} - {nombre}",
+                fecha=fecha,
+                entrada=entrada if pd.notna(entrada) else None,
+                salida=salida if pd.notna(salida) else None,
+                horas=horas if pd.notna(horas) else None,
+                es_completo=completo
+            )
 
         logger.info(config.MENSAJES['turnos_construidos'])
         logger.info(f"Total turnos: {len(df_turnos)}")
@@ -406,11 +507,12 @@ class ShiftBuilder:
         if not self.turnos:
             return {'total_turnos': 0}
 
-        df_turnos = pd.DataFrame(self.turnos)
+        banderas = np.fromiter((t.banderas for t in self.turnos), dtype=np.int64, count=len(self.turnos))
+        completos = int(np.count_nonzero(banderas & Turno.COMPLETO))
 
         return {
             'total_turnos': len(self.turnos),
-            'turnos_completos': df_turnos['completo'].sum(),
-            'turnos_incompletos': (~df_turnos['completo']).sum(),
-            'turnos_nocturnos': df_turnos['es_nocturno'].sum() if 'es_nocturno' in df_turnos else 0
+            'turnos_completos': completos,
+            'turnos_incompletos': len(self.turnos) - completos,
+            'turnos_nocturnos': int(np.count_nonzero(banderas & Turno.ES_NOCTURNO))
         }
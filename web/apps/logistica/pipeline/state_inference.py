@@ -3,8 +3,12 @@ Módulo de Inferencia de Estados
 Deduce si una marcación sin estado es Entrada o Salida
 """
 
+from datetime import timedelta
+
+import numpy as np
 import pandas as pd
 from . import config
+from .day_index import DayIndex
 from .logger import logger
 
 
@@ -15,77 +19,64 @@ class StateInference:
         """Inicializa el inferidor de estados"""
         self.inferencias_realizadas = []
 
-    def inferir_por_hora(self, hora):
+    def inferir_por_hora_serie(self, fechas):
         """
-        Infiere estado basándose en la hora del día
+        Infiere el estado por la hora del día de cada marcación
 
         Args:
-            hora: Hora (0-23)
+            fechas: Serie de datetimes
 
         Returns:
-            'Entrada', 'Salida', o None si no se puede inferir
+            Serie con 'Entrada', 'Salida' o None, alineada con fechas
         """
-        # Verificar rangos de entrada
-        for rango_inicio, rango_fin in config.RANGO_INFERENCIA_ENTRADA:
-            if rango_inicio <= hora < rango_fin:
-                return 'Entrada'
-
-        # Verificar rangos de salida
-        for rango_inicio, rango_fin in config.RANGO_INFERENCIA_SALIDA:
-            if rango_inicio <= hora < rango_fin:
-                return 'Salida'
-
-        return None
+        es_entrada = config.clasificar_por_minuto(fechas, config.TABLA_MINUTOS_INFERENCIA_ENTRADA)
+        es_salida = config.clasificar_por_minuto(fechas, config.TABLA_MINUTOS_INFERENCIA_SALIDA)
+        estados = np.where(es_entrada, 'Entrada', np.where(es_salida, 'Salida', None))
+        return pd.Series(estados, index=fechas.index, dtype=object)
 
-    def inferir_por_contexto(self, df_empleado, idx_actual):
+    def inferir_por_contexto_serie(self, codigos, fechas, estados):
         """
-        Infiere estado basándose en marcaciones anteriores/posteriores
+        Infiere el estado de cada marcación por sus marcaciones vecinas
+
+        El estado anterior y posterior conocido de cada registro se obtiene con
+        forward-fill / back-fill de ESTADO agrupado por empleado, y la tabla de
+        decisión se aplica con máscaras.
 
         Args:
-            df_empleado: DataFrame del empleado
-            idx_actual: Índice de la marcación actual
+            codigos: Serie con el CODIGO de cada registro
+            fechas: Serie datetime con FECHA_HORA
+            estados: array con el ESTADO conocido (NaN/None si falta)
 
         Returns:
-            'Entrada', 'Salida', o None
+            Array object con 'Entrada', 'Salida' o None por registro (solo tiene
+            sentido en los registros sin estado)
         """
-        # Obtener marcación actual
-        registro_actual = df_empleado.iloc[idx_actual]
-
-        # Buscar marcación anterior válida
-        estado_anterior = None
-        for i in range(idx_actual - 1, -1, -1):
-            if pd.notna(df_empleado.iloc[i]['ESTADO']):
-                estado_anterior = df_empleado.iloc[i]['ESTADO']
-                break
-
-        # Buscar marcación posterior válida
-        estado_posterior = None
-        for i in range(idx_actual + 1, len(df_empleado)):
-            if pd.notna(df_empleado.iloc[i]['ESTADO']):
-                estado_posterior = df_empleado.iloc[i]['ESTADO']
-                break
-
-        # Lógica de inferencia
-        if estado_anterior == 'Entrada' and (estado_posterior is None or estado_posterior == 'Entrada'):
+        codigos = np.asarray(codigos)
+        serie = pd.Series(estados, dtype=object)
+        grupos = serie.groupby(codigos, sort=False)
+
+        # En una fila sin estado, ffill/bfill devuelven el estado conocido
+        # inmediatamente anterior/posterior del mismo empleado
+        anterior = grupos.ffill().to_numpy()
+        posterior = grupos.bfill().to_numpy()
+        sin_anterior = pd.isna(anterior)
+        sin_posterior = pd.isna(posterior)
+        madrugada = np.asarray(fechas.dt.hour) < 10
+
+        condiciones = [
             # Después de entrada sin salida registrada -> probablemente Salida
-            return 'Salida'
-
-        if estado_anterior == 'Salida' and (estado_posterior is None or estado_posterior == 'Salida'):
+            (anterior == 'Entrada') & (sin_posterior | (posterior == 'Entrada')),
             # Después de salida -> probablemente Entrada
-            return 'Entrada'
-
-        if estado_anterior is None and estado_posterior == 'Salida':
+            (anterior == 'Salida') & (sin_posterior | (posterior == 'Salida')),
             # Antes de salida -> probablemente Entrada
-            return 'Entrada'
-
-        if estado_anterior is None and estado_posterior == 'Entrada':
-            # Antes de entrada -> podría ser Salida del turno anterior
-            # Verificar hora
-            hora = registro_actual['FECHA_HORA'].hour
-            if hora < 10:  # Madrugada
-                return 'Salida'
-
-        return None
+            sin_anterior & (posterior == 'Salida'),
+            # Antes de entrada en madrugada -> Salida del turno anterior
+            sin_anterior & (posterior == 'Entrada') & madrugada,
+        ]
+        resultado = np.select(condiciones, ['Salida', 'Entrada', 'Entrada', 'Salida'], default='')
+        resultado = resultado.astype(object)
+        resultado[resultado == ''] = None
+        return resultado
 
     def inferir_por_horario_cargo(self, timestamps_dia, horarios):
         """
@@ -94,7 +85,8 @@ class StateInference:
 
         Para cargos con múltiples turnos (hasta 6), evalúa todos y elige el que
         minimiza la desviación total entre el primer/último registro del día y
-        las horas de entrada/salida esperadas del turno.
+        las horas de entrada/salida esperadas del turno. Es la versión de un solo
+        día de inferir_por_horario_lote.
 
         Args:
             timestamps_dia: lista de datetime con TODOS los registros del día
@@ -109,59 +101,119 @@ class StateInference:
         if not horarios or not timestamps_dia:
             return {}
 
-        def to_min(dt):
-            return dt.hour * 60 + dt.minute
+        minutos = np.array([ts.hour * 60 + ts.minute for ts in timestamps_dia])
+        _, matriz = self.matriz_horarios({0: horarios})
+
+        turno, etiquetas = self.inferir_por_horario_lote(
+            primeros=minutos.min(keepdims=True),
+            ultimos=minutos.max(keepdims=True),
+            n_registros=np.array([len(minutos)]),
+            matriz_horarios=matriz,
+            cargo_dia=np.zeros(1, dtype=np.intp),
+            dia_registro=np.zeros(len(minutos), dtype=np.intp),
+            minutos_registro=minutos,
+        )
+        if turno[0] < 0:
+            return {}
+
+        return dict(zip(timestamps_dia, etiquetas))
 
-        def normalizar(h_ini, h_fin):
-            # Turno nocturno: salida del día siguiente → sumar 1440 min (24h)
-            return (h_ini, h_fin + 1440 if h_fin < h_ini else h_fin)
+    @staticmethod
+    def matriz_horarios(horarios_por_codigo):
+        """
+        Construye la matriz de horarios rellenada (padded) para inferir_por_horario_lote.
+
+        Args:
+            horarios_por_codigo: dict {codigo: [(entrada_min, salida_min), ...]}
+
+        Returns:
+            Tupla (indice, matriz): indice es un dict {codigo: fila} y matriz un
+            array float de forma (n_cargos, max_turnos, 2) con NaN en los turnos
+            que no existen para ese cargo.
+        """
+        codigos = [codigo for codigo, horarios in horarios_por_codigo.items() if horarios]
+        max_turnos = max((len(horarios_por_codigo[c]) for c in codigos), default=1)
 
-        ts_sorted = sorted(timestamps_dia, key=to_min)
-        ts_primero = to_min(ts_sorted[0])
-        ts_ultimo  = to_min(ts_sorted[-1])
+        matriz = np.full((len(codigos), max_turnos, 2), np.nan)
+        for fila, codigo in enumerate(codigos):
+            horarios = horarios_por_codigo[codigo]
+            matriz[fila, :len(horarios)] = horarios
 
-        mejor_horario = None
-        mejor_dev     = float('inf')
+        return {codigo: fila for fila, codigo in enumerate(codigos)}, matriz
 
-        for h_ini, h_fin in horarios:
-            h_ini_n, h_fin_n = normalizar(h_ini, h_fin)
+    def inferir_por_horario_lote(self, primeros, ultimos, n_registros, matriz_horarios,
+                                 cargo_dia, dia_registro, minutos_registro):
+        """
+        Best-fit de turno para muchos días-empleado a la vez.
 
-            # Para turnos nocturnos, la salida cruza medianoche.
-            # Si el último ts es de madrugada (< 8h), interpretarlo como día siguiente.
-            ts_ult_adj = ts_ultimo
-            if h_fin_n > 1440 and ts_ultimo < 480:
-                ts_ult_adj = ts_ultimo + 1440
+        Calcula con broadcasting la desviación de cada día contra todos los turnos
+        de su cargo (normalizando los turnos nocturnos con +1440 min) y etiqueta
+        cada registro según su cercanía a la entrada o salida del turno ganador.
 
-            if len(ts_sorted) >= 2:
-                dev = abs(ts_primero - h_ini_n) + abs(ts_ult_adj - h_fin_n)
-            else:
-                # Un solo registro: tomar la distancia mínima a entrada o salida
-                dev = min(abs(ts_primero - h_ini_n), abs(ts_ult_adj - h_fin_n))
+        Args:
+            primeros: array (n_dias,) con el minuto del día del primer registro
+            ultimos: array (n_dias,) con el minuto del día del último registro
+            n_registros: array (n_dias,) con la cantidad de registros del día
+            matriz_horarios: array (n_cargos, max_turnos, 2) de matriz_horarios()
+            cargo_dia: array (n_dias,) con la fila de matriz_horarios de cada día
+            dia_registro: array (n_registros,) con el día (0..n_dias-1) de cada registro a etiquetar
+            minutos_registro: array (n_registros,) con el minuto del día de cada registro
 
-            if dev < mejor_dev:
-                mejor_dev     = dev
-                mejor_horario = (h_ini_n, h_fin_n)
+        Returns:
+            Tupla (turno, etiquetas): turno es un array (n_dias,) con el índice del
+            turno ganador o -1 si ninguno encaja en la tolerancia; etiquetas es un
+            array object (n_registros,) con 'Entrada', 'Salida' o None.
+        """
+        horarios = matriz_horarios[cargo_dia]
+        h_ini = horarios[:, :, 0]
+        # Turno nocturno: salida del día siguiente → sumar 1440 min (24h)
+        h_fin = np.where(horarios[:, :, 1] < h_ini, horarios[:, :, 1] + 1440, horarios[:, :, 1])
+        cruza_medianoche = h_fin > 1440
+
+        primeros = np.asarray(primeros, dtype=float)[:, None]
+        ultimos = np.asarray(ultimos, dtype=float)[:, None]
+        n_registros = np.asarray(n_registros)
+
+        # Para turnos nocturnos, si el último registro es de madrugada (< 8h),
+        # interpretarlo como del día siguiente.
+        ultimos = np.where(cruza_medianoche & (ultimos < 480), ultimos + 1440, ultimos)
+
+        dev_entrada = np.abs(primeros - h_ini)
+        dev_salida = np.abs(ultimos - h_fin)
+        # Un solo registro: tomar la distancia mínima a entrada o salida
+        desviacion = np.where(
+            (n_registros >= 2)[:, None],
+            dev_entrada + dev_salida,
+            np.minimum(dev_entrada, dev_salida),
+        )
+        desviacion = np.where(np.isnan(desviacion), np.inf, desviacion)
+
+        turno = desviacion.argmin(axis=1)
+        mejor_dev = desviacion[np.arange(len(turno)), turno]
 
         # Si la desviación supera la tolerancia por extremo → no inferir
-        n_extremos = 1 if len(ts_sorted) == 1 else 2
-        if mejor_dev > config.TOLERANCIA_HORARIO_MIN * n_extremos:
-            return {}
+        n_extremos = np.where(n_registros == 1, 1, 2)
+        valido = mejor_dev <= config.TOLERANCIA_HORARIO_MIN * n_extremos
+        turno = np.where(valido, turno, -1)
 
-        # Etiquetar cada timestamp según proximidad al mejor horario
-        resultado = {}
-        h_ini_n, h_fin_n = mejor_horario
+        # Etiquetar cada registro según proximidad al turno ganador de su día
+        dia_registro = np.asarray(dia_registro, dtype=np.intp)
+        turno_registro = turno[dia_registro]
+        turno_seguro = np.maximum(turno_registro, 0)
+        ini_registro = h_ini[dia_registro, turno_seguro]
+        fin_registro = h_fin[dia_registro, turno_seguro]
 
-        for ts in timestamps_dia:
-            ts_min = to_min(ts)
-            if h_fin_n > 1440 and ts_min < 480:
-                ts_min += 1440
-            dist_ent = abs(ts_min - h_ini_n)
-            dist_sal = abs(ts_min - h_fin_n)
-            resultado[ts] = 'Entrada' if dist_ent <= dist_sal else 'Salida'
+        minutos = np.asarray(minutos_registro, dtype=float)
+        minutos = np.where((fin_registro > 1440) & (minutos < 480), minutos + 1440, minutos)
 
-        return resultado
+        etiquetas = np.where(
+            np.abs(minutos - ini_registro) <= np.abs(minutos - fin_registro), 'Entrada', 'Salida'
+        ).astype(object)
+        etiquetas[turno_registro < 0] = None
+
+        return turno, etiquetas
 
-    def _tiene_entrada_nocturna_dia_anterior(self, df_empleado, fecha, horarios):
+    def _tiene_entrada_nocturna_dia_anterior(self, minutos_dia_anterior, horarios):
         """
         Determina si el empleado tuvo una entrada de turno nocturno el día anterior,
         lo que implica que los registros de madrugada del día actual son la SALIDA
@@ -173,71 +225,203 @@ class StateInference:
              la ventana de entrada del turno nocturno (±TOLERANCIA_HORARIO_MIN).
 
         Args:
-            df_empleado: DataFrame con todos los registros del empleado.
-            fecha: date del día que se está evaluando (el "día siguiente").
+            minutos_dia_anterior: array con el minuto del día (0-1439) de cada
+                                  registro del empleado en el día anterior.
             horarios: list of (entrada_min, salida_min) del cargo.
 
         Returns:
             True si se confirma contexto nocturno del día anterior, False si no.
         """
-        from datetime import timedelta
-
         # Identificar turnos nocturnos del cargo (salida cruda < entrada)
-        turnos_nocturnos = [
-            (h_ini, h_fin) for h_ini, h_fin in horarios if h_fin < h_ini
-        ]
-        if not turnos_nocturnos:
-            return False
-
-        # Buscar registros del día anterior
-        dia_anterior = fecha - timedelta(days=1)
-        mask = df_empleado['FECHA_HORA'].dt.date == dia_anterior
-        registros_ant = df_empleado[mask]
-
-        if registros_ant.empty:
+        entradas_nocturnas = [h_ini for h_ini, h_fin in horarios if h_fin < h_ini]
+        if not entradas_nocturnas or len(minutos_dia_anterior) == 0:
             return False
 
         # Verificar si algún registro del día anterior está cerca de
         # la hora de entrada del turno nocturno
-        for h_ini, _ in turnos_nocturnos:
-            for _, reg in registros_ant.iterrows():
-                reg_min = reg['FECHA_HORA'].hour * 60 + reg['FECHA_HORA'].minute
-                if abs(reg_min - h_ini) <= config.TOLERANCIA_HORARIO_MIN:
-                    return True
-
-        return False
+        distancias = np.abs(
+            np.asarray(minutos_dia_anterior)[:, None] - np.asarray(entradas_nocturnas)[None, :]
+        )
+        return bool((distancias <= config.TOLERANCIA_HORARIO_MIN).any())
 
-    def inferir_por_patron_empleado(self, df_empleado):
+    def _inferir_por_horario_dias(self, df, horarios_por_codigo, indice_dias, estados, metodos,
+                                  orden_dia, orden_fase):
         """
-        Analiza el patrón histórico del empleado
-
-        Args:
-            df_empleado: DataFrame del empleado
+        Método 0: contexto nocturno del día anterior y best-fit de turno del cargo,
+        en un solo recorrido agrupado por (CODIGO, día).
 
-        Returns:
-            Dict con información del patrón
+        Modifica en sitio los arrays estados, metodos, orden_dia y orden_fase.
         """
-        # Analizar marcaciones válidas
-        marcaciones_validas = df_empleado[df_empleado['ESTADO'].notna()]
-
-        if len(marcaciones_validas) == 0:
-            return {'tipo_turno': 'desconocido'}
-
-        # Analizar horas de entrada
-        entradas = marcaciones_validas[marcaciones_validas['ESTADO'] == 'Entrada']
-
-        if len(entradas) > 0:
-            horas_entrada = entradas['FECHA_HORA'].dt.hour
-            hora_promedio_entrada = horas_entrada.mean()
-
-            if hora_promedio_entrada >= config.HORA_INICIO_TURNO_NOCTURNO:
-                return {'tipo_turno': 'nocturno', 'hora_entrada_tipica': hora_promedio_entrada}
-            else:
-                return {'tipo_turno': 'diurno', 'hora_entrada_tipica': hora_promedio_entrada}
-
-        return {'tipo_turno': 'desconocido'}
+        fechas = df['FECHA_HORA']
+        minutos = (fechas.dt.hour * 60 + fechas.dt.minute).to_numpy()
+        horas = fechas.dt.hour.to_numpy()
+        ordinal_dia = fechas.to_numpy().astype('datetime64[D]').astype('int64')
+        un_dia = timedelta(days=1)
+
+        indice_cargo, matriz = self.matriz_horarios(horarios_por_codigo)
+
+        # Acumuladores del lote de best-fit (un elemento por día-empleado)
+        cargo_dia, primeros, ultimos, n_registros = [], [], [], []
+        dia_registro, posiciones_registro = [], []
+
+        for (codigo, dia), posiciones in indice_dias.grupos():
+            horarios = horarios_por_codigo.get(codigo)
+            if not horarios:
+                continue
+
+            # Solo actuar si el día tiene al menos un NaN
+            if not pd.isna(estados[posiciones]).any():
+                continue
+
+            orden_dia[posiciones] = ordinal_dia[posiciones]
+
+            # ── Contexto nocturno del día anterior ───────────────────
+            # Si el empleado tuvo una entrada nocturna ayer, los registros
+            # de madrugada de hoy son la SALIDA de ese turno.
+            # Se corrigen tanto los NaN como los que el dispositivo marcó
+            # incorrectamente como "Entrada" (error común del huellero).
+            nocturno = self._tiene_entrada_nocturna_dia_anterior(
+                indice_dias.minutos(codigo, dia - un_dia), horarios
+            )
+
+            if nocturno:
+                for pos in posiciones:
+                    estado_actual = estados[pos]
+                    # Aplica si: es madrugada Y (sin estado O device marcó "Entrada")
+                    if horas[pos] < 8 and (pd.isna(estado_actual) or estado_actual == 'Entrada'):
+                        metodos[pos] = (
+                            'nocturno_dia_anterior'
+                            if pd.isna(estado_actual)
+                            else 'nocturno_dia_anterior_correccion'
+                        )
+                        estados[pos] = 'Salida'
+
+                # Excluir los registros de madrugada (hora < 8) del best-fit:
+                # son salidas del turno anterior y contaminarían el ajuste
+                # del turno actual.
+                posiciones = posiciones[horas[posiciones] >= 8]
+                if len(posiciones) == 0:
+                    continue
+
+            pendientes = posiciones[pd.isna(estados[posiciones])]
+            if len(pendientes) == 0:
+                continue
+
+            # ── Encolar el día para el best-fit en lote ──────────────
+            minutos_dia = minutos[posiciones]
+            dia_registro.append(np.full(len(pendientes), len(cargo_dia)))
+            posiciones_registro.append(pendientes)
+            cargo_dia.append(indice_cargo[codigo])
+            primeros.append(minutos_dia.min())
+            ultimos.append(minutos_dia.max())
+            n_registros.append(len(minutos_dia))
+
+        if not cargo_dia:
+            return
+
+        # ── Best-fit de turno para los NaN restantes, todos los días a la vez ──
+        _, etiquetas = self.inferir_por_horario_lote(
+            primeros=np.array(primeros),
+            ultimos=np.array(ultimos),
+            n_registros=np.array(n_registros),
+            matriz_horarios=matriz,
+            cargo_dia=np.array(cargo_dia, dtype=np.intp),
+            dia_registro=np.concatenate(dia_registro),
+            minutos_registro=minutos[np.concatenate(posiciones_registro)],
+        )
+
+        posiciones_registro = np.concatenate(posiciones_registro)
+        etiquetados = pd.notna(etiquetas)
+        posiciones_registro = posiciones_registro[etiquetados]
+        estados[posiciones_registro] = etiquetas[etiquetados]
+        metodos[posiciones_registro] = 'horario_cargo'
+        orden_fase[posiciones_registro] = 1
+
+    def _inferir_fallback(self, df, estados, metodos, orden_fase):
+        """
+        Métodos 1-3 (hora, contexto y patrón nocturno) para los NaN que quedan
+        después del método 0. El contexto y el patrón se evalúan sobre los estados
+        vigentes al terminar el método 0.
 
-    def inferir_estados(self, df, horarios_por_codigo=None):
+        Modifica en sitio los arrays estados, metodos y orden_fase.
+        """
+        pendientes = pd.isna(estados)
+        if not pendientes.any():
+            return
+
+        fechas = df['FECHA_HORA']
+        horas = fechas.dt.hour.to_numpy()
+
+        # Método 3 (patrón): promedio de hora de Entrada por empleado
+        es_entrada = pd.Series(estados == 'Entrada', index=df.index)
+        hora_promedio = fechas.dt.hour.where(es_entrada).groupby(df['CODIGO']).mean()
+        codigos_nocturnos = set(
+            hora_promedio.index[hora_promedio >= config.HORA_INICIO_TURNO_NOCTURNO]
+        )
+
+        # Método 1: por hora (toda la columna)
+        estado_inferido = self.inferir_por_hora_serie(fechas).to_numpy()
+        metodo = np.where(pd.notna(estado_inferido), 'hora', None).astype(object)
+
+        # Método 2: por contexto (estados anterior/posterior del empleado)
+        faltante = pd.isna(estado_inferido)
+        por_contexto = self.inferir_por_contexto_serie(df['CODIGO'], fechas, estados)
+        estado_inferido = np.where(faltante, por_contexto, estado_inferido)
+        metodo[faltante] = 'contexto'
+
+        # Método 3: por patrón nocturno del empleado
+        faltante = pd.isna(estado_inferido) & df['CODIGO'].isin(codigos_nocturnos).to_numpy()
+        patron_entrada = faltante & (horas >= 16) & (horas <= 23)
+        patron_salida = faltante & (horas >= 0) & (horas <= 6)
+        estado_inferido[patron_entrada] = 'Entrada'
+        estado_inferido[patron_salida] = 'Salida'
+        metodo[patron_entrada | patron_salida] = 'patron_nocturno'
+
+        # Solo los registros pendientes de empleados válidos reciben inferencia
+        aplicar = pendientes & df['CODIGO'].notna().to_numpy() & pd.notna(estado_inferido)
+        estados[aplicar] = estado_inferido[aplicar]
+        metodos[aplicar] = metodo[aplicar]
+        orden_fase[aplicar] = 2
+
+    def _registrar_inferencias(self, df, mask_inferido, estados, metodos, orden_dia, orden_fase):
+        """
+        Registra en el log y en inferencias_realizadas las inferencias aplicadas,
+        en el mismo orden en que las producía el recorrido empleado por empleado:
+        método 0 día por día (nocturno y luego best-fit), después los fallback.
+        """
+        posiciones = np.flatnonzero(mask_inferido)
+        orden_empleado = pd.factorize(df['CODIGO'])[0]
+        orden = np.lexsort((
+            posiciones,
+            orden_fase[posiciones],
+            orden_dia[posiciones] * (orden_fase[posiciones] < 2),
+            orden_fase[posiciones] == 2,
+            orden_empleado[posiciones],
+        ))
+        posiciones = posiciones[orden]
+
+        codigos = df['CODIGO'].to_numpy()[posiciones]
+        nombres = df['NOMBRE'].to_numpy()[posiciones]
+        fechas = df['FECHA_HORA'].iloc[posiciones]
+
+        for codigo, nombre, fecha_hora, estado, metodo in zip(
+            codigos, nombres, fechas, estados[posiciones], metodos[posiciones]
+        ):
+            logger.log_inferencia(
+                empleado=f"{codigo} - {nombre}",
+                fecha_hora=fecha_hora,
+                estado_inferido=estado,
+                metodo=metodo,
+            )
+            self.inferencias_realizadas.append({
+                'codigo': codigo,
+                'nombre': nombre,
+                'fecha_hora': fecha_hora,
+                'estado': estado,
+                'metodo': metodo,
+            })
+
+    def inferir_estados(self, df, horarios_por_codigo=None, indice_dias=None):
         """
         Infiere todos los estados faltantes en el DataFrame.
 
@@ -251,6 +435,8 @@ class StateInference:
             df: DataFrame con los datos
             horarios_por_codigo: dict {codigo: [(entrada_min, salida_min), ...]}
                                  Obtenido desde DB o Excel. Opcional.
+            indice_dias: DayIndex ya construido sobre df (opcional; se construye
+                         si no se provee)
 
         Returns:
             DataFrame con estados inferidos
@@ -273,145 +459,30 @@ class StateInference:
         if horarios_por_codigo:
             logger.info("Método 0 activo: inferencia por horario de cargo")
 
-        # Procesar por empleado
-        for codigo in df_procesado['CODIGO'].unique():
-            df_empleado = df_procesado[df_procesado['CODIGO'] == codigo].copy()
-
-            # ── Método 0: Por horario de cargo ───────────────────────────────
-            if horarios_por_codigo and codigo in horarios_por_codigo:
-                horarios = horarios_por_codigo[codigo]
-
-                for fecha in df_empleado['FECHA_HORA'].dt.date.unique():
-                    mask_dia = df_empleado['FECHA_HORA'].dt.date == fecha
-                    idx_dia  = df_empleado.index[mask_dia].tolist()
-
-                    # Solo actuar si el día tiene al menos un NaN
-                    if not any(pd.isna(df_empleado.loc[i, 'ESTADO']) for i in idx_dia):
-                        continue
-
-                    # ── Contexto nocturno del día anterior ───────────────────
-                    # Si el empleado tuvo una entrada nocturna ayer, los registros
-                    # de madrugada de hoy son la SALIDA de ese turno.
-                    # Se corrigen tanto los NaN como los que el dispositivo marcó
-                    # incorrectamente como "Entrada" (error común del huellero).
-                    if self._tiene_entrada_nocturna_dia_anterior(df_empleado, fecha, horarios):
-                        for idx in idx_dia:
-                            ts = df_empleado.loc[idx, 'FECHA_HORA']
-                            estado_actual = df_empleado.loc[idx, 'ESTADO']
-                            es_madrugada = ts.hour < 8
-
-                            # Aplica si: es madrugada Y (sin estado O device marcó "Entrada")
-                            if es_madrugada and (pd.isna(estado_actual) or estado_actual == 'Entrada'):
-                                metodo = (
-                                    'nocturno_dia_anterior'
-                                    if pd.isna(estado_actual)
-                                    else 'nocturno_dia_anterior_correccion'
-                                )
-                                df_procesado.loc[idx, 'ESTADO'] = 'Salida'
-                                df_procesado.loc[idx, 'ESTADO_INFERIDO'] = True
-                                df_empleado.loc[idx, 'ESTADO'] = 'Salida'
-                                registro = df_empleado.loc[idx]
-                                logger.log_inferencia(
-                                    empleado=f"{registro['CODIGO']} - {registro['NOMBRE']}",
-                                    fecha_hora=ts,
-                                    estado_inferido='Salida',
-                                    metodo=metodo,
-                                )
-                                self.inferencias_realizadas.append({
-                                    'codigo': registro['CODIGO'],
-                                    'nombre': registro['NOMBRE'],
-                                    'fecha_hora': ts,
-                                    'estado': 'Salida',
-                                    'metodo': metodo,
-                                })
-                        # Recargar para que el best-fit vea los estados ya asignados
-                        df_empleado = df_procesado[df_procesado['CODIGO'] == codigo].copy()
-
-                    # ── Best-fit de turno para los NaN restantes del día ─────
-                    # Si se aplicó corrección nocturna, excluir los registros de
-                    # madrugada (hora < 8) del cálculo: son salidas del turno
-                    # anterior y contaminarían el best-fit del turno actual.
-                    if self._tiene_entrada_nocturna_dia_anterior(df_empleado, fecha, horarios):
-                        timestamps_dia = [
-                            df_empleado.loc[i, 'FECHA_HORA']
-                            for i in idx_dia
-                            if df_empleado.loc[i, 'FECHA_HORA'].hour >= 8
-                        ]
-                    else:
-                        timestamps_dia = df_empleado.loc[idx_dia, 'FECHA_HORA'].tolist()
-                    resultado = self.inferir_por_horario_cargo(timestamps_dia, horarios)
-
-                    for idx in idx_dia:
-                        if pd.isna(df_empleado.loc[idx, 'ESTADO']):
-                            ts = df_empleado.loc[idx, 'FECHA_HORA']
-                            estado_inferido = resultado.get(ts)
-                            if estado_inferido:
-                                df_procesado.loc[idx, 'ESTADO'] = estado_inferido
-                                df_procesado.loc[idx, 'ESTADO_INFERIDO'] = True
-                                df_empleado.loc[idx, 'ESTADO'] = estado_inferido
-                                registro = df_empleado.loc[idx]
-                                logger.log_inferencia(
-                                    empleado=f"{registro['CODIGO']} - {registro['NOMBRE']}",
-                                    fecha_hora=ts,
-                                    estado_inferido=estado_inferido,
-                                    metodo='horario_cargo',
-                                )
-                                self.inferencias_realizadas.append({
-                                    'codigo': registro['CODIGO'],
-                                    'nombre': registro['NOMBRE'],
-                                    'fecha_hora': ts,
-                                    'estado': estado_inferido,
-                                    'metodo': 'horario_cargo',
-                                })
-
-                # Recargar df_empleado para que los métodos de fallback
-                # vean los estados ya inferidos por el método 0
-                df_empleado = df_procesado[df_procesado['CODIGO'] == codigo].copy()
-
-            # ── Métodos 1-3: Fallback para NaN restantes ─────────────────────
-            patron = self.inferir_por_patron_empleado(df_empleado)
-
-            for idx in df_empleado.index:
-                if pd.isna(df_empleado.loc[idx, 'ESTADO']):
-                    registro = df_empleado.loc[idx]
-                    hora = registro['FECHA_HORA'].hour
-
-                    # Método 1: Por hora
-                    estado_inferido = self.inferir_por_hora(hora)
-                    metodo = 'hora'
-
-                    # Método 2: Por contexto
-                    if estado_inferido is None:
-                        idx_local = df_empleado.index.get_loc(idx)
-                        estado_inferido = self.inferir_por_contexto(df_empleado, idx_local)
-                        metodo = 'contexto'
-
-                    # Método 3: Por patrón nocturno
-                    if estado_inferido is None and patron['tipo_turno'] == 'nocturno':
-                        if 16 <= hora <= 23:
-                            estado_inferido = 'Entrada'
-                            metodo = 'patron_nocturno'
-                        elif 0 <= hora <= 6:
-                            estado_inferido = 'Salida'
-                            metodo = 'patron_nocturno'
-
-                    # Aplicar inferencia
-                    if estado_inferido:
-                        df_procesado.loc[idx, 'ESTADO'] = estado_inferido
-                        df_procesado.loc[idx, 'ESTADO_INFERIDO'] = True
-                        logger.log_inferencia(
-                            empleado=f"{registro['CODIGO']} - {registro['NOMBRE']}",
-                            fecha_hora=registro['FECHA_HORA'],
-                            estado_inferido=estado_inferido,
-                            metodo=metodo,
-                        )
-                        self.inferencias_realizadas.append({
-                            'codigo': registro['CODIGO'],
-                            'nombre': registro['NOMBRE'],
-                            'fecha_hora': registro['FECHA_HORA'],
-                            'estado': estado_inferido,
-                            'metodo': metodo,
-                        })
+        # Estado de trabajo por posición; las inferencias se aplican en bloque al final
+        estados = df_procesado['ESTADO'].to_numpy(dtype=object, copy=True)
+        metodos = np.full(len(df_procesado), None, dtype=object)
+        # Orden de registro de cada inferencia: (día, sub-fase) para el método 0
+        orden_dia = np.zeros(len(df_procesado), dtype='int64')
+        orden_fase = np.zeros(len(df_procesado), dtype='int8')
+
+        # ── Método 0: Por horario de cargo (un paso agrupado por empleado y día) ──
+        if horarios_por_codigo:
+            if indice_dias is None:
+                indice_dias = DayIndex(df_procesado)
+            self._inferir_por_horario_dias(
+                df_procesado, horarios_por_codigo, indice_dias, estados, metodos, orden_dia, orden_fase
+            )
+
+        # ── Métodos 1-3: Fallback para NaN restantes ─────────────────────
+        self._inferir_fallback(df_procesado, estados, metodos, orden_fase)
+
+        # Aplicar todas las inferencias en bloque
+        mask_inferido = pd.notna(metodos)
+        if mask_inferido.any():
+            df_procesado.loc[mask_inferido, 'ESTADO'] = estados[mask_inferido]
+            df_procesado.loc[mask_inferido, 'ESTADO_INFERIDO'] = True
+            self._registrar_inferencias(df_procesado, mask_inferido, estados, metodos, orden_dia, orden_fase)
 
         # Marcar estados no inferidos como indefinidos
         mask_nan = df_procesado['ESTADO'].isna()
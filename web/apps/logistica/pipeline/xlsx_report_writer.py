@@ -0,0 +1,232 @@
+"""
+Módulo Escritor de Reportes XlsxWriter
+Escribe las hojas del reporte con sus estilos (encabezados, anchos, colores
+de fila, bordes, formatos de número, paneles congelados y listas de
+validación) mientras recorre las filas, en una sola pasada y sin volver a
+abrir el archivo. Las filas se vuelcan al disco a medida que se escriben y
+las hojas que superan el límite de filas de Excel continúan en otra hoja
+"""
+
+import math
+from datetime import datetime
+
+import pandas as pd
+from . import config
+
+try:
+    import xlsxwriter
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
+
+
+class XlsxReportWriter:
+    """Libro de Excel escrito con XlsxWriter en una sola pasada"""
+
+    COLOR_ENCABEZADO = '#366092'
+
+    # Columnas que se centran aunque no sean numéricas
+    COLUMNAS_CENTRADAS = ('SEMANA DEL AÑO', 'CANTIDAD EMPLEADOS')
+
+    FORMATO_FECHA_HORA = 'yyyy-mm-dd hh:mm:ss'
+
+    def __init__(self, ruta_archivo):
+        """
+        Crea el libro
+
+        Args:
+            ruta_archivo: Ruta del archivo .xlsx a escribir
+        """
+        self.ruta_archivo = ruta_archivo
+        # constant_memory: cada fila se escribe al disco en cuanto se completa
+        self.workbook = xlsxwriter.Workbook(ruta_archivo, {'constant_memory': True})
+        self.hojas = {}
+        self._formatos = {}
+
+    def _formato(self, tipo, clase='', centrado=False, formato_numero=None):
+        """
+        Formato compartido (se crea una vez por combinación)
+
+        Args:
+            tipo: 'encabezado', 'encabezado_simple' (estilo de pandas), 'dato' o 'simple'
+            clase: Clave de config.COLORES para el fondo ('' sin color)
+            centrado: Alineación centrada (si no, a la izquierda)
+            formato_numero: Formato de número/fecha de Excel (opcional)
+
+        Returns:
+            Format de XlsxWriter (o None si no aplica ningún estilo)
+        """
+        clave = (tipo, clase, centrado, formato_numero)
+        if clave in self._formatos:
+            return self._formatos[clave]
+
+        propiedades = {}
+        if tipo == 'encabezado':
+            propiedades = {
+                'bold': True, 'font_color': '#FFFFFF', 'font_size': 11,
+                'bg_color': self.COLOR_ENCABEZADO, 'pattern': 1,
+                'align': 'center', 'valign': 'vcenter', 'border': 1,
+            }
+        elif tipo == 'encabezado_simple':
+            propiedades = {'bold': True, 'align': 'center', 'valign': 'top', 'border': 1}
+        elif tipo == 'dato':
+            propiedades = {
+                'font_size': 10, 'border': 1, 'valign': 'vcenter',
+                'align': 'center' if centrado else 'left',
+            }
+            if clase:
+                propiedades.update({'bg_color': config.COLORES[clase], 'pattern': 1})
+        if formato_numero:
+            propiedades['num_format'] = formato_numero
+
+        formato = self.workbook.add_format(propiedades) if propiedades else None
+        self._formatos[clave] = formato
+        return formato
+
+    def _formatos_fila(self, tipo, clase, centradas, formatos_numero):
+        """
+        Formatos de cada columna para una clase de color, por tipo de valor;
+        se arman una vez por hoja y clase en lugar de buscarse celda por celda
+
+        Returns:
+            Tupla de listas (vacío, número, fecha, texto), una entrada por columna
+        """
+        vacio, numero, fecha, texto = [], [], [], []
+        for centrada, formato_numero in zip(centradas, formatos_numero):
+            vacio.append(self._formato(tipo, clase, centrada))
+            numero.append(self._formato(tipo, clase, True, formato_numero))
+            fecha.append(self._formato(tipo, clase, centrada, formato_numero or self.FORMATO_FECHA_HORA))
+            texto.append(vacio[-1])
+        return vacio, numero, fecha, texto
+
+    @staticmethod
+    def _es_vacio(valor):
+        """True para None, NaN, NaT, pd.NA y texto vacío (celda en blanco, como en pandas)."""
+        if valor is None or valor is pd.NaT or valor is pd.NA:
+            return True
+        if isinstance(valor, str):
+            return valor == ''
+        return isinstance(valor, float) and math.isnan(valor)
+
+    def escribir_hoja(self, nombre_hoja, df, clases_filas=None, con_formato=True, anchos=None):
+        """
+        Escribe un DataFrame en una hoja nueva, fila por fila
+
+        Args:
+            nombre_hoja: Nombre de la hoja
+            df: DataFrame a escribir (sin índice)
+            clases_filas: Color de cada fila (claves de config.COLORES; opcional)
+            con_formato: Si False se escribe como pandas (encabezado en negrita,
+                         datos sin estilo salvo formatos de número)
+            anchos: Lista de anchos de columna (opcional)
+
+        Returns:
+            Lista de (nombre de hoja, filas de datos) de las hojas escritas
+        """
+        return self.escribir_bloques(
+            nombre_hoja, list(df.columns), [(df, clases_filas)], con_formato, anchos
+        )
+
+    def _nueva_hoja(self, nombre_hoja, encabezados, con_formato, anchos):
+        """Agrega una hoja con su encabezado, anchos y panel congelado."""
+        ws = self.workbook.add_worksheet(nombre_hoja)
+        self.hojas[nombre_hoja] = ws
+
+        if anchos:
+            for col, ancho in enumerate(anchos):
+                ws.set_column(col, col, ancho)
+        formato_encabezado = self._formato('encabezado' if con_formato else 'encabezado_simple')
+        for col, titulo in enumerate(encabezados):
+            ws.write_string(0, col, titulo, formato_encabezado)
+        if con_formato:
+            ws.freeze_panes(1, 0)
+        return ws
+
+    def escribir_bloques(self, nombre_hoja, columnas, bloques, con_formato=True, anchos=None):
+        """
+        Escribe los datos que llegan por bloques; con constant_memory cada fila
+        se vuelca al disco al pasar a la siguiente, así que solo el bloque en
+        curso vive en memoria. Al llegar a config.MAX_FILAS_HOJA_EXCEL se sigue
+        en una hoja nueva 'Nombre (2)', 'Nombre (3)', ... con el mismo encabezado
+
+        Args:
+            nombre_hoja: Nombre de la primera hoja
+            columnas: Encabezados (en el orden de las columnas de cada bloque)
+            bloques: Iterable de (DataFrame, clases de color de sus filas o None)
+            con_formato: Ver escribir_hoja
+            anchos: Lista de anchos de columna (opcional)
+
+        Returns:
+            Lista de (nombre de hoja, filas de datos) de las hojas escritas
+        """
+        encabezados = [str(c) for c in columnas]
+        max_filas = config.MAX_FILAS_HOJA_EXCEL - 1
+
+        tipo = 'dato' if con_formato else 'simple'
+        formatos_numero = [config.FORMATOS_EXCEL.get(titulo) for titulo in encabezados]
+        centradas = [titulo in self.COLUMNAS_CENTRADAS for titulo in encabezados]
+        formatos_clase = {}
+
+        hojas = [(nombre_hoja, 0)]
+        ws = self._nueva_hoja(nombre_hoja, encabezados, con_formato, anchos)
+        fila = 0
+
+        for df, clases_filas in bloques:
+            columnas_bloque = [df[c].tolist() for c in df.columns]
+            for i, valores in enumerate(zip(*columnas_bloque)):
+                if fila == max_filas:
+                    hojas[-1] = (hojas[-1][0], fila)
+                    nombre = f"{nombre_hoja} ({len(hojas) + 1})"
+                    hojas.append((nombre, 0))
+                    ws = self._nueva_hoja(nombre, encabezados, con_formato, anchos)
+                    fila = 0
+                fila += 1
+
+                clase = clases_filas[i] if clases_filas is not None else ''
+                if clase not in formatos_clase:
+                    formatos_clase[clase] = self._formatos_fila(tipo, clase, centradas, formatos_numero)
+                f_vacio, f_numero, f_fecha, f_texto = formatos_clase[clase]
+
+                for col, valor in enumerate(valores):
+                    if self._es_vacio(valor):
+                        if con_formato:
+                            ws.write_blank(fila, col, None, f_vacio[col])
+                    elif isinstance(valor, bool):
+                        ws.write_boolean(fila, col, valor, f_numero[col])
+                    elif isinstance(valor, datetime):
+                        ws.write_datetime(fila, col, valor, f_fecha[col])
+                    elif isinstance(valor, (int, float)):
+                        ws.write_number(fila, col, valor, f_numero[col])
+                    else:
+                        ws.write_string(fila, col, str(valor), f_texto[col])
+
+        hojas[-1] = (hojas[-1][0], fila)
+        return hojas
+
+    def agregar_lista_validacion(self, nombre_hoja, columna, n_filas, origen):
+        """
+        Agrega una lista desplegable a una columna de datos
+
+        Args:
+            nombre_hoja: Hoja donde va la validación
+            columna: Índice (0) de la columna
+            n_filas: Número de filas de datos
+            origen: Fórmula del rango con los valores (p. ej. '=Conceptos!$A$2:$A$10')
+        """
+        self.hojas[nombre_hoja].data_validation(1, columna, max(1, n_filas), columna, {
+            'validate': 'list',
+            'source': origen,
+            'ignore_blank': True,
+            'input_title': 'Observación',
+            'input_message': 'Seleccione una observación',
+            'error_title': 'Entrada inválida',
+            'error_message': 'Su valor no está en la lista',
+        })
+
+    def ocultar_hoja(self, nombre_hoja):
+        """Oculta una hoja (no puede ser la primera/activa)."""
+        self.hojas[nombre_hoja].hide()
+
+    def cerrar(self):
+        """Escribe el archivo en disco."""
+        self.workbook.close()
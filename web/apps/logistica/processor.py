@@ -10,8 +10,10 @@ import pandas as pd
 from apps.logistica.pipeline import config
 from apps.logistica.pipeline.logger import logger
 from apps.logistica.pipeline.data_cleaner import DataCleaner
+from apps.logistica.pipeline.day_index import DayIndex
 from apps.logistica.pipeline.state_inference import StateInference
 from apps.logistica.pipeline.shift_builder import ShiftBuilder
+from apps.logistica.pipeline.shard_runner import ShardRunner
 from apps.logistica.pipeline.calculator import Calculator
 from apps.logistica.pipeline.excel_generator import ExcelGenerator
 
@@ -111,36 +113,35 @@ class HuelleroProcessor:
         if (fecha_inicio is None and fecha_fin is None) or df_resultado.empty:
             return df_resultado
 
-        df_filtrado = df_resultado.copy()
-        df_filtrado['FECHA_DT'] = pd.to_datetime(
-            df_filtrado['FECHA'],
-            format=config.FORMATO_FECHA_OUTPUT,
-            errors='coerce'
-        ).dt.date
-
-        mask = pd.Series(True, index=df_filtrado.index)
+        # FECHA es datetime64 (medianoche): se compara directo con los límites
+        mask = pd.Series(True, index=df_resultado.index)
         if fecha_inicio is not None:
-            mask &= df_filtrado['FECHA_DT'] >= fecha_inicio
+            mask &= df_resultado['FECHA'] >= pd.Timestamp(fecha_inicio)
         if fecha_fin is not None:
-            mask &= df_filtrado['FECHA_DT'] <= fecha_fin
+            mask &= df_resultado['FECHA'] <= pd.Timestamp(fecha_fin)
 
-        df_filtrado = df_filtrado.loc[mask].drop(columns=['FECHA_DT']).reset_index(drop=True)
+        df_filtrado = df_resultado.loc[mask].reset_index(drop=True)
         logger.info(
             f"Filtro de fechas aplicado: {fecha_inicio or 'sin inicio'} a "
             f"{fecha_fin or 'sin fin'} | Registros: {len(df_resultado)} -> {len(df_filtrado)}"
         )
         return df_filtrado
 
-    def procesar(self, ruta_archivo, usar_maestro=True, fecha_inicio=None, fecha_fin=None):
+    def procesar(self, ruta_archivo, usar_maestro=True, fecha_inicio=None, fecha_fin=None,
+                 hashes_archivos=None, formatos=None):
         """
         Procesa el archivo (o lista de archivos) de huellero y genera los Excel de salida.
 
         Args:
             ruta_archivo: str con la ruta de un archivo, o lista de rutas cuando
                           se deben combinar varios archivos antes de procesar.
+            hashes_archivos: lista con el SHA-256 de cada archivo (mismo orden que
+                             las rutas) para la caché de entrada. Opcional.
+            formatos: lista de formatos de salida (claves de config.FORMATOS_EXPORTACION).
+                      Si incluye otros además de 'xlsx' se generan en archivo_exportacion.
 
         Returns:
-            Dict con: success, archivo, archivo_casos, stats
+            Dict con: success, archivo, archivo_casos, archivo_exportacion, stats
         """
         etiqueta = ruta_archivo if isinstance(ruta_archivo, str) else ' + '.join(ruta_archivo)
         logger.log_inicio_proceso(etiqueta)
@@ -149,20 +150,24 @@ class HuelleroProcessor:
             # FASE 1: Limpieza
             cleaner = DataCleaner()
             codigos_excluidos = self._cargar_codigos_excluidos()
-            df_limpio = cleaner.procesar(ruta_archivo, codigos_excluidos)
+            df_limpio = cleaner.procesar(ruta_archivo, codigos_excluidos, hashes_archivos)
 
-            # FASE 2: Inferencia de estados
-            inference = StateInference()
-            horarios_por_codigo = self._cargar_horarios_por_codigo()
-            df_con_estados = inference.inferir_estados(df_limpio, horarios_por_codigo)
+            # Índice (empleado, día) compartido por inferencia y métricas:
+            # ambas fases trabajan sobre las mismas filas en el mismo orden
+            indice_dias = DayIndex(df_limpio)
 
-            # FASE 3: Construcción de turnos
+            # FASE 2 y 3: Inferencia de estados y construcción de turnos
+            # (por fragmentos de empleados en paralelo si está configurado)
+            inference = StateInference()
             builder = ShiftBuilder()
-            df_turnos = builder.construir_turnos(df_con_estados)
+            horarios_por_codigo = self._cargar_horarios_por_codigo()
+            df_con_estados, df_turnos = ShardRunner().inferir_y_construir(
+                df_limpio, horarios_por_codigo, inference, builder, indice_dias
+            )
 
             # FASE 4: Cálculo de métricas
             calculator = Calculator()
-            df_resultado = calculator.calcular_metricas(df_turnos, df_con_estados)
+            df_resultado = calculator.calcular_metricas(df_turnos, df_con_estados, indice_dias)
 
             # Agregar datos de maestro (nombres, cédulas, cargos) desde DB
             # y cargar conceptos para el dropdown de OBSERVACIONES_1 en el Excel
@@ -194,16 +199,17 @@ class HuelleroProcessor:
                 'estados_inferidos':     int(stats_inference.get('total_inferencias', 0)),
             }
 
-            ruta_salida = generator.generar_excel(df_resultado, stats, df_conceptos=df_conceptos)
-            ruta_casos  = generator.generar_casos_especiales(df_resultado)
+            ruta_salida, ruta_casos = generator.generar_reportes(df_resultado, stats, df_conceptos=df_conceptos)
+            ruta_exportacion = generator.generar_exportaciones(df_resultado, formatos or ['xlsx'], ruta_salida)
 
             logger.log_fin_proceso(exito=True)
 
             return {
-                'success':       True,
-                'archivo':       os.path.basename(ruta_salida),
-                'archivo_casos': os.path.basename(ruta_casos) if ruta_casos else None,
-                'stats':         stats,
+                'success':             True,
+                'archivo':             os.path.basename(ruta_salida),
+                'archivo_casos':       os.path.basename(ruta_casos) if ruta_casos else None,
+                'archivo_exportacion': os.path.basename(ruta_exportacion) if ruta_exportacion else None,
+                'stats':               stats,
             }
 
         except Exception as e:
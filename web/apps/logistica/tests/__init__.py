@@ -0,0 +1,3 @@
+"""
+Pruebas del área de Logística
+"""
@@ -0,0 +1,103 @@
+"""
+Datos de prueba compartidos: una exportación pequeña del huellero y la
+ejecución del pipeline sobre ella (sin base de datos)
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from openpyxl import Workbook
+
+from apps.logistica.pipeline import config
+from apps.logistica.pipeline.calculator import Calculator
+from apps.logistica.pipeline.data_cleaner import DataCleaner
+from apps.logistica.pipeline.day_index import DayIndex
+from apps.logistica.pipeline.shard_runner import ShardRunner
+from apps.logistica.pipeline.shift_builder import ShiftBuilder
+from apps.logistica.pipeline.state_inference import StateInference
+
+
+# (código, nombre, fecha/hora, estado) como vienen en el archivo del huellero
+MARCACIONES = [
+    # Empleado 1: nombre con su número, duplicado y estado faltante
+    (1, 'ANA MARIA 1', '20/03/2026 06:01', 'Entrada'),
+    (1, 'ANA MARIA 1', '20/03/2026 06:04', 'Entrada'),
+    (1, 'ANA MARIA 1', '20/03/2026 14:02', 'Salida'),
+    (1, 'ANA MARIA 1', '21/03/2026 05:58', 'Entrada'),
+    (1, 'ANA MARIA 1', '21/03/2026 14:10', None),
+    (1, 'ANA MARIA 1', '23/03/2026 06:00', 'Entrada'),
+    (1, 'ANA MARIA 1', '23/03/2026 18:30', 'Salida'),
+    # Empleado 2: turnos nocturnos y salida marcada como entrada
+    (2, 'LUIS PEREZ', '20/03/2026 21:55', 'Entrada'),
+    (2, 'LUIS PEREZ', '21/03/2026 06:03', 'Salida'),
+    (2, 'LUIS PEREZ', '21/03/2026 21:50', 'Entrada'),
+    (2, 'LUIS PEREZ', '22/03/2026 06:10', 'Entrada'),
+    (2, 'LUIS PEREZ', '24/03/2026 07:00', None),
+    (2, 'LUIS PEREZ', '24/03/2026 16:00', 'Salida'),
+    # Empleado 3: turno corto y salida sin entrada
+    (3, 'EVA 3', '20/03/2026 08:00', 'Entrada'),
+    (3, 'EVA 3', '20/03/2026 09:30', 'Salida'),
+    (3, 'EVA 3', '22/03/2026 15:00', 'Salida'),
+    # Empleado 10: nombre igual al código
+    (10, '10', '20/03/2026 07:00', 'Entrada'),
+    (10, '10', '20/03/2026 19:30', 'Salida'),
+    # Empleado 7: el nombre contiene el código como float ('7.0')
+    (7, 'SIN NOMBRE 7.0', '24/03/2026 06:00', 'Entrada'),
+    (7, 'SIN NOMBRE 7.0', '24/03/2026 14:00', 'Salida'),
+]
+
+
+def escribir_exportacion(ruta, marcaciones=MARCACIONES):
+    """Escribe un .xlsx con el formato de exportación del huellero."""
+    wb = Workbook()
+    ws = wb.active
+    ws.append(['Reporte de Marcaciones'])
+    ws.append([])
+    ws.append([None, 'ID', 'Nombre', 'Fecha / Hora', 'Estado', None, None, 'Tipo de Registro'])
+    for codigo, nombre, fecha_hora, estado in marcaciones:
+        ws.append([None, codigo, nombre, fecha_hora, estado, None, None, 'Huella'])
+    ws.append(['Fecha / Hora: 25/03/2026'])
+    wb.save(ruta)
+
+
+class ExportacionTestCase(unittest.TestCase):
+    """Caso base con la exportación de prueba en un directorio temporal"""
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio, True)
+        self.ruta = os.path.join(self.directorio, 'huellero.xlsx')
+        escribir_exportacion(self.ruta)
+
+        # Sin caché de entrada salvo en las pruebas que la usan
+        parche = mock.patch.object(config, 'CACHE_ENTRADA_HABILITADO', False)
+        parche.start()
+        self.addCleanup(parche.stop)
+
+    def ejecutar(self, shard_runner=None):
+        """
+        Ejecuta el pipeline como HuelleroProcessor.procesar (sin base de datos)
+
+        Returns:
+            Tupla (df_limpio, df_resultado, estadísticas de cada etapa)
+        """
+        cleaner = DataCleaner()
+        df_limpio = cleaner.procesar(self.ruta)
+        indice_dias = DayIndex(df_limpio)
+
+        inference = StateInference()
+        builder = ShiftBuilder()
+        df_con_estados, df_turnos = (shard_runner or ShardRunner(max_procesos=1)).inferir_y_construir(
+            df_limpio, None, inference, builder, indice_dias
+        )
+        df_resultado = Calculator().calcular_metricas(df_turnos, df_con_estados, indice_dias)
+
+        stats = {
+            'limpieza': cleaner.obtener_resumen(),
+            'inferencias': inference.obtener_resumen().get('total_inferencias', 0),
+            'turnos': {k: int(v) for k, v in builder.obtener_resumen().items()},
+        }
+        return df_limpio, df_resultado, stats
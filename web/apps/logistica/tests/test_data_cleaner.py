@@ -0,0 +1,123 @@
+"""
+Pruebas de DataCleaner
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from apps.logistica.pipeline import config
+from apps.logistica.pipeline.data_cleaner import DataCleaner
+from apps.logistica.pipeline.observation_flags import ObservationFlags
+
+from .fixtures import ExportacionTestCase
+
+
+def eliminar_duplicados_referencia(df):
+    """
+    Índices que elimina la versión original (fila por fila) de
+    eliminar_duplicados: por empleado, en orden de hora, cada marcación dentro
+    del umbral y con estado compatible se agrupa con la anterior y se conserva
+    la última de cada grupo.
+    """
+    eliminar = set()
+    for _, df_emp in df.groupby('CODIGO', sort=False):
+        df_emp = df_emp.sort_values('FECHA_HORA')
+        indices = df_emp.index.tolist()
+        grupo = indices[:1]
+        for anterior, actual in zip(indices, indices[1:]):
+            diff = (df.loc[actual, 'FECHA_HORA'] - df.loc[anterior, 'FECHA_HORA']).total_seconds()
+            estado, estado_anterior = df.loc[actual, 'ESTADO'], df.loc[anterior, 'ESTADO']
+            if diff <= config.UMBRAL_DUPLICADOS and (
+                estado == estado_anterior or pd.isna(estado) or pd.isna(estado_anterior)
+            ):
+                grupo.append(actual)
+            else:
+                eliminar.update(grupo[:-1])
+                grupo = [actual]
+        eliminar.update(grupo[:-1])
+    return eliminar
+
+
+def marcaciones(filas):
+    """DataFrame limpio a partir de tuplas (código, 'YYYY-mm-dd HH:MM:SS', estado)."""
+    return pd.DataFrame({
+        'CODIGO': [float(codigo) for codigo, _, _ in filas],
+        'NOMBRE': [f"EMPLEADO {int(codigo)}" for codigo, _, _ in filas],
+        'FECHA_HORA': pd.to_datetime([fecha_hora for _, fecha_hora, _ in filas]),
+        'ESTADO': [estado for _, _, estado in filas],
+    })
+
+
+class EliminarDuplicadosTest(unittest.TestCase):
+    """eliminar_duplicados conserva el último registro de cada grupo"""
+
+    def test_grupos_dentro_del_umbral(self):
+        df = marcaciones([
+            (1, '2026-03-20 06:00:00', 'Entrada'),
+            (1, '2026-03-20 06:10:00', 'Entrada'),   # duplicado del anterior
+            (1, '2026-03-20 06:20:00', None),        # sin estado: compatible con ambos vecinos
+            (1, '2026-03-20 06:25:00', 'Salida'),
+            (1, '2026-03-20 06:35:00', 'Entrada'),   # otro estado: nuevo grupo
+            (1, '2026-03-20 14:00:00', 'Salida'),
+            (2, '2026-03-20 06:05:00', 'Entrada'),   # otro empleado: no se agrupa con el 1
+            (2, '2026-03-20 06:20:00', 'Entrada'),   # exactamente en el umbral
+        ])
+
+        cleaner = DataCleaner()
+        df_limpio = cleaner.eliminar_duplicados(df)
+
+        self.assertEqual(sorted(cleaner.duplicados_eliminados), [0, 1, 2, 6])
+        self.assertEqual(
+            df_limpio['FECHA_HORA'].dt.strftime('%H:%M').tolist(),
+            ['06:25', '06:35', '14:00', '06:20'],
+        )
+        self.assertEqual(cleaner.obtener_resumen()['registros_limpios'], 4)
+
+    def test_igual_a_version_original(self):
+        rng = np.random.default_rng(20260320)
+        n = 2000
+        inicio = pd.Timestamp('2026-03-01')
+        df = pd.DataFrame({
+            'CODIGO': rng.integers(1, 40, n).astype(float),
+            'NOMBRE': 'EMPLEADO',
+            # Minutos en pocos días para que haya muchas marcaciones cercanas
+            'FECHA_HORA': inicio + pd.to_timedelta(rng.integers(0, 3 * 24 * 60, n), unit='min'),
+            'ESTADO': rng.choice(np.array(['Entrada', 'Salida', None], dtype=object), n),
+        })
+        # Con dos marcaciones del mismo empleado a la misma hora el orden de la
+        # versión original no estaba definido (ordenamiento no estable)
+        df = df.drop_duplicates(['CODIGO', 'FECHA_HORA']).reset_index(drop=True)
+
+        cleaner = DataCleaner()
+        df_limpio = cleaner.eliminar_duplicados(df)
+
+        esperados = eliminar_duplicados_referencia(df)
+        self.assertTrue(esperados)
+        self.assertEqual(set(cleaner.duplicados_eliminados), esperados)
+        pd.testing.assert_frame_equal(df_limpio, df.drop(sorted(esperados)).reset_index(drop=True))
+
+
+class CodigoFloatTest(ExportacionTestCase):
+    """CODIGO queda como float después de la lectura en una sola pasada"""
+
+    def test_codigo_float_y_datos_corruptos(self):
+        df_limpio, df_resultado, _ = self.ejecutar()
+
+        # El código se compara con el nombre como texto de un float ('1.0'):
+        # 'ANA MARIA 1', 'EVA 3' y '10' no son datos corruptos, 'SIN NOMBRE 7.0' sí
+        self.assertEqual(df_limpio['CODIGO'].dtype, np.float64)
+        corruptos = (df_resultado[ObservationFlags.COLUMNA].to_numpy() & ObservationFlags.DATOS_CORRUPTOS) != 0
+        self.assertEqual(sorted(set(df_resultado.loc[corruptos, 'CODIGO COLABORADOR'])), [7])
+
+    def test_codigos_enteros_se_convierten_a_float(self):
+        df_enteros = pd.DataFrame({
+            'ID': [1, 2], 'Nombre': ['A', 'B'], 'Fecha / Hora': ['20/03/2026 06:00'] * 2,
+            'Estado': ['Entrada'] * 2, 'Tipo de Registro': ['Huella'] * 2,
+        })
+        self.assertEqual(DataCleaner().limpiar_estructura(df_enteros)['CODIGO'].dtype, np.float64)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+"""
+Pruebas de ExcelGenerator
+"""
+
+import os
+import unittest
+import zipfile
+from unittest import mock
+
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter
+
+from apps.logistica.pipeline import config, excel_generator, xlsx_report_writer
+from apps.logistica.pipeline.excel_generator import ExcelGenerator
+from apps.logistica.pipeline.observation_flags import ObservationFlags
+
+from .fixtures import ExportacionTestCase
+
+
+class GeneradorTestCase(ExportacionTestCase):
+    """Resultado de la exportación de prueba y salida en el directorio temporal"""
+
+    def setUp(self):
+        super().setUp()
+        parche = mock.patch.object(config, 'DIR_OUTPUT', os.path.join(self.directorio, 'output'))
+        parche.start()
+        self.addCleanup(parche.stop)
+        _, self.df_resultado, self.stats = self.ejecutar()
+
+
+@unittest.skipUnless(xlsx_report_writer.XLSXWRITER_AVAILABLE, "xlsxwriter no disponible")
+class DivisionHojasTest(GeneradorTestCase):
+    """El Reporte continúa en 'Reporte (2)', 'Reporte (3)', ... al llenar una hoja"""
+
+    CONCEPTOS = pd.DataFrame({'observaciones': ['VACACIONES', 'INCAPACIDAD', 'PERMISO']})
+
+    def test_reporte_dividido_en_varias_hojas(self):
+        # 15 filas de datos: 6 + 6 + 3, con bloques de 4 que cruzan el cambio de hoja
+        with mock.patch.object(config, 'MAX_FILAS_HOJA_EXCEL', 7), \
+                mock.patch.object(config, 'FILAS_POR_BLOQUE_EXCEL', 4):
+            ruta = ExcelGenerator().generar_excel(self.df_resultado, self.stats, self.CONCEPTOS)
+
+        wb = load_workbook(ruta)
+        hojas = ['Reporte', 'Reporte (2)', 'Reporte (3)']
+        self.assertEqual(wb.sheetnames[:3], hojas)
+        self.assertEqual(wb['Conceptos'].sheet_state, 'hidden')
+
+        encabezados = [c.value for c in wb['Reporte'][1]]
+        columna_obs = get_column_letter(encabezados.index('OBSERVACIONES_1') + 1)
+        for nombre, filas in zip(hojas, [6, 6, 3]):
+            ws = wb[nombre]
+            self.assertEqual([c.value for c in ws[1]], encabezados)
+            self.assertEqual(ws.max_row, filas + 1)
+            self.assertEqual(ws.freeze_panes, 'A2')
+            validaciones = ws.data_validations.dataValidation
+            self.assertEqual(len(validaciones), 1)
+            self.assertEqual(str(validaciones[0].sqref), f"{columna_obs}2:{columna_obs}{filas + 1}")
+            self.assertEqual(validaciones[0].formula1, 'Conceptos!$A$2:$A$4')
+        wb.close()
+
+        # Las hojas juntas tienen las filas del reporte, en orden
+        df_hojas = pd.concat(
+            [pd.read_excel(ruta, sheet_name=nombre) for nombre in hojas], ignore_index=True
+        )
+        df_esperado = ObservationFlags.renderizar(self.df_resultado)[encabezados].reset_index(drop=True)
+        # Horas: fracción del día con formato hh:mm (sin hora = 00:00)
+        for columna in config.COLUMNAS_HORA_EXCEL:
+            df_hojas[columna] = [hora.strftime('%H:%M') for hora in df_hojas[columna]]
+            df_esperado[columna] = df_esperado[columna].dt.strftime('%H:%M').fillna('00:00')
+        # El texto vacío se escribe como celda en blanco
+        df_esperado = df_esperado.replace('', None)
+        pd.testing.assert_frame_equal(df_hojas, df_esperado, check_dtype=False)
+
+    def test_sin_division_bajo_el_limite(self):
+        with mock.patch.object(config, 'FILAS_POR_BLOQUE_EXCEL', 4):
+            ruta = ExcelGenerator().generar_excel(self.df_resultado, self.stats, self.CONCEPTOS)
+
+        wb = load_workbook(ruta, read_only=True)
+        self.assertNotIn('Reporte (2)', wb.sheetnames)
+        self.assertEqual(wb['Reporte'].max_row, len(self.df_resultado) + 1)
+        wb.close()
+
+
+class ExportacionesTest(GeneradorTestCase):
+    """Formatos de exportación además del reporte Excel"""
+
+    def setUp(self):
+        super().setUp()
+        self.generator = ExcelGenerator()
+        self.ruta_excel = self.generator.generar_excel(self.df_resultado, self.stats)
+
+    def archivos_salida(self):
+        return sorted(os.listdir(config.DIR_OUTPUT))
+
+    def test_solo_excel(self):
+        self.assertIsNone(self.generator.generar_exportaciones(self.df_resultado, ['xlsx'], self.ruta_excel))
+        self.assertEqual(self.archivos_salida(), [os.path.basename(self.ruta_excel)])
+
+    def test_un_formato_entrega_el_archivo(self):
+        ruta = self.generator.generar_exportaciones(self.df_resultado, ['csv'], self.ruta_excel)
+
+        self.assertEqual(ruta, os.path.splitext(self.ruta_excel)[0] + '.csv.gz')
+        self.assertTrue(os.path.exists(ruta))
+        self.assertTrue(os.path.exists(self.ruta_excel))
+
+    def test_varios_formatos_entregan_zip(self):
+        ruta = self.generator.generar_exportaciones(
+            self.df_resultado, ['xlsx', 'csv', 'parquet', 'ndjson', 'csv'], self.ruta_excel
+        )
+
+        base = os.path.splitext(os.path.basename(self.ruta_excel))[0]
+        self.assertEqual(ruta, os.path.join(config.DIR_OUTPUT, base + '.zip'))
+        with zipfile.ZipFile(ruta) as archivo_zip:
+            self.assertEqual(archivo_zip.namelist(), [
+                base + '.xlsx', base + '.csv.gz', base + '.parquet', base + '.ndjson',
+            ])
+            self.assertIsNone(archivo_zip.testzip())
+        # Las exportaciones sueltas se eliminan; el Excel sigue disponible
+        self.assertEqual(self.archivos_salida(), [base + '.xlsx', base + '.zip'])
+
+    def esperado(self):
+        """Columnas de COLUMNAS_OUTPUT con el texto de OBSERVACION y sus tipos."""
+        df = ObservationFlags.renderizar(self.df_resultado)[config.COLUMNAS_OUTPUT]
+        return df.reset_index(drop=True)
+
+    def assert_columnas_y_tipos(self, df):
+        self.assertEqual(list(df.columns), config.COLUMNAS_OUTPUT)
+        for columna in ['FECHA', 'HORA DE INGRESO', 'HORA DE SALIDA']:
+            self.assertTrue(pd.api.types.is_datetime64_any_dtype(df[columna]), columna)
+        for columna in ['TOTAL HORAS LABORADAS', 'LÍMITE HORAS DÍA']:
+            self.assertEqual(df[columna].dtype, 'float64', columna)
+
+    @unittest.skipUnless(excel_generator.PYARROW_AVAILABLE, "pyarrow no disponible")
+    def test_parquet_conserva_columnas_y_tipos(self):
+        ruta = self.generator.generar_exportaciones(self.df_resultado, ['parquet'], self.ruta_excel)
+
+        df = pd.read_parquet(ruta)
+        self.assert_columnas_y_tipos(df)
+        pd.testing.assert_frame_equal(df, self.esperado(), check_dtype=False)
+
+    def test_csv_conserva_columnas_y_tipos(self):
+        ruta = self.generator.generar_exportaciones(self.df_resultado, ['csv'], self.ruta_excel)
+
+        df = pd.read_csv(
+            ruta, parse_dates=['FECHA', 'HORA DE INGRESO', 'HORA DE SALIDA'],
+            dtype={'DOCUMENTO DEL COLABORADOR': str}, keep_default_na=False, na_values=[''],
+        )
+        self.assert_columnas_y_tipos(df)
+        esperado = self.esperado().replace('', None)
+        for columna in ['FECHA', 'HORA DE INGRESO', 'HORA DE SALIDA']:
+            df[columna] = df[columna].astype('datetime64[ns]')
+            esperado[columna] = esperado[columna].astype('datetime64[ns]')
+        pd.testing.assert_frame_equal(df, esperado, check_dtype=False)
+
+    def test_ndjson_una_linea_por_registro(self):
+        ruta = self.generator.generar_exportaciones(self.df_resultado, ['ndjson'], self.ruta_excel)
+
+        df = pd.read_json(ruta, lines=True, convert_dates=False)
+        self.assertEqual(list(df.columns), config.COLUMNAS_OUTPUT)
+        self.assertEqual(len(df), len(self.df_resultado))
+        self.assertEqual(df['FECHA'].iloc[0], '2026-03-20T00:00:00.000')
+
+    def test_formato_no_soportado(self):
+        with self.assertRaises(ValueError):
+            self.generator.generar_exportaciones(self.df_resultado, ['xml'], self.ruta_excel)
+
+
+if __name__ == '__main__':
+    unittest.main()
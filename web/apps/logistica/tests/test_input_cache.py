@@ -0,0 +1,140 @@
+"""
+Pruebas de la caché de archivos de entrada
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from apps.logistica.pipeline import config, input_cache
+from apps.logistica.pipeline.input_cache import InputCache
+
+from .fixtures import ExportacionTestCase
+
+
+def marcaciones(codigo, registros=50):
+    """DataFrame limpio de un empleado con una marcación por hora."""
+    return pd.DataFrame({
+        'CODIGO': float(codigo),
+        'NOMBRE': f"EMPLEADO {codigo}",
+        'FECHA_HORA': pd.date_range('2026-03-20 06:00', periods=registros, freq='h'),
+        'ESTADO': ['Entrada', 'Salida'] * (registros // 2),
+    })
+
+
+@unittest.skipUnless(input_cache.PYARROW_AVAILABLE, "pyarrow no disponible")
+class InputCacheTest(unittest.TestCase):
+    """guardar / obtener / limpiar sobre un directorio temporal"""
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio, True)
+        parche = mock.patch.object(config, 'CACHE_ENTRADA_HABILITADO', True)
+        parche.start()
+        self.addCleanup(parche.stop)
+        self.cache = InputCache(directorio=self.directorio)
+
+    def archivos(self):
+        return sorted(os.listdir(self.directorio))
+
+    def test_guardar_y_obtener(self):
+        df = marcaciones(1)
+        self.cache.guardar('a' * 64, df, registros_crudos=60)
+
+        df_cache, registros_crudos = self.cache.obtener('a' * 64)
+        pd.testing.assert_frame_equal(df_cache, df)
+        self.assertEqual(registros_crudos, 60)
+        self.assertIsNone(self.cache.obtener('b' * 64))
+
+    def test_guardar_dos_veces_la_misma_clave(self):
+        df = marcaciones(1)
+        self.cache.guardar('a' * 64, df)
+        self.cache.guardar('a' * 64, df)
+
+        df_cache, _ = self.cache.obtener('a' * 64)
+        pd.testing.assert_frame_equal(df_cache, df)
+        self.assertEqual(len(self.archivos()), 1)
+
+    def test_guardados_simultaneos_no_comparten_temporal(self):
+        # Otra solicitud guarda la misma clave mientras la primera escribe su temporal
+        df_primero, df_segundo = marcaciones(1), marcaciones(2)
+        escribir = input_cache.pq.write_table
+        llamadas = []
+
+        def escribir_con_otra_solicitud(tabla, ruta, *args, **kwargs):
+            escribir(tabla, ruta, *args, **kwargs)
+            if not llamadas:
+                llamadas.append(ruta)
+                self.cache.guardar('a' * 64, df_segundo)
+
+        with mock.patch.object(input_cache.pq, 'write_table', side_effect=escribir_con_otra_solicitud), \
+                mock.patch.object(input_cache.logger, 'warning') as warning:
+            self.cache.guardar('a' * 64, df_primero)
+
+        warning.assert_not_called()
+        df_cache, _ = self.cache.obtener('a' * 64)
+        pd.testing.assert_frame_equal(df_cache, df_primero)
+        self.assertEqual(self.archivos(), [os.path.basename(self.cache._ruta('a' * 64))])
+
+    def test_limpiar_elimina_las_menos_usadas(self):
+        claves = ['a' * 64, 'b' * 64, 'c' * 64]
+        for i, clave in enumerate(claves):
+            self.cache.guardar(clave, marcaciones(i))
+            # Fechas de uso separadas: a es la más antigua, c la más reciente
+            os.utime(self.cache._ruta(clave), (1000000 + i, 1000000 + i))
+
+        # Usar a la vuelve la más reciente
+        self.assertIsNotNone(self.cache.obtener(claves[0]))
+
+        tamanos = {clave: os.path.getsize(self.cache._ruta(clave)) for clave in claves}
+        cache = InputCache(directorio=self.directorio,
+                           max_mb=(tamanos[claves[0]] + tamanos[claves[2]]) / (1024 * 1024))
+        cache.limpiar()
+
+        self.assertIsNotNone(cache.obtener(claves[0]))
+        self.assertIsNone(cache.obtener(claves[1]))
+        self.assertIsNotNone(cache.obtener(claves[2]))
+
+    def test_cambio_de_formato_no_usa_entradas_anteriores(self):
+        df = marcaciones(1)
+        self.cache.guardar('a' * 64, df)
+
+        with mock.patch.object(config, 'FORMATO_FECHA_INPUT', '%Y-%m-%d %H:%M'):
+            self.assertIsNone(self.cache.obtener('a' * 64))
+        with mock.patch.object(config, 'COLUMNAS_ENTRADA', {**config.COLUMNAS_ENTRADA, 'Código': 'CODIGO'}):
+            self.assertIsNone(self.cache.obtener('a' * 64))
+
+        self.assertIsNotNone(self.cache.obtener('a' * 64))
+
+    def test_deshabilitada(self):
+        with mock.patch.object(config, 'CACHE_ENTRADA_HABILITADO', False):
+            cache = InputCache(directorio=self.directorio)
+        cache.guardar('a' * 64, marcaciones(1))
+
+        self.assertIsNone(cache.obtener('a' * 64))
+        self.assertEqual(self.archivos(), [])
+
+
+@unittest.skipUnless(input_cache.PYARROW_AVAILABLE, "pyarrow no disponible")
+class DataCleanerCacheTest(ExportacionTestCase):
+    """Leer la exportación desde la caché no cambia el resultado"""
+
+    def test_cache_no_cambia_resultado_ni_estadisticas(self):
+        directorio_cache = os.path.join(self.directorio, 'cache')
+        with mock.patch.object(config, 'CACHE_ENTRADA_HABILITADO', True), \
+                mock.patch.object(config, 'DIR_CACHE', directorio_cache):
+            df_sin_cache, resultado_sin_cache, stats_sin_cache = self.ejecutar()
+            self.assertEqual(len(os.listdir(directorio_cache)), 1)
+            df_con_cache, resultado_con_cache, stats_con_cache = self.ejecutar()
+
+        pd.testing.assert_frame_equal(df_con_cache, df_sin_cache)
+        pd.testing.assert_frame_equal(resultado_con_cache, resultado_sin_cache)
+        self.assertEqual(stats_con_cache, stats_sin_cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
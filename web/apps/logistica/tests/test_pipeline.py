@@ -0,0 +1,74 @@
+"""
+Pruebas de regresión del pipeline limpieza → inferencia → turnos → métricas
+
+Los valores esperados son los que producía la versión original del pipeline
+(antes de la vectorización) para la exportación de prueba.
+"""
+
+import unittest
+
+import pandas as pd
+
+from apps.logistica.pipeline.observation_flags import ObservationFlags
+
+from .fixtures import ExportacionTestCase
+
+
+# (código, fecha, hora de ingreso, hora de salida, horas, observación) del reporte
+REPORTE_ESPERADO = [
+    (1, '2026-03-20', '06:04', '14:02', 7.97, 'Sin observaciones'),
+    (1, '2026-03-21', '05:58', '14:10', 8.2, 'Estado inferido por contexto (Salida)'),
+    (1, '2026-03-22', None, None, None, 'DOMINICAL'),
+    (1, '2026-03-23', '06:00', '18:30', 12.5, 'ALERTA: Excede límite de jornada (9.8 horas) | DIA FESTIVO'),
+    (2, '2026-03-20', '21:55', '00:00', 2.08, 'Turno nocturno'),
+    (2, '2026-03-21', '00:00', '06:03', 6.05, 'Turno nocturno'),
+    (2, '2026-03-21', '21:50', '00:00', 2.17,
+     'Turno nocturno | Turno nocturno detectado por entrada PM y salida AM del día siguiente'),
+    (2, '2026-03-22', '00:00', '06:10', 6.17,
+     'Turno nocturno | Turno nocturno detectado por entrada PM y salida AM del día siguiente'),
+    (2, '2026-03-23', None, None, None, 'DIA FESTIVO'),
+    (2, '2026-03-24', '07:00', '16:00', 9.0, 'Estado inferido por contexto (Entrada)'),
+    (3, '2026-03-20', '08:00', '09:30', 1.5,
+     'Estado inferido por contexto (Salida) | Marcación de salida corregida - empleado registró '
+     'Entrada en lugar de Salida | ALERTA: Turno menor a 6 horas'),
+    (3, '2026-03-21', None, None, None, 'SIN REGISTROS'),
+    (3, '2026-03-22', None, '15:00', None, 'Entrada no registrada | DOMINICAL'),
+    (7, '2026-03-24', '06:00', '14:00', 8.0, 'ALERTA: Datos empleado requieren corrección'),
+    (10, '2026-03-20', '07:00', '19:30', 12.5, 'ALERTA: Excede límite de jornada (9.8 horas)'),
+]
+
+
+def filas_reporte(df_resultado):
+    """Filas del reporte en la forma de REPORTE_ESPERADO."""
+    def hora(valor):
+        return None if pd.isna(valor) else valor.strftime('%H:%M')
+
+    df = ObservationFlags.renderizar(df_resultado)
+    return [
+        (
+            int(codigo), fecha.strftime('%Y-%m-%d'), hora(ingreso), hora(salida),
+            None if pd.isna(horas) else float(horas), observacion,
+        )
+        for codigo, fecha, ingreso, salida, horas, observacion in zip(
+            df['CODIGO COLABORADOR'], df['FECHA'], df['HORA DE INGRESO'],
+            df['HORA DE SALIDA'], df['TOTAL HORAS LABORADAS'], df['OBSERVACION'],
+        )
+    ]
+
+
+class PipelineRegresionTest(ExportacionTestCase):
+    """Compara el pipeline con los resultados de la versión original"""
+
+    def test_reporte_igual_a_version_original(self):
+        _, df_resultado, stats = self.ejecutar()
+
+        self.assertEqual(filas_reporte(df_resultado), REPORTE_ESPERADO)
+        self.assertEqual(stats, {
+            'limpieza': {'registros_originales': 20, 'registros_limpios': 19, 'duplicados_eliminados': 1},
+            'inferencias': 2,
+            'turnos': {'total_turnos': 10, 'turnos_completos': 9, 'turnos_incompletos': 1, 'turnos_nocturnos': 2},
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
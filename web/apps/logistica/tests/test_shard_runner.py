@@ -0,0 +1,43 @@
+"""
+Pruebas de la ejecución por fragmentos de empleados
+"""
+
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from apps.logistica.pipeline import config
+from apps.logistica.pipeline.data_cleaner import DataCleaner
+from apps.logistica.pipeline.shard_runner import ShardRunner
+
+from .fixtures import ExportacionTestCase
+
+
+class ShardRunnerTest(ExportacionTestCase):
+    """Los fragmentos en paralelo dan lo mismo que la ejecución secuencial"""
+
+    def test_particionar_reparte_empleados_completos(self):
+        df = DataCleaner().procesar(self.ruta)
+
+        fragmentos = ShardRunner(max_procesos=2).particionar(df, 3)
+
+        posiciones = np.concatenate(fragmentos)
+        self.assertEqual(sorted(posiciones.tolist()), list(range(len(df))))
+        codigos = [set(df['CODIGO'].iloc[f]) for f in fragmentos]
+        for i, codigos_fragmento in enumerate(codigos):
+            for otros in codigos[i + 1:]:
+                self.assertFalse(codigos_fragmento & otros)
+
+    def test_fragmentos_en_paralelo_igual_a_secuencial(self):
+        _, df_secuencial, stats_secuencial = self.ejecutar()
+        with mock.patch.object(config, 'REGISTROS_MINIMOS_PARALELO', 0):
+            _, df_paralelo, stats_paralelo = self.ejecutar(ShardRunner(max_procesos=2))
+
+        pd.testing.assert_frame_equal(df_paralelo, df_secuencial)
+        self.assertEqual(stats_paralelo, stats_secuencial)
+
+
+if __name__ == '__main__':
+    unittest.main()
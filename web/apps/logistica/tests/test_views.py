@@ -0,0 +1,78 @@
+"""
+Pruebas de las vistas del área de Logística
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'huellero_web.settings')
+django.setup()
+
+from django.core.files.uploadedfile import SimpleUploadedFile  # noqa: E402
+from django.test import RequestFactory, SimpleTestCase, override_settings  # noqa: E402
+
+from apps.logistica import views  # noqa: E402
+
+
+class ProcesarViewFormatosTest(SimpleTestCase):
+    """Lectura y validación del campo 'formatos' en ProcesarView"""
+
+    def setUp(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, True)
+        ajustes = override_settings(DATA_INPUT_DIR=Path(directorio))
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        parche = mock.patch.object(views, 'HuelleroProcessor')
+        self.processor = parche.start().return_value
+        self.addCleanup(parche.stop)
+        self.processor.procesar.return_value = {'success': True, 'archivo': 'reporte.xlsx'}
+
+    def post(self, formatos=None):
+        datos = {'archivo': SimpleUploadedFile('huellero.xlsx', b'contenido')}
+        if formatos is not None:
+            datos['formatos'] = formatos
+        request = RequestFactory().post('/logistica/procesar/', datos)
+        return views.ProcesarView.as_view()(request)
+
+    def formatos_procesados(self):
+        return self.processor.procesar.call_args.kwargs['formatos']
+
+    def test_sin_formatos_solo_excel(self):
+        respuesta = self.post()
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(self.formatos_procesados(), ['xlsx'])
+
+    def test_formatos_repetidos(self):
+        respuesta = self.post(['csv', 'parquet'])
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(self.formatos_procesados(), ['csv', 'parquet'])
+
+    def test_formatos_separados_por_comas(self):
+        respuesta = self.post('xlsx, CSV,ndjson')
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(self.formatos_procesados(), ['xlsx', 'csv', 'ndjson'])
+
+    def test_formatos_repetidos_y_separados_por_comas(self):
+        self.post(['csv,parquet', 'ndjson'])
+
+        self.assertEqual(self.formatos_procesados(), ['csv', 'parquet', 'ndjson'])
+
+    def test_formato_no_valido(self):
+        respuesta = self.post(['csv', 'xml'])
+
+        self.assertEqual(respuesta.status_code, 400)
+        contenido = json.loads(respuesta.content)
+        self.assertFalse(contenido['success'])
+        self.assertIn('xml', contenido['error'])
+        self.processor.procesar.assert_not_called()
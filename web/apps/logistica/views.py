@@ -2,6 +2,7 @@
 Views para el área de Logística
 """
 
+import hashlib
 import os
 from datetime import datetime
 
@@ -12,6 +13,7 @@ from django.views.generic import TemplateView
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 
+from .pipeline import config
 from .processor import HuelleroProcessor
 
 
@@ -35,37 +37,39 @@ class ProcesarView(View):
             if 'archivo' not in request.FILES:
                 return JsonResponse({'success': False, 'error': 'No se envió ningún archivo'}, status=400)
 
-            archivo = request.FILES['archivo']
+            # Archivo principal y adicionales opcionales (archivo2, archivo3, ...),
+            # cada campo puede traer uno o varios archivos
+            archivos = list(request.FILES.getlist('archivo'))
+            for campo in request.FILES:
+                if campo.startswith('archivo') and campo != 'archivo':
+                    archivos.extend(request.FILES.getlist(campo))
 
-            if archivo.name == '':
+            if archivos[0].name == '':
                 return JsonResponse({'success': False, 'error': 'No se seleccionó ningún archivo'}, status=400)
 
-            if not archivo.name.lower().endswith(('.xls', '.xlsx')):
-                return JsonResponse({'success': False, 'error': 'Formato no válido. Use .xls o .xlsx'}, status=400)
+            for numero, archivo in enumerate(archivos, 1):
+                if not archivo.name.lower().endswith(('.xls', '.xlsx')):
+                    prefijo = f'Archivo {numero}: formato' if numero > 1 else 'Formato'
+                    return JsonResponse({'success': False, 'error': f'{prefijo} no válido. Use .xls o .xlsx'}, status=400)
 
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            extension = os.path.splitext(archivo.name)[1]
-            nombre_archivo = f"huellero_logistica_{timestamp}{extension}"
-            ruta_archivo = settings.DATA_INPUT_DIR / nombre_archivo
-
-            with open(ruta_archivo, 'wb+') as destino:
-                for chunk in archivo.chunks():
-                    destino.write(chunk)
-
-            rutas_archivos = [str(ruta_archivo)]
-
-            # Segundo archivo opcional
-            archivo2 = request.FILES.get('archivo2')
-            if archivo2:
-                if not archivo2.name.lower().endswith(('.xls', '.xlsx')):
-                    return JsonResponse({'success': False, 'error': 'Archivo 2: formato no válido. Use .xls o .xlsx'}, status=400)
-                extension2 = os.path.splitext(archivo2.name)[1]
-                nombre_archivo2 = f"huellero_logistica_{timestamp}_2{extension2}"
-                ruta_archivo2 = settings.DATA_INPUT_DIR / nombre_archivo2
-                with open(ruta_archivo2, 'wb+') as destino2:
-                    for chunk in archivo2.chunks():
-                        destino2.write(chunk)
-                rutas_archivos.append(str(ruta_archivo2))
+            rutas_archivos = []
+            hashes_archivos = []
+            for numero, archivo in enumerate(archivos, 1):
+                extension = os.path.splitext(archivo.name)[1]
+                sufijo = f"_{numero}" if numero > 1 else ''
+                nombre_archivo = f"huellero_logistica_{timestamp}{sufijo}{extension}"
+                ruta_archivo = settings.DATA_INPUT_DIR / nombre_archivo
+
+                # El SHA-256 se calcula mientras se escribe (clave de la caché de entrada)
+                sha = hashlib.sha256()
+                with open(ruta_archivo, 'wb+') as destino:
+                    for chunk in archivo.chunks():
+                        destino.write(chunk)
+                        sha.update(chunk)
+
+                rutas_archivos.append(str(ruta_archivo))
+                hashes_archivos.append(sha.hexdigest())
 
             usar_maestro = request.POST.get('usar_maestro', 'true').lower() == 'true'
             fecha_inicio_str = (request.POST.get('fecha_inicio') or '').strip()
@@ -88,12 +92,29 @@ class ProcesarView(View):
             if fecha_inicio and fecha_fin and fecha_inicio > fecha_fin:
                 return JsonResponse({'success': False, 'error': 'La fecha inicio no puede ser mayor que la fecha final.'}, status=400)
 
+            # Formatos de salida: 'formatos' puede repetirse o venir separado por comas
+            # (p. ej. formatos=xlsx,csv,parquet); por defecto solo el Excel
+            formatos = [
+                f.strip().lower()
+                for valor in request.POST.getlist('formatos')
+                for f in valor.split(',') if f.strip()
+            ] or ['xlsx']
+            no_validos = [f for f in formatos if f not in config.FORMATOS_EXPORTACION]
+            if no_validos:
+                return JsonResponse({
+                    'success': False,
+                    'error': f"Formato de salida no válido: {', '.join(no_validos)}. "
+                             f"Use {', '.join(config.FORMATOS_EXPORTACION)}."
+                }, status=400)
+
             processor = HuelleroProcessor(area='logistica')
             resultado = processor.procesar(
                 rutas_archivos if len(rutas_archivos) > 1 else rutas_archivos[0],
                 usar_maestro,
                 fecha_inicio=fecha_inicio,
                 fecha_fin=fecha_fin,
+                hashes_archivos=hashes_archivos,
+                formatos=formatos,
             )
 
             return JsonResponse(resultado)
@@ -16,11 +16,12 @@ document.addEventListener('DOMContentLoaded', function () {
     const estadoEl               = document.getElementById('cargaEstado');
     const fechaInicioEl          = document.getElementById('fechaInicio');
     const fechaFinEl             = document.getElementById('fechaFin');
+    const formatosEl             = document.getElementById('formatosExportacion');
     const uploadSection          = document.getElementById('uploadSection');
     const resultSection          = document.getElementById('resultSection');
 
     let selectedFile   = null;
-    let selectedFile2  = null;
+    let selectedFiles2 = [];
     let estadoInterval = null;
 
     // ── Helpers de estado ────────────────────────────────────────────────────
@@ -59,7 +60,7 @@ document.addEventListener('DOMContentLoaded', function () {
         modal.setAttribute('aria-hidden', 'true');
         detenerProcesando();
         selectedFile  = null;
-        selectedFile2 = null;
+        selectedFiles2 = [];
         if (fileInput)  fileInput.value  = '';
         if (fileInput2) fileInput2.value = '';
         if (btnProcesarArchivo) btnProcesarArchivo.disabled = true;
@@ -72,6 +73,7 @@ document.addEventListener('DOMContentLoaded', function () {
             fechaFinEl.min = '';
             fechaFinEl.max = '';
         }
+        formatosEl?.querySelectorAll('input[type="checkbox"]').forEach(c => { c.checked = false; });
         setEstado('');
     }
 
@@ -84,6 +86,10 @@ document.addEventListener('DOMContentLoaded', function () {
         const urlBase      = AREA_CONFIG.apiDescargar;
         const urlPrincipal = result.archivo       ? urlBase + result.archivo + '/'       : null;
         const urlCasos     = result.archivo_casos ? urlBase + result.archivo_casos + '/' : null;
+        const exportacion  = result.archivo_exportacion || null;
+        const urlExportacion = exportacion ? urlBase + exportacion + '/' : null;
+        // Un formato: ese archivo (.csv.gz, .parquet, .ndjson); varios: .zip con el Excel
+        const extensionExportacion = exportacion ? exportacion.slice(exportacion.indexOf('.')) : '';
         const duplicados   = Number(stats.duplicados_eliminados || 0);
 
         const alertaHtml = duplicados > 0
@@ -116,6 +122,7 @@ document.addEventListener('DOMContentLoaded', function () {
                 <div class="result-card__actions">
                     ${urlPrincipal ? `<a href="${urlPrincipal}" class="btn btn--success" download>⬇ Descargar reporte Excel</a>` : ''}
                     ${urlCasos    ? `<a href="${urlCasos}"     class="btn btn--outline"  download>📋 Casos de revisión</a>`     : ''}
+                    ${urlExportacion ? `<a href="${urlExportacion}" class="btn btn--outline" download>📦 Exportación (${extensionExportacion})</a>` : ''}
                     <button class="btn btn--ghost" onclick="abrirModalCarga()">🔄 Procesar otro archivo</button>
                 </div>
             </div>
@@ -145,10 +152,12 @@ document.addEventListener('DOMContentLoaded', function () {
 
         const formData = new FormData();
         formData.append('archivo', selectedFile);
-        if (selectedFile2) formData.append('archivo2', selectedFile2);
+        selectedFiles2.forEach(f => formData.append('archivo2', f));
         formData.append('usar_maestro', 'true');
         if (fechaInicio) formData.append('fecha_inicio', fechaInicio);
         if (fechaFin) formData.append('fecha_fin', fechaFin);
+        // El Excel siempre se genera; los formatos marcados se piden además
+        formatosEl?.querySelectorAll('input[type="checkbox"]:checked').forEach(c => formData.append('formatos', c.value));
 
         let timeoutId = null;
 
@@ -215,19 +224,22 @@ document.addEventListener('DOMContentLoaded', function () {
 
     if (fileInput2) {
         fileInput2.addEventListener('change', function (e) {
-            const file = e.target.files?.[0] ?? null;
-            if (!file) return;
+            const files = Array.from(e.target.files ?? []);
+            if (!files.length) return;
 
-            const lower = file.name.toLowerCase();
-            if (!lower.endsWith('.xls') && !lower.endsWith('.xlsx')) {
-                selectedFile2 = null;
+            const invalido = files.find(f => {
+                const lower = f.name.toLowerCase();
+                return !lower.endsWith('.xls') && !lower.endsWith('.xlsx');
+            });
+            if (invalido) {
+                selectedFiles2 = [];
                 if (archivoSeleccionado2) archivoSeleccionado2.textContent = '';
-                setEstado('Archivo 2: formato inválido. Usa .xls o .xlsx.', 'error');
+                setEstado(`${invalido.name}: formato inválido. Usa .xls o .xlsx.`, 'error');
                 return;
             }
 
-            selectedFile2 = file;
-            if (archivoSeleccionado2) archivoSeleccionado2.textContent = `📄 ${file.name}`;
+            selectedFiles2 = files;
+            if (archivoSeleccionado2) archivoSeleccionado2.textContent = files.map(f => `📄 ${f.name}`).join('  ');
             setEstado('');
         });
     }